@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from core.cache import arecord_cache_access, record_cache_access
+
+USER_KEY = "auth:user:{}"
+PERMISSIONS_KEY = "auth:perms:{}:{}:{}"
+GENERATION_KEY = "auth:perms-generation"
+
+
+def invalidate_user(user_id):
+    """Oublie l'utilisateur et ses permissions mis en cache."""
+    cache.delete(USER_KEY.format(user_id))
+    generation = cache.get(GENERATION_KEY, 0)
+    cache.delete_many([PERMISSIONS_KEY.format(user_id, kind, generation) for kind in ("user", "group")])
+
+
+def invalidate_all_permissions():
+    """
+    Invalide les permissions de tous les utilisateurs, par exemple quand les
+    permissions d'un groupe changent : les clés existantes ne sont plus lues.
+    """
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, timeout=None)
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ``ModelBackend`` qui garde en cache l'utilisateur (donc ses rôles
+    ``is_student``, ``is_teacher``, ``is_tutor``) et ses permissions, pour qu'une
+    page authentifiée ne fasse aucune requête d'authentification.
+
+    L'invalidation se fait par signaux (voir ``account.signals``).
+    """
+
+    def get_user(self, user_id):
+        key = USER_KEY.format(user_id)
+        user = cache.get(key)
+        record_cache_access("auth-user", hit=user is not None)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.AUTH_CACHE_TIMEOUT)
+        return user
+
+    async def aget_user(self, user_id):
+        key = USER_KEY.format(user_id)
+        user = await cache.aget(key)
+        await arecord_cache_access("auth-user", hit=user is not None)
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is not None:
+                await cache.aset(key, user, settings.AUTH_CACHE_TIMEOUT)
+        return user
+
+    def _permissions_key(self, user_obj, kind, generation):
+        return PERMISSIONS_KEY.format(user_obj.pk, kind, generation)
+
+    def _uses_cache(self, user_obj, obj, kind):
+        return (
+            obj is None
+            and user_obj.is_active
+            and not user_obj.is_anonymous
+            and not hasattr(user_obj, f"_{kind}_perm_cache")
+        )
+
+    def _cached_permissions(self, user_obj, obj, kind, compute):
+        if not self._uses_cache(user_obj, obj, kind):
+            return compute(user_obj, obj)
+        key = self._permissions_key(user_obj, kind, cache.get(GENERATION_KEY, 0))
+        perms = cache.get(key)
+        record_cache_access("auth-perms", hit=perms is not None)
+        if perms is None:
+            perms = compute(user_obj, obj)
+            cache.set(key, perms, settings.AUTH_CACHE_TIMEOUT)
+        else:
+            setattr(user_obj, f"_{kind}_perm_cache", perms)
+        return perms
+
+    async def _acached_permissions(self, user_obj, obj, kind, compute):
+        if not self._uses_cache(user_obj, obj, kind):
+            return await compute(user_obj, obj)
+        key = self._permissions_key(user_obj, kind, await cache.aget(GENERATION_KEY, 0))
+        perms = await cache.aget(key)
+        await arecord_cache_access("auth-perms", hit=perms is not None)
+        if perms is None:
+            perms = await compute(user_obj, obj)
+            await cache.aset(key, perms, settings.AUTH_CACHE_TIMEOUT)
+        else:
+            setattr(user_obj, f"_{kind}_perm_cache", perms)
+        return perms
+
+    def get_user_permissions(self, user_obj, obj=None):
+        return self._cached_permissions(user_obj, obj, "user", super().get_user_permissions)
+
+    async def aget_user_permissions(self, user_obj, obj=None):
+        return await self._acached_permissions(user_obj, obj, "user", super().aget_user_permissions)
+
+    def get_group_permissions(self, user_obj, obj=None):
+        return self._cached_permissions(user_obj, obj, "group", super().get_group_permissions)
+
+    async def aget_group_permissions(self, user_obj, obj=None):
+        return await self._acached_permissions(user_obj, obj, "group", super().aget_group_permissions)
@@ -1,3 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from account.backends import CachedModelBackend
+
+User = get_user_model()
+
+
+class CachedModelBackendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="prof@x.io", password="secret", is_teacher=True)
+        cls.permission = Permission.objects.get(codename="view_classroom")
+
+    def setUp(self):
+        cache.clear()
+        self.backend = CachedModelBackend()
+
+    def fresh_user(self):
+        # Un nouvel objet, sans les caches de permissions posés par Django sur l'instance.
+        return self.backend.get_user(self.user.pk)
+
+    def test_user_is_read_once(self):
+        self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            user = self.backend.get_user(self.user.pk)
+        self.assertTrue(user.is_teacher)
+
+    def test_saving_the_user_invalidates_it(self):
+        self.backend.get_user(self.user.pk)
+        self.user.is_tutor = True
+        self.user.save()
+        self.assertTrue(self.backend.get_user(self.user.pk).is_tutor)
+
+    def test_permissions_are_cached_and_invalidated(self):
+        self.assertFalse(self.backend.has_perm(self.fresh_user(), "core.view_classroom"))
+        with self.assertNumQueries(0):
+            self.assertFalse(self.backend.has_perm(self.backend.get_user(self.user.pk), "core.view_classroom"))
+        self.user.user_permissions.add(self.permission)
+        self.assertTrue(self.backend.has_perm(self.fresh_user(), "core.view_classroom"))
+
+    def test_group_permission_changes_invalidate_members(self):
+        group = Group.objects.create(name="Direction")
+        self.user.groups.add(group)
+        self.assertFalse(self.backend.has_perm(self.fresh_user(), "core.view_classroom"))
+        group.permissions.add(self.permission)
+        self.assertTrue(self.backend.has_perm(self.fresh_user(), "core.view_classroom"))
+        group.delete()
+        self.assertFalse(self.backend.has_perm(self.fresh_user(), "core.view_classroom"))
+
+
+class AuthenticatedRequestTests(TestCase):
+    def test_warm_request_runs_no_auth_queries(self):
+        user = User.objects.create_user(email="prof@x.io", password="secret", is_teacher=True)
+        self.client.force_login(user)
+        cache.clear()
+        self.client.get(reverse("dashboard"))
+        # Session, utilisateur et rôle lus dans le cache.
+        with self.assertNumQueries(0):
+            self.assertRedirects(
+                self.client.get(reverse("dashboard")), reverse("teacher_dashboard"), fetch_redirect_response=False
+            )
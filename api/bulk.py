@@ -0,0 +1,450 @@
+"""
+Écritures en lot : notes d'une évaluation, appel d'une classe, inscriptions.
+
+Un lot est validé en entier avec quelques requêtes ensemblistes (les
+identifiants reçus sont vérifiés par un seul ``IN``), puis écrit dans une
+transaction par un ``bulk_create`` et un ``bulk_update``. Si une ligne est
+invalide, rien n'est écrit et la réponse (400) détaille chaque ligne.
+
+Dans la transaction, chaque vue verrouille la ligne parente (évaluation,
+classe) puis relit ce qu'un lot concurrent a pu écrire depuis la validation.
+Une contrainte d'unicité violée malgré tout annule le lot avec une 409.
+"""
+import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views import View
+
+from api.views import ApiError, JsonApiMixin
+from core.cache import bump_model_version
+from core.changes import record_changes
+from core.models import Attendance, Classroom, ClassroomSubject, Enrollment, Evaluation, Mark, Student
+
+MAX_ROWS = 500
+
+
+class RowError(Exception):
+    pass
+
+
+def as_int(value, field):
+    if isinstance(value, bool):
+        raise RowError({field: "Entier attendu."})
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RowError({field: "Entier attendu."})
+
+
+def as_decimal(value, field):
+    try:
+        number = Decimal(str(value))
+        # ``NaN`` et ``Infinity`` sont des décimaux valides, mais pas des nombres.
+        if not number.is_finite():
+            raise ValueError
+        return number.quantize(Decimal("0.01"))
+    except (InvalidOperation, ValueError):
+        raise RowError({field: "Nombre attendu."})
+
+
+def as_date(value, field):
+    try:
+        return datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"{field} : date AAAA-MM-JJ attendue.")
+
+
+class BulkWriteView(JsonApiMixin, View):
+    """
+    Base des vues de lot. Les sous-classes implémentent ``get_target``,
+    ``check_target_permission`` et ``prepare`` (validation et construction
+    des objets à créer / modifier), et déclarent ``model`` et ``update_fields``.
+    """
+    model = None
+    update_fields = ()
+    # Journaliser les créations pour la synchronisation (``core.changes``).
+    record_created = True
+
+    def post(self, request, pk, *args, **kwargs):
+        data = self.parse_json()
+        rows = data.get("rows")
+        if not isinstance(rows, list) or not rows:
+            raise ApiError(400, "rows doit être une liste non vide.")
+        if len(rows) > MAX_ROWS:
+            raise ApiError(400, f"Au plus {MAX_ROWS} lignes par lot.")
+        if not all(isinstance(row, dict) for row in rows):
+            raise ApiError(400, "Chaque ligne doit être un objet JSON.")
+
+        target = self.get_target(pk)
+        self.check_target_permission(target)
+        results = [{"index": index} for index in range(len(rows))]
+        to_create, to_update = self.prepare(target, data, rows, results)
+        if any("errors" in result for result in results):
+            for result in results:
+                result["status"] = "invalid" if "errors" in result else "valid"
+            return JsonResponse({"detail": "Lot invalide : rien n'a été enregistré.", "results": results}, status=400)
+
+        now = timezone.now()
+        for obj in to_create.values():
+            obj.created_by = obj.updated_by = request.user
+        for obj in to_update.values():
+            obj.updated_by = request.user
+            obj.updated_at = now
+        try:
+            with transaction.atomic():
+                self.lock(target, to_create, to_update)
+                created = self.create(list(to_create.values()))
+                if to_update:
+                    self.model.objects.bulk_update(
+                        list(to_update.values()), [*self.update_fields, "updated_by", "updated_at"]
+                    )
+                written = [*to_update.values(), *(created if self.record_created else [])]
+                record_changes(self.model, [(obj.pk, self.sync_classroom_id(target)) for obj in written])
+        except IntegrityError:
+            raise ApiError(
+                409, "Lot en conflit avec une écriture simultanée : rien n'a été enregistré, renvoyez-le."
+            )
+        # Les écritures en masse ne déclenchent pas post_save.
+        bump_model_version(self.model)
+
+        for index, obj in zip(to_create, created):
+            results[index].update(status="created", id=obj.pk)
+        for index, obj in to_update.items():
+            results[index].update(status="updated", id=obj.pk)
+        return JsonResponse({"created": len(to_create), "updated": len(to_update), "results": results})
+
+    def lock(self, target, to_create, to_update):
+        """
+        Appelée dans la transaction avant l'écriture : verrouille ce qui doit
+        l'être et revérifie ce qu'une écriture concurrente a pu changer depuis
+        ``prepare`` (une ``ApiError`` annule le lot).
+        """
+
+    def adopt_concurrent_rows(self, to_create, to_update, existing):
+        """
+        Les lignes de ``to_create`` déjà créées par un lot concurrent
+        (``existing`` : ``{inscription: ligne}``) deviennent des mises à jour.
+        """
+        for index, obj in list(to_create.items()):
+            current = existing.get(obj.enrollment_id)
+            if current is None:
+                continue
+            for field in self.update_fields:
+                setattr(current, field, getattr(obj, field))
+            current.updated_by, current.updated_at = obj.updated_by, timezone.now()
+            del to_create[index]
+            to_update[index] = current
+
+    def create(self, objs):
+        return self.model.objects.bulk_create(objs)
+
+    def sync_classroom_id(self, target):
+        """Classe à laquelle les lignes écrites sont rattachées (``core.changes``)."""
+        return target.pk
+
+    def row_values(self, rows, results, parse):
+        """
+        Applique ``parse(row)`` à chaque ligne ; une ``RowError`` est reportée
+        dans le résultat de la ligne. Retourne ``{index: valeurs}`` des lignes valides.
+        """
+        parsed = {}
+        for index, row in enumerate(rows):
+            try:
+                parsed[index] = parse(row)
+            except RowError as exc:
+                results[index]["errors"] = exc.args[0]
+        return parsed
+
+    def reject_duplicates(self, parsed, key, results, field):
+        seen = set()
+        for index, values in list(parsed.items()):
+            if values[key] in seen:
+                results[index]["errors"] = {field: "Ligne en double dans le lot."}
+                del parsed[index]
+            seen.add(values[key])
+
+
+class MarkBulkView(BulkWriteView):
+    """
+    ``POST /api/classroom-subjects/<id>/marks/``
+
+    ``{"evaluation": 12, "rows": [{"enrollment": 3, "score": "14.5", "comment": ""}, …]}``
+
+    Crée ou met à jour les notes de l'évaluation. Réservé à l'enseignant de la
+    matière et aux utilisateurs ayant la permission ``core.change_mark``.
+    """
+    model = Mark
+    update_fields = ("score", "comment")
+
+    def get_target(self, pk):
+        target = ClassroomSubject.objects.select_related("teacher").filter(pk=pk).first()
+        if target is None:
+            raise ApiError(404, "Matière en classe introuvable.")
+        return target
+
+    def check_target_permission(self, target):
+        user = self.request.user
+        if not (target.teacher and target.teacher.user_id == user.pk) and not user.has_perm("core.change_mark"):
+            raise ApiError(403, "Permission refusée.")
+
+    def sync_classroom_id(self, target):
+        return target.classroom_id
+
+    def prepare(self, target, data, rows, results):
+        try:
+            evaluation_id = as_int(data.get("evaluation"), "evaluation")
+        except RowError:
+            raise ApiError(400, "evaluation : identifiant attendu.")
+        evaluation = Evaluation.objects.filter(pk=evaluation_id, classroom_subject=target).first()
+        if evaluation is None:
+            raise ApiError(400, "evaluation : évaluation inconnue pour cette matière.")
+
+        def parse(row):
+            values = {
+                "enrollment": as_int(row.get("enrollment"), "enrollment"),
+                "score": as_decimal(row.get("score"), "score"),
+                "comment": str(row.get("comment") or "")[:255],
+            }
+            if not 0 <= values["score"] <= evaluation.max_score:
+                raise RowError({"score": f"La note doit être comprise entre 0 et {evaluation.max_score}."})
+            return values
+
+        parsed = self.row_values(rows, results, parse)
+        self.reject_duplicates(parsed, "enrollment", results, "enrollment")
+        enrollment_ids = {values["enrollment"] for values in parsed.values()}
+        valid = set(
+            Enrollment.objects.filter(classroom_id=target.classroom_id, pk__in=enrollment_ids)
+            .values_list("pk", flat=True)
+        )
+        existing = {
+            mark.enrollment_id: mark
+            for mark in Mark.objects.filter(evaluation=evaluation, enrollment_id__in=valid)
+            .only("pk", "enrollment_id", "score", "comment")
+        }
+
+        to_create, to_update = {}, {}
+        for index, values in parsed.items():
+            if values["enrollment"] not in valid:
+                results[index]["errors"] = {"enrollment": "Élève non inscrit dans cette classe."}
+            elif values["enrollment"] in existing:
+                mark = existing[values["enrollment"]]
+                mark.score, mark.comment = values["score"], values["comment"]
+                to_update[index] = mark
+            else:
+                to_create[index] = Mark(
+                    evaluation=evaluation,
+                    enrollment_id=values["enrollment"],
+                    score=values["score"],
+                    comment=values["comment"],
+                )
+        return to_create, to_update
+
+    def lock(self, target, to_create, to_update):
+        if not to_create:
+            return
+        # Deux lots sur la même évaluation : le second attend le premier et
+        # met à jour les notes que celui-ci a créées.
+        evaluation_id = next(iter(to_create.values())).evaluation_id
+        Evaluation.objects.select_for_update().filter(pk=evaluation_id).values_list("pk", flat=True).get()
+        self.adopt_concurrent_rows(to_create, to_update, {
+            mark.enrollment_id: mark
+            for mark in Mark.objects.filter(
+                evaluation_id=evaluation_id,
+                enrollment_id__in=[mark.enrollment_id for mark in to_create.values()],
+            ).only("pk", "enrollment_id", "score", "comment")
+        })
+
+
+class AttendanceBulkView(BulkWriteView):
+    """
+    ``POST /api/classrooms/<id>/attendance/``
+
+    ``{"date": "2026-10-19", "rows": [{"enrollment": 3, "status": "absent", "note": ""}, …]}``
+
+    Enregistre l'appel du jour (création ou correction). Réservé aux
+    enseignants de la classe et aux utilisateurs ayant ``core.change_attendance``.
+    """
+    model = Attendance
+    update_fields = ("status", "note")
+
+    def get_target(self, pk):
+        target = Classroom.objects.filter(pk=pk).only("pk").first()
+        if target is None:
+            raise ApiError(404, "Classe introuvable.")
+        return target
+
+    def check_target_permission(self, target):
+        user = self.request.user
+        if user.has_perm("core.change_attendance"):
+            return
+        if not ClassroomSubject.objects.filter(classroom=target, teacher__user=user).exists():
+            raise ApiError(403, "Permission refusée.")
+
+    def prepare(self, target, data, rows, results):
+        date = as_date(data.get("date"), "date")
+        statuses = set(Attendance.Status.values)
+
+        def parse(row):
+            status = row.get("status", Attendance.Status.PRESENT)
+            if status not in statuses:
+                raise RowError({"status": f"Valeurs possibles : {', '.join(sorted(statuses))}."})
+            return {
+                "enrollment": as_int(row.get("enrollment"), "enrollment"),
+                "status": status,
+                "note": str(row.get("note") or "")[:255],
+            }
+
+        parsed = self.row_values(rows, results, parse)
+        self.reject_duplicates(parsed, "enrollment", results, "enrollment")
+        enrollment_ids = {values["enrollment"] for values in parsed.values()}
+        valid = set(
+            Enrollment.objects.filter(classroom=target, pk__in=enrollment_ids).values_list("pk", flat=True)
+        )
+        existing = {
+            attendance.enrollment_id: attendance
+            for attendance in Attendance.objects.filter(date=date, enrollment_id__in=valid)
+            .only("pk", "enrollment_id", "status", "note")
+        }
+
+        to_create, to_update = {}, {}
+        for index, values in parsed.items():
+            if values["enrollment"] not in valid:
+                results[index]["errors"] = {"enrollment": "Élève non inscrit dans cette classe."}
+            elif values["enrollment"] in existing:
+                attendance = existing[values["enrollment"]]
+                attendance.status, attendance.note = values["status"], values["note"]
+                to_update[index] = attendance
+            else:
+                to_create[index] = Attendance(
+                    enrollment_id=values["enrollment"],
+                    classroom=target,
+                    date=date,
+                    status=values["status"],
+                    note=values["note"],
+                )
+        return to_create, to_update
+
+    def lock(self, target, to_create, to_update):
+        if not to_create:
+            return
+        # L'appel d'une classe pour une date : verrou sur la classe.
+        date = next(iter(to_create.values())).date
+        Classroom.objects.select_for_update().filter(pk=target.pk).values_list("pk", flat=True).get()
+        self.adopt_concurrent_rows(to_create, to_update, {
+            attendance.enrollment_id: attendance
+            for attendance in Attendance.objects.filter(
+                date=date,
+                enrollment_id__in=[attendance.enrollment_id for attendance in to_create.values()],
+            ).only("pk", "enrollment_id", "status", "note")
+        })
+
+
+class EnrollmentBulkView(BulkWriteView):
+    """
+    ``POST /api/classrooms/<id>/enrollments/``
+
+    ``{"rows": [{"student": 42, "enrollment_number": ""}, …]}``
+
+    Inscrit des élèves dans la classe pour son année scolaire, dans la limite
+    de sa capacité. Un élève déjà inscrit cette année est refusé (les
+    changements de classe passent par la répartition). Requiert
+    ``core.add_enrollment``.
+    """
+    model = Enrollment
+    # bulk_enroll journalise ses propres créations.
+    record_created = False
+
+    def get_target(self, pk):
+        target = (
+            Classroom.objects
+            .select_related("school_year_level")
+            .annotate(occupied=Count("enrollments"))
+            .filter(pk=pk)
+            .first()
+        )
+        if target is None:
+            raise ApiError(404, "Classe introuvable.")
+        return target
+
+    def check_target_permission(self, target):
+        if not self.request.user.has_perm("core.add_enrollment"):
+            raise ApiError(403, "Permission refusée.")
+
+    def check_capacity(self, capacity, occupied, count):
+        if occupied + count > capacity:
+            raise ApiError(400, f"Capacité insuffisante : {capacity - occupied} place(s) pour {count} élève(s).")
+
+    def prepare(self, target, data, rows, results):
+        school_year_id = target.school_year_level.school_year_id
+        self.check_capacity(target.capacity, target.occupied, len(rows))
+
+        def parse(row):
+            return {
+                "student": as_int(row.get("student"), "student"),
+                "enrollment_number": str(row.get("enrollment_number") or "").strip()[:30],
+            }
+
+        parsed = self.row_values(rows, results, parse)
+        self.reject_duplicates(parsed, "student", results, "student")
+        student_ids = {values["student"] for values in parsed.values()}
+        known = set(Student.objects.filter(pk__in=student_ids).values_list("pk", flat=True))
+        enrolled = set(
+            Enrollment.objects.filter(school_year_id=school_year_id, student_id__in=student_ids)
+            .values_list("student_id", flat=True)
+        )
+        numbers = {values["enrollment_number"] for values in parsed.values() if values["enrollment_number"]}
+        taken = set(
+            Enrollment.objects.filter(enrollment_number__in=numbers).values_list("enrollment_number", flat=True)
+        ) if numbers else set()
+
+        to_create = {}
+        for index, values in parsed.items():
+            if values["student"] not in known:
+                results[index]["errors"] = {"student": "Élève inconnu."}
+            elif values["student"] in enrolled:
+                results[index]["errors"] = {"student": "Élève déjà inscrit pour cette année scolaire."}
+            elif values["enrollment_number"] in taken:
+                results[index]["errors"] = {"enrollment_number": "Numéro déjà attribué."}
+            else:
+                if values["enrollment_number"]:
+                    taken.add(values["enrollment_number"])
+                to_create[index] = Enrollment(
+                    student_id=values["student"],
+                    school_year_id=school_year_id,
+                    classroom=target,
+                    enrollment_number=values["enrollment_number"],
+                )
+        return to_create, {}
+
+    def lock(self, target, to_create, to_update):
+        # Deux lots simultanés sur la même classe : le second attend le premier
+        # et recompte les places avec ses inscriptions.
+        capacity = Classroom.objects.select_for_update().filter(pk=target.pk).values_list("capacity", flat=True).get()
+        self.check_capacity(capacity, Enrollment.objects.filter(classroom=target).count(), len(to_create))
+        # Un même élève inscrit en même temps dans une autre classe : les élèves
+        # sont verrouillés (dans l'ordre, sans interblocage) puis revérifiés.
+        student_ids = sorted(enrollment.student_id for enrollment in to_create.values())
+        list(Student.objects.select_for_update().filter(pk__in=student_ids).order_by("pk").values_list("pk", flat=True))
+        enrolled = set(
+            Enrollment.objects
+            .filter(school_year_id=target.school_year_level.school_year_id, student_id__in=student_ids)
+            .values_list("student_id", flat=True)
+        )
+        if enrolled:
+            raise ApiError(
+                409,
+                "Élève(s) inscrit(s) entre-temps pour cette année scolaire : rien n'a été enregistré.",
+                {
+                    str(index): {"student": "Élève déjà inscrit pour cette année scolaire."}
+                    for index, enrollment in to_create.items()
+                    if enrollment.student_id in enrolled
+                },
+            )
+
+    def create(self, objs):
+        # Numérotation, clôture des inscriptions précédentes, libellés et statistiques.
+        return Enrollment.objects.bulk_enroll(objs)
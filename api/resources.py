@@ -0,0 +1,212 @@
+"""
+Ressources exposées par l'API JSON.
+
+Chaque ressource déclare ses champs publics et le chemin ORM correspondant :
+un chemin traversant une relation (``school__name``) devient une jointure de
+la requête unique qui lit la page, décidée avant son exécution. Les champs
+demandés avec ``?fields=`` limitent les colonnes lues (et les jointures).
+"""
+from django.utils.functional import cached_property
+
+from core.models import (
+    Classroom,
+    ClassroomSubject,
+    Evaluation,
+    School,
+    SchoolYear,
+    Student,
+    Subject,
+    Teacher,
+)
+
+
+class Resource:
+    model = None
+    # {nom public: chemin ORM}
+    fields = {}
+    # {nom public: attribut du modèle}, champs acceptés en écriture
+    writable = {}
+    # {paramètre de requête: chemin ORM}, filtres d'égalité sur des identifiants
+    filters = {}
+
+    def __init__(self, name):
+        self.name = name
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    @cached_property
+    def dependencies(self):
+        """Modèles lus par la ressource : le sien et ceux que traversent ses champs et filtres."""
+        models = [self.model]
+        for path in [*self.fields.values(), *self.filters.values()]:
+            model = self.model
+            for name in path.split("__")[:-1]:
+                model = model._meta.get_field(name).related_model
+                if model not in models:
+                    models.append(model)
+        return models
+
+    @property
+    def permission_prefix(self):
+        return f"{self.model._meta.app_label}.{{}}_{self.model._meta.model_name}"
+
+    def has_permission(self, user, action):
+        return user.has_perm(self.permission_prefix.format(action))
+
+
+class SchoolResource(Resource):
+    model = School
+    fields = {
+        "id": "pk",
+        "name": "name",
+        "ville": "ville",
+        "quartier": "quartier",
+        "foundation_date": "foundation_date",
+        "updated_at": "updated_at",
+    }
+    writable = {"name": "name", "ville": "ville", "quartier": "quartier", "foundation_date": "foundation_date"}
+
+
+class SchoolYearResource(Resource):
+    model = SchoolYear
+    fields = {
+        "id": "pk",
+        "school": "school_id",
+        "school_name": "school__name",
+        "name": "name",
+        "start_date": "start_date",
+        "end_date": "end_date",
+        "updated_at": "updated_at",
+    }
+    writable = {"school": "school_id", "start_date": "start_date", "end_date": "end_date"}
+    filters = {"school": "school_id"}
+
+
+class ClassroomResource(Resource):
+    model = Classroom
+    fields = {
+        "id": "pk",
+        "name": "name",
+        "label": "display_label",
+        "school_year_level": "school_year_level_id",
+        "school_year": "school_year_level__school_year_id",
+        "level": "school_year_level__level_id",
+        "level_name": "school_year_level__level__name",
+        "grade_option": "grade_option_id",
+        "capacity": "capacity",
+        "updated_at": "updated_at",
+    }
+    writable = {
+        "name": "name",
+        "school_year_level": "school_year_level_id",
+        "grade_option": "grade_option_id",
+        "capacity": "capacity",
+    }
+    filters = {
+        "school_year": "school_year_level__school_year_id",
+        "school_year_level": "school_year_level_id",
+    }
+
+
+class SubjectResource(Resource):
+    model = Subject
+    fields = {
+        "id": "pk",
+        "school": "school_id",
+        "name": "name",
+        "coefficient": "coefficient",
+        "is_active": "is_active",
+        "updated_at": "updated_at",
+    }
+    writable = {"school": "school_id", "name": "name", "coefficient": "coefficient", "is_active": "is_active"}
+    filters = {"school": "school_id"}
+
+
+class ClassroomSubjectResource(Resource):
+    model = ClassroomSubject
+    fields = {
+        "id": "pk",
+        "classroom": "classroom_id",
+        "subject": "subject_id",
+        "subject_name": "subject__name",
+        "coefficient": "coefficient",
+        "weekly_hours": "weekly_hours",
+        "teacher": "teacher_id",
+        "updated_at": "updated_at",
+    }
+    writable = {
+        "classroom": "classroom_id",
+        "subject": "subject_id",
+        "coefficient": "coefficient",
+        "weekly_hours": "weekly_hours",
+        "teacher": "teacher_id",
+    }
+    filters = {"classroom": "classroom_id", "subject": "subject_id", "teacher": "teacher_id"}
+
+
+class TeacherResource(Resource):
+    model = Teacher
+    fields = {
+        "id": "pk",
+        "user": "user_id",
+        "first_name": "user__first_name",
+        "last_name": "user__last_name",
+        "email": "user__email",
+        "school_year": "school_year_id",
+        "label": "display_label",
+        "updated_at": "updated_at",
+    }
+    writable = {"user": "user_id", "school_year": "school_year_id"}
+    filters = {"school_year": "school_year_id", "user": "user_id"}
+
+
+class StudentResource(Resource):
+    model = Student
+    fields = {
+        "id": "pk",
+        "user": "user_id",
+        "first_name": "user__first_name",
+        "last_name": "user__last_name",
+        "email": "user__email",
+        "label": "display_label",
+        "updated_at": "updated_at",
+    }
+    writable = {"user": "user_id"}
+    # Une inscription par élève et par année : ces filtres ne dupliquent aucune ligne.
+    filters = {
+        "user": "user_id",
+        "school_year": "enrollments__school_year_id",
+        "classroom": "enrollments__classroom_id",
+    }
+
+
+class EvaluationResource(Resource):
+    model = Evaluation
+    fields = {
+        "id": "pk",
+        "classroom_subject": "classroom_subject_id",
+        "classroom": "classroom_subject__classroom_id",
+        "subject": "classroom_subject__subject_id",
+        "name": "name",
+        "date": "date",
+        "max_score": "max_score",
+        "updated_at": "updated_at",
+    }
+    writable = {"classroom_subject": "classroom_subject_id", "name": "name", "date": "date", "max_score": "max_score"}
+    filters = {"classroom_subject": "classroom_subject_id", "classroom": "classroom_subject__classroom_id"}
+
+
+RESOURCES = {
+    name: resource_class(name)
+    for name, resource_class in {
+        "schools": SchoolResource,
+        "school-years": SchoolYearResource,
+        "classrooms": ClassroomResource,
+        "subjects": SubjectResource,
+        "classroom-subjects": ClassroomSubjectResource,
+        "teachers": TeacherResource,
+        "students": StudentResource,
+        "evaluations": EvaluationResource,
+    }.items()
+}
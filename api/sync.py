@@ -0,0 +1,367 @@
+"""
+Synchronisation des appareils des enseignants, utilisables hors ligne.
+
+``GET /api/sync/?cursor=…`` renvoie les lignes des classes de l'enseignant
+modifiées depuis le curseur, lues dans le journal ``SyncChange`` (une requête
+indexée ``classe, numéro``) puis une requête par modèle concerné. Les numéros
+sont propres à chaque classe : le curseur combine le dernier numéro reçu de
+chaque classe et une empreinte des classes. S'il manque, est antérieur à la
+purge du journal ou si les classes ont changé, la réponse est un instantané
+complet (``"reset": true``).
+
+``POST /api/sync/`` envoie les notes et l'appel saisis hors ligne. Chaque
+ligne porte le ``updated_at`` de la version sur laquelle elle a été saisie
+(``base_updated_at``, absent pour une création) : si la ligne a changé sur le
+serveur depuis, elle est refusée en conflit avec la version du serveur. Les
+autres lignes sont écrites en une transaction.
+"""
+import datetime
+import hashlib
+import operator
+from functools import reduce
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.gzip import gzip_page
+
+from api.bulk import MAX_ROWS, RowError, as_decimal, as_int
+from api.views import ApiError, JsonApiMixin
+from core.mixins import ReplicaReadMixin
+from core.cache import bump_model_version
+from core.changes import SYNC_MODELS, sync_name, write_journal
+from core.models import (
+    Attendance,
+    Classroom,
+    ClassroomSubject,
+    Enrollment,
+    Evaluation,
+    Mark,
+    SyncChange,
+    SyncCounter,
+)
+
+# {modèle: {nom public: chemin ORM}}
+SYNC_FIELDS = {
+    Classroom: {
+        "id": "pk",
+        "label": "display_label",
+        "capacity": "capacity",
+        "updated_at": "updated_at",
+    },
+    ClassroomSubject: {
+        "id": "pk",
+        "classroom": "classroom_id",
+        "subject": "subject_id",
+        "subject_name": "subject__name",
+        "teacher": "teacher_id",
+        "updated_at": "updated_at",
+    },
+    Enrollment: {
+        "id": "pk",
+        "classroom": "classroom_id",
+        "student": "student_id",
+        "label": "display_label",
+        "enrollment_number": "enrollment_number",
+        "updated_at": "updated_at",
+    },
+    Evaluation: {
+        "id": "pk",
+        "classroom_subject": "classroom_subject_id",
+        "name": "name",
+        "date": "date",
+        "max_score": "max_score",
+        "updated_at": "updated_at",
+    },
+    Mark: {
+        "id": "pk",
+        "evaluation": "evaluation_id",
+        "enrollment": "enrollment_id",
+        "score": "score",
+        "comment": "comment",
+        "updated_at": "updated_at",
+    },
+    Attendance: {
+        "id": "pk",
+        "enrollment": "enrollment_id",
+        "classroom": "classroom_id",
+        "date": "date",
+        "status": "status",
+        "note": "note",
+        "updated_at": "updated_at",
+    },
+}
+MODELS_BY_NAME = {sync_name(model): model for model in SYNC_FIELDS}
+
+encoder = DjangoJSONEncoder()
+
+
+def read_rows(model, queryset):
+    fields = SYNC_FIELDS[model]
+    return [dict(zip(fields, row)) for row in queryset.values_list(*fields.values())]
+
+
+def in_scope(model, classroom_ids):
+    return model._default_manager.filter(**{f"{SYNC_MODELS[model]}__in": classroom_ids})
+
+
+def same_version(updated_at, base):
+    # Comparaison sur la représentation JSON, celle que le client a reçue.
+    return base is not None and encoder.default(updated_at) == base
+
+
+@method_decorator(gzip_page, name="dispatch")
+class SyncView(ReplicaReadMixin, JsonApiMixin, View):
+    """``/api/sync/`` : téléchargement des changements et envoi des saisies hors ligne, compressés en gzip."""
+
+    def check_permissions(self, request):
+        if not request.user.is_teacher:
+            raise ApiError(403, "Réservé aux enseignants.")
+
+    def get_classroom_ids(self):
+        """Classes de l'année en cours où l'utilisateur enseigne."""
+        return sorted(set(
+            ClassroomSubject.objects.filter(
+                teacher__user=self.request.user,
+                classroom__school_year_level__school_year__end_date__gte=timezone.localdate(),
+            ).values_list("classroom_id", flat=True)
+        ))
+
+    def make_cursor(self, seqs, classroom_ids):
+        """``n1-n2-….empreinte`` : le dernier numéro reçu de chaque classe, dans l'ordre de ``classroom_ids``."""
+        scope = hashlib.md5(",".join(map(str, classroom_ids)).encode(), usedforsecurity=False).hexdigest()[:8]
+        return f"{'-'.join(str(seqs[classroom_id]) for classroom_id in classroom_ids)}.{scope}"
+
+    def parse_cursor(self, cursor, classroom_ids):
+        """``{classe: numéro}`` du curseur ; ``None`` s'il manque, est illisible ou porte sur d'autres classes."""
+        seqs = cursor.partition(".")[0]
+        seqs = seqs.split("-") if seqs else []
+        if len(seqs) != len(classroom_ids) or not all(seq.isdigit() for seq in seqs):
+            return None
+        since = dict(zip(classroom_ids, map(int, seqs)))
+        return since if cursor == self.make_cursor(since, classroom_ids) else None
+
+    def get(self, request, *args, **kwargs):
+        classroom_ids = self.get_classroom_ids()
+        # Lu avant le journal : un changement numéroté après n'est pas perdu,
+        # il sera renvoyé à la prochaine synchronisation.
+        state = SyncCounter.objects.state(classroom_ids)
+        last_seqs = {classroom_id: last_seq for classroom_id, (last_seq, _) in state.items()}
+        since = self.parse_cursor(request.GET.get("cursor", ""), classroom_ids)
+        reset = since is None or any(
+            not pruned_through <= since[classroom_id] <= last_seq
+            for classroom_id, (last_seq, pruned_through) in state.items()
+        )
+
+        changes, deleted = {}, {}
+        if reset:
+            for model in SYNC_FIELDS:
+                changes[sync_name(model)] = read_rows(model, in_scope(model, classroom_ids).order_by("pk"))
+        else:
+            window = [
+                Q(classroom_id=classroom_id, seq__gt=since[classroom_id], seq__lte=last_seq)
+                for classroom_id, last_seq in last_seqs.items()
+                if since[classroom_id] < last_seq
+            ]
+            # Les numéros de classes différentes ne se comparent pas : un objet
+            # écrit au moins une fois est relu, et sa ligne actuelle tranche
+            # (absente ou hors des classes suivies, il est effacé).
+            upserts, removals = {}, {}
+            for name, object_id, is_deleted in (
+                SyncChange.objects.filter(reduce(operator.or_, window)).values_list("model", "object_id", "deleted")
+                if window else ()
+            ):
+                (removals if is_deleted else upserts).setdefault(name, set()).add(object_id)
+            for name, ids in removals.items():
+                ids = ids - upserts.get(name, set())
+                if ids:
+                    deleted[name] = ids
+            for name, ids in upserts.items():
+                model = MODELS_BY_NAME[name]
+                rows = read_rows(model, in_scope(model, classroom_ids).filter(pk__in=ids).order_by("pk"))
+                changes[name] = rows
+                # Sorti des classes suivies ou supprimé depuis : à effacer côté client.
+                gone = ids - {row["id"] for row in rows}
+                if gone:
+                    deleted.setdefault(name, set()).update(gone)
+
+        return JsonResponse({
+            "cursor": self.make_cursor(last_seqs, classroom_ids),
+            "reset": reset,
+            "changes": changes,
+            "deleted": {name: sorted(ids) for name, ids in deleted.items()},
+        })
+
+    def post(self, request, *args, **kwargs):
+        data = self.parse_json()
+        uploads = {name: data.get(name) or [] for name in ("marks", "attendance")}
+        if not all(isinstance(rows, list) and all(isinstance(row, dict) for row in rows) for rows in uploads.values()):
+            raise ApiError(400, "marks et attendance doivent être des listes d'objets JSON.")
+        if sum(len(rows) for rows in uploads.values()) > MAX_ROWS:
+            raise ApiError(400, f"Au plus {MAX_ROWS} lignes par envoi.")
+
+        classroom_ids = self.get_classroom_ids()
+        results = {name: [{"index": index} for index in range(len(rows))] for name, rows in uploads.items()}
+        enrollment_ids = {row.get("enrollment") for rows in uploads.values() for row in rows}
+        enrollments = dict(
+            Enrollment.objects.filter(classroom_id__in=classroom_ids, pk__in=[
+                pk for pk in enrollment_ids if isinstance(pk, int) and not isinstance(pk, bool)
+            ]).values_list("pk", "classroom_id")
+        )
+        marks = self.prepare_marks(uploads["marks"], results["marks"], enrollments)
+        attendance = self.prepare_attendance(uploads["attendance"], results["attendance"], enrollments)
+
+        now = timezone.now()
+        with transaction.atomic():
+            journal = []
+            for name, model, (to_create, to_update, update_fields) in (
+                ("marks", Mark, marks),
+                ("attendance", Attendance, attendance),
+            ):
+                for obj in to_create.values():
+                    obj.created_by = obj.updated_by = request.user
+                for obj in to_update.values():
+                    obj.updated_by = request.user
+                    obj.updated_at = now
+                created = model.objects.bulk_create(list(to_create.values()))
+                if to_update:
+                    model.objects.bulk_update(list(to_update.values()), [*update_fields, "updated_by", "updated_at"])
+                journal += [
+                    (model, obj.pk, obj._sync_classroom_id, False) for obj in [*created, *to_update.values()]
+                ]
+                for index, obj in [*zip(to_create, created), *to_update.items()]:
+                    results[name][index].update(status="applied", id=obj.pk, updated_at=obj.updated_at)
+            # En dernier, une seule fois : les compteurs des classes restent verrouillés jusqu'à la validation.
+            write_journal(journal)
+        for model in (Mark, Attendance):
+            bump_model_version(model)
+        return JsonResponse({"results": results})
+
+    def conflict(self, result, model, obj):
+        """Ligne refusée ; ``server`` est la version du serveur (``None`` si supprimée)."""
+        result["status"] = "conflict"
+        result["server"] = {name: getattr(obj, path) for name, path in SYNC_FIELDS[model].items()} if obj else None
+
+    def prepare_marks(self, rows, results, enrollments):
+        """Notes : évaluations des matières de l'enseignant, élèves de la classe."""
+        evaluations = {
+            pk: (classroom_id, max_score)
+            for pk, classroom_id, max_score in Evaluation.objects.filter(
+                classroom_subject__teacher__user=self.request.user,
+                pk__in=[row.get("evaluation") for row in rows if isinstance(row.get("evaluation"), int)],
+            ).values_list("pk", "classroom_subject__classroom_id", "max_score")
+        }
+        parsed, seen = {}, set()
+        for index, row in enumerate(rows):
+            try:
+                values = {
+                    "evaluation": as_int(row.get("evaluation"), "evaluation"),
+                    "enrollment": as_int(row.get("enrollment"), "enrollment"),
+                    "score": as_decimal(row.get("score"), "score"),
+                    "comment": str(row.get("comment") or "")[:255],
+                }
+                if values["evaluation"] not in evaluations:
+                    raise RowError({"evaluation": "Évaluation inconnue ou d'une autre matière."})
+                classroom_id, max_score = evaluations[values["evaluation"]]
+                if enrollments.get(values["enrollment"]) != classroom_id:
+                    raise RowError({"enrollment": "Élève non inscrit dans cette classe."})
+                if not 0 <= values["score"] <= max_score:
+                    raise RowError({"score": f"La note doit être comprise entre 0 et {max_score}."})
+                if (values["evaluation"], values["enrollment"]) in seen:
+                    raise RowError({"enrollment": "Ligne en double dans l'envoi."})
+            except RowError as exc:
+                results[index].update(status="invalid", errors=exc.args[0])
+                continue
+            seen.add((values["evaluation"], values["enrollment"]))
+            values["classroom"] = classroom_id
+            parsed[index] = values
+
+        existing = {
+            (mark.evaluation_id, mark.enrollment_id): mark
+            for mark in Mark.objects.filter(
+                evaluation_id__in={values["evaluation"] for values in parsed.values()},
+                enrollment_id__in={values["enrollment"] for values in parsed.values()},
+            )
+        }
+        to_create, to_update = {}, {}
+        for index, values in parsed.items():
+            mark = existing.get((values["evaluation"], values["enrollment"]))
+            base = rows[index].get("base_updated_at")
+            if mark is None and base is not None:
+                # Supprimée sur le serveur depuis la saisie.
+                self.conflict(results[index], Mark, None)
+                continue
+            if mark is not None and not same_version(mark.updated_at, base):
+                self.conflict(results[index], Mark, mark)
+                continue
+            if mark is None:
+                mark = Mark(evaluation_id=values["evaluation"], enrollment_id=values["enrollment"])
+                to_create[index] = mark
+            else:
+                to_update[index] = mark
+            mark.score, mark.comment = values["score"], values["comment"]
+            mark._sync_classroom_id = values["classroom"]
+        return to_create, to_update, ("score", "comment")
+
+    def prepare_attendance(self, rows, results, enrollments):
+        """Appel : élèves des classes de l'enseignant, une ligne par élève et par jour."""
+        statuses = set(Attendance.Status.values)
+        parsed, seen = {}, set()
+        for index, row in enumerate(rows):
+            try:
+                enrollment_id = as_int(row.get("enrollment"), "enrollment")
+                if enrollment_id not in enrollments:
+                    raise RowError({"enrollment": "Élève d'une classe non suivie."})
+                try:
+                    date = datetime.date.fromisoformat(row.get("date"))
+                except (TypeError, ValueError):
+                    raise RowError({"date": "Date AAAA-MM-JJ attendue."})
+                status = row.get("status", Attendance.Status.PRESENT)
+                if status not in statuses:
+                    raise RowError({"status": f"Valeurs possibles : {', '.join(sorted(statuses))}."})
+                if (enrollment_id, date) in seen:
+                    raise RowError({"enrollment": "Ligne en double dans l'envoi."})
+            except RowError as exc:
+                results[index].update(status="invalid", errors=exc.args[0])
+                continue
+            seen.add((enrollment_id, date))
+            parsed[index] = {
+                "enrollment": enrollment_id,
+                "date": date,
+                "status": status,
+                "note": str(row.get("note") or "")[:255],
+            }
+
+        existing = {
+            (attendance.enrollment_id, attendance.date): attendance
+            for attendance in Attendance.objects.filter(
+                enrollment_id__in={values["enrollment"] for values in parsed.values()},
+                date__in={values["date"] for values in parsed.values()},
+            )
+        }
+        to_create, to_update = {}, {}
+        for index, values in parsed.items():
+            attendance = existing.get((values["enrollment"], values["date"]))
+            base = rows[index].get("base_updated_at")
+            if attendance is None and base is not None:
+                self.conflict(results[index], Attendance, None)
+                continue
+            if attendance is not None and not same_version(attendance.updated_at, base):
+                self.conflict(results[index], Attendance, attendance)
+                continue
+            if attendance is None:
+                attendance = Attendance(
+                    enrollment_id=values["enrollment"],
+                    classroom_id=enrollments[values["enrollment"]],
+                    date=values["date"],
+                )
+                to_create[index] = attendance
+            else:
+                to_update[index] = attendance
+            attendance.status, attendance.note = values["status"], values["note"]
+            attendance._sync_classroom_id = attendance.classroom_id
+        return to_create, to_update, ("status", "note")
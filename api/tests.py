@@ -0,0 +1,457 @@
+import datetime
+import json
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.bulk import AttendanceBulkView, BulkWriteView, EnrollmentBulkView, MarkBulkView
+from core.models import Attendance, Classroom, Enrollment, Evaluation, Level, Mark, SyncCounter
+from core.tests.utils import (
+    classrooms_of,
+    enroll,
+    make_classroom_subject,
+    make_school_year,
+    make_student,
+    make_teacher,
+    make_user,
+)
+
+
+def grant(user, *codenames):
+    user.user_permissions.add(*Permission.objects.filter(codename__in=codenames))
+
+
+class ApiTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_year = make_school_year()
+        cls.classroom = classrooms_of(cls.school_year)[0]
+        cls.user = make_user("api@x.io")
+        grant(
+            cls.user,
+            "view_classroom", "add_classroom", "change_classroom", "delete_classroom", "add_classroomsubject",
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def post_json(self, url, data):
+        return self.client.post(url, json.dumps(data), content_type="application/json")
+
+
+class ResourcePermissionTests(ApiTestCase):
+    def test_anonymous_request_is_rejected(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse("api_list", args=["classrooms"])).status_code, 401)
+
+    def test_missing_model_permission_is_rejected(self):
+        self.assertEqual(self.client.get(reverse("api_list", args=["schools"])).status_code, 403)
+        self.assertEqual(self.client.delete(reverse("api_detail", args=["subjects", 1])).status_code, 403)
+
+    def test_unknown_resource_is_not_found(self):
+        self.assertEqual(self.client.get(reverse("api_list", args=["nope"])).status_code, 404)
+
+
+class ResourceWriteTests(ApiTestCase):
+    def test_empty_body_is_a_validation_error(self):
+        response = self.post_json(reverse("api_list", args=["classrooms"]), {})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("school_year_level", response.json()["errors"])
+
+    def test_unknown_relation_is_a_validation_error(self):
+        url = reverse("api_list", args=["classroom-subjects"])
+        for data in ({"subject": 1}, {"classroom": 999999, "subject": 1}):
+            response = self.post_json(url, data)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("classroom", response.json()["errors"])
+
+    def test_create_returns_the_row(self):
+        response = self.post_json(
+            reverse("api_list", args=["classrooms"]),
+            {"name": "C", "school_year_level": self.classroom.school_year_level_id, "capacity": 30},
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()["name"], "C")
+        self.assertTrue(Classroom.objects.filter(name="C").exists())
+
+    def test_stale_if_match_is_rejected(self):
+        url = reverse("api_detail", args=["classrooms", self.classroom.pk])
+        etag = self.client.get(url)["ETag"]
+        self.client.patch(url, json.dumps({"capacity": 20}), content_type="application/json", HTTP_IF_MATCH=etag)
+        response = self.client.patch(
+            url, json.dumps({"capacity": 25}), content_type="application/json", HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 412)
+
+
+class ConditionalListTests(ApiTestCase):
+    def get_list(self, **headers):
+        return self.client.get(reverse("api_list", args=["classrooms"]), headers=headers)
+
+    def test_unchanged_list_is_not_modified_without_reading_it(self):
+        etag = self.get_list()["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_list(if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([query for query in queries if "core_classroom" in query["sql"]])
+
+    def test_write_changes_the_etag(self):
+        etag = self.get_list()["ETag"]
+        Classroom.objects.filter(pk=self.classroom.pk).get().delete()
+        response = self.get_list(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    def test_list_has_no_last_modified(self):
+        response = self.get_list()
+        self.assertNotIn("Last-Modified", response)
+        self.assertEqual(self.get_list(if_modified_since="Fri, 01 Jan 2100 00:00:00 GMT").status_code, 200)
+
+    def test_detail_is_not_modified(self):
+        url = reverse("api_detail", args=["classrooms", self.classroom.pk])
+        response = self.client.get(url)
+        self.assertNotIn("Last-Modified", response)
+        self.assertEqual(self.client.get(url, headers={"if_none_match": response["ETag"]}).status_code, 304)
+
+    def test_joined_field_change_changes_the_detail_etag(self):
+        url = reverse("api_detail", args=["classrooms", self.classroom.pk])
+        etag = self.client.get(url)["ETag"]
+        # Le niveau renommé : ni la classe ni son ``updated_at`` ne sont réécrits par l'ORM.
+        level = Level.objects.get(schoolyear_levels__school_year=self.school_year)
+        level.name = "Sixième"
+        level.save()
+        response = self.client.get(url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["level_name"], "Sixième")
+
+
+class PaginationTests(ApiTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for name in "CDE":
+            Classroom.objects.create(school_year_level=cls.classroom.school_year_level, name=name, capacity=3)
+
+    def pages(self, url, params=None):
+        ids = []
+        while url:
+            data = self.client.get(url, params).json()
+            ids.append([row["id"] for row in data["results"]])
+            url, params = data["next"], None
+        return ids
+
+    def test_next_links_walk_every_row_once(self):
+        pages = self.pages(reverse("api_list", args=["classrooms"]), {"limit": 2, "fields": "id"})
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), sorted(Classroom.objects.values_list("pk", flat=True)))
+
+    def test_inserts_do_not_shift_pages(self):
+        first = self.client.get(reverse("api_list", args=["classrooms"]), {"limit": 2}).json()
+        Classroom.objects.create(school_year_level=self.classroom.school_year_level, name="F", capacity=3)
+        rest = self.pages(first["next"])
+        ids = [row["id"] for row in first["results"]] + sum(rest, [])
+        self.assertEqual(ids, sorted(Classroom.objects.values_list("pk", flat=True)))
+
+    def test_next_link_keeps_the_query(self):
+        data = self.client.get(reverse("api_list", args=["classrooms"]), {"limit": 2, "fields": "id,name"}).json()
+        self.assertIn("fields=id%2Cname", data["next"])
+        self.assertIn("limit=2", data["next"])
+
+    def test_tampered_cursor_is_rejected(self):
+        response = self.client.get(reverse("api_list", args=["classrooms"]), {"cursor": "pas-un-curseur"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["detail"], "Curseur invalide.")
+
+
+class FieldSelectionTests(ApiTestCase):
+    def test_only_requested_fields_are_returned(self):
+        data = self.client.get(reverse("api_list", args=["classrooms"]), {"fields": "id, level_name"}).json()
+        self.assertEqual(data["results"][0], {"id": self.classroom.pk, "level_name": "6e"})
+        detail = self.client.get(reverse("api_detail", args=["classrooms", self.classroom.pk]), {"fields": "name"})
+        self.assertEqual(detail.json(), {"name": "A"})
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(reverse("api_list", args=["classrooms"]), {"fields": "id,secret"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["detail"], "Champs inconnus : secret.")
+
+    def test_field_selection_is_part_of_the_list_etag(self):
+        url = reverse("api_list", args=["classrooms"])
+        etag = self.client.get(url, {"fields": "id"})["ETag"]
+        self.assertEqual(self.client.get(url, {"fields": "name"}, headers={"if_none_match": etag}).status_code, 200)
+
+
+class MarkBulkTests(ApiTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.teacher = make_teacher(cls.school_year, "prof@x.io")
+        cls.classroom_subject = make_classroom_subject(cls.classroom, teacher=cls.teacher)
+        cls.evaluation = Evaluation.objects.create(
+            classroom_subject=cls.classroom_subject, name="Devoir 1", date=datetime.date(2024, 10, 1)
+        )
+        cls.enrollments = [
+            enroll(make_student(f"eleve{index}@x.io"), cls.classroom) for index in range(2)
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.teacher.user)
+
+    def post_marks(self, rows):
+        return self.post_json(
+            reverse("api_bulk_marks", args=[self.classroom_subject.pk]),
+            {"evaluation": self.evaluation.pk, "rows": rows},
+        )
+
+    def test_valid_batch_creates_then_updates(self):
+        rows = [{"enrollment": enrollment.pk, "score": "12.5"} for enrollment in self.enrollments]
+        self.assertEqual(self.post_marks(rows).json()["created"], 2)
+        rows[0]["score"] = 15
+        response = self.post_marks(rows)
+        self.assertEqual(response.json()["updated"], 2)
+        self.assertEqual(Mark.objects.get(enrollment=self.enrollments[0]).score, 15)
+
+    def test_invalid_rows_are_reported_and_nothing_is_written(self):
+        response = self.post_marks([
+            {"enrollment": self.enrollments[0].pk, "score": "12"},
+            {"enrollment": self.enrollments[1].pk, "score": "NaN"},
+            {"enrollment": self.enrollments[1].pk, "score": "Infinity"},
+            {"enrollment": 999999, "score": "10"},
+            {"enrollment": self.enrollments[0].pk, "score": "25"},
+        ])
+        self.assertEqual(response.status_code, 400)
+        results = response.json()["results"]
+        self.assertEqual([result["status"] for result in results], ["valid", *["invalid"] * 4])
+        self.assertEqual(results[1]["errors"], {"score": "Nombre attendu."})
+        self.assertEqual(results[2]["errors"], {"score": "Nombre attendu."})
+        self.assertIn("enrollment", results[3]["errors"])
+        self.assertIn("score", results[4]["errors"])
+        self.assertFalse(Mark.objects.exists())
+
+    def concurrent_mark(self):
+        prepare = MarkBulkView.prepare
+
+        def prepare_then_concurrent_write(view, *args):
+            # Un autre lot crée une note entre la validation et l'écriture.
+            prepared = prepare(view, *args)
+            Mark.objects.create(evaluation=self.evaluation, enrollment=self.enrollments[0], score=5)
+            return prepared
+
+        return mock.patch.object(MarkBulkView, "prepare", prepare_then_concurrent_write)
+
+    def test_marks_created_concurrently_are_updated(self):
+        rows = [{"enrollment": enrollment.pk, "score": "12.5"} for enrollment in self.enrollments]
+        with self.concurrent_mark():
+            response = self.post_marks(rows)
+        self.assertEqual((response.json()["created"], response.json()["updated"]), (1, 1))
+        self.assertEqual(Mark.objects.get(enrollment=self.enrollments[0]).score, 12.5)
+
+    def test_unique_violation_is_a_conflict(self):
+        rows = [{"enrollment": enrollment.pk, "score": "12.5"} for enrollment in self.enrollments]
+        with self.concurrent_mark(), mock.patch.object(MarkBulkView, "lock", BulkWriteView.lock):
+            response = self.post_marks(rows)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Mark.objects.count(), 1)
+
+
+    def test_other_teacher_is_denied(self):
+        self.client.force_login(make_teacher(self.school_year, "autre@x.io").user)
+        self.assertEqual(self.post_marks([{"enrollment": self.enrollments[0].pk, "score": 1}]).status_code, 403)
+
+
+class AttendanceBulkTests(ApiTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        grant(cls.user, "change_attendance")
+        cls.enrollment = enroll(make_student("eleve@x.io"), cls.classroom)
+
+    def test_attendance_recorded_concurrently_is_updated(self):
+        prepare = AttendanceBulkView.prepare
+
+        def prepare_then_concurrent_write(view, target, *args):
+            prepared = prepare(view, target, *args)
+            Attendance.objects.create(
+                enrollment=self.enrollment, classroom=target, date=datetime.date(2024, 10, 1)
+            )
+            return prepared
+
+        with mock.patch.object(AttendanceBulkView, "prepare", prepare_then_concurrent_write):
+            response = self.post_json(
+                reverse("api_bulk_attendance", args=[self.classroom.pk]),
+                {"date": "2024-10-01", "rows": [{"enrollment": self.enrollment.pk, "status": "absent"}]},
+            )
+        self.assertEqual(response.json()["updated"], 1, response.content)
+        self.assertEqual(Attendance.objects.get().status, "absent")
+
+
+class EnrollmentBulkTests(ApiTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        grant(cls.user, "add_enrollment")
+        cls.students = [make_student(f"eleve{index}@x.io") for index in range(4)]
+
+    def post_enrollments(self, students):
+        return self.post_json(
+            reverse("api_bulk_enrollments", args=[self.classroom.pk]),
+            {"rows": [{"student": student.pk} for student in students]},
+        )
+
+    def test_enrolls_with_generated_numbers(self):
+        response = self.post_enrollments(self.students[:2])
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()["created"], 2)
+        numbers = Enrollment.objects.filter(classroom=self.classroom).values_list("enrollment_number", flat=True)
+        self.assertTrue(all(numbers))
+        self.assertEqual(len(set(numbers)), 2)
+
+    def test_capacity_is_enforced(self):
+        response = self.post_enrollments(self.students)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Enrollment.objects.exists())
+
+    def test_capacity_is_checked_again_under_lock(self):
+        get_target = EnrollmentBulkView.get_target
+
+        def concurrent_enrollment(view, pk):
+            # Une autre requête remplit la classe entre la lecture et l'écriture.
+            target = get_target(view, pk)
+            enroll(self.students[3], self.classroom)
+            enroll(self.students[2], self.classroom)
+            return target
+
+        with mock.patch.object(EnrollmentBulkView, "get_target", concurrent_enrollment):
+            response = self.post_enrollments(self.students[:2])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Capacité insuffisante", response.json()["detail"])
+        self.assertEqual(Enrollment.objects.count(), 2)
+
+    def test_student_enrolled_concurrently_elsewhere_is_a_conflict(self):
+        prepare = EnrollmentBulkView.prepare
+
+        def prepare_then_concurrent_write(view, *args):
+            prepared = prepare(view, *args)
+            enroll(self.students[1], classrooms_of(self.school_year)[1])
+            return prepared
+
+        with mock.patch.object(EnrollmentBulkView, "prepare", prepare_then_concurrent_write):
+            response = self.post_enrollments(self.students[:2])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["errors"], {"1": {"student": "Élève déjà inscrit pour cette année scolaire."}})
+        self.assertFalse(Enrollment.objects.filter(classroom=self.classroom).exists())
+
+    def test_error_rows_are_reported(self):
+        enroll(self.students[0], classrooms_of(self.school_year)[1])
+        response = self.post_enrollments([self.students[0], self.students[1], self.students[1]])
+        self.assertEqual(response.status_code, 400)
+        statuses = [result["status"] for result in response.json()["results"]]
+        self.assertEqual(statuses, ["invalid", "valid", "invalid"])
+
+
+class SyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Année en cours : la synchronisation ne porte que sur elle.
+        cls.school_year = make_school_year(start=datetime.date.today() - datetime.timedelta(days=30))
+        cls.classroom = classrooms_of(cls.school_year)[0]
+        cls.teacher = make_teacher(cls.school_year, "prof@x.io")
+        cls.classroom_subject = make_classroom_subject(cls.classroom, teacher=cls.teacher)
+        cls.evaluation = Evaluation.objects.create(
+            classroom_subject=cls.classroom_subject, name="Devoir 1", date=datetime.date.today()
+        )
+        cls.enrollment = enroll(make_student("eleve@x.io"), cls.classroom)
+
+    def setUp(self):
+        self.client.force_login(self.teacher.user)
+
+    def pull(self, cursor=None):
+        return self.client.get(reverse("api_sync"), {"cursor": cursor} if cursor else {}).json()
+
+    def push(self, marks):
+        return self.client.post(reverse("api_sync"), json.dumps({"marks": marks}), content_type="application/json")
+
+    def test_pull_without_cursor_is_a_snapshot(self):
+        data = self.pull()
+        self.assertTrue(data["reset"])
+        self.assertEqual([row["id"] for row in data["changes"]["enrollment"]], [self.enrollment.pk])
+
+    def test_pull_returns_changes_after_the_cursor(self):
+        cursor = self.pull()["cursor"]
+        self.assertEqual(self.pull(cursor)["changes"], {})
+        mark = Mark.objects.create(evaluation=self.evaluation, enrollment=self.enrollment, score=12)
+        data = self.pull(cursor)
+        self.assertFalse(data["reset"])
+        self.assertEqual([row["id"] for row in data["changes"]["mark"]], [mark.pk])
+        mark_id = mark.pk
+        mark.delete()
+        self.assertEqual(self.pull(data["cursor"])["deleted"], {"mark": [mark_id]})
+
+    def test_each_classroom_has_its_own_counter(self):
+        other = classrooms_of(self.school_year)[1]
+        before = SyncCounter.objects.state([self.classroom.pk, other.pk])
+        numbers = SyncCounter.objects.allocate({other.pk: 2, self.classroom.pk: 1})
+        self.assertEqual(numbers[other.pk], range(before[other.pk][0] + 1, before[other.pk][0] + 3))
+        self.assertEqual(numbers[self.classroom.pk], range(before[self.classroom.pk][0] + 1, before[self.classroom.pk][0] + 2))
+        cursor = self.pull()["cursor"]
+        # Une écriture dans une classe non suivie n'avance pas le curseur.
+        enroll(make_student("ailleurs@x.io"), other)
+        self.assertEqual(self.pull(cursor), {"cursor": cursor, "reset": False, "changes": {}, "deleted": {}})
+
+    def test_cursor_covers_each_followed_classroom(self):
+        other = classrooms_of(self.school_year)[1]
+        make_classroom_subject(other, "Français", teacher=self.teacher)
+        cursor = self.pull()["cursor"]
+        self.assertEqual(len(cursor.partition(".")[0].split("-")), 2)
+        # Changement de classe entre deux classes suivies : une mise à jour, pas une suppression.
+        self.enrollment.classroom = other
+        self.enrollment.save()
+        data = self.pull(cursor)
+        self.assertFalse(data["reset"])
+        self.assertEqual([row["classroom"] for row in data["changes"]["enrollment"]], [other.pk])
+        self.assertEqual(data["deleted"], {})
+        self.assertTrue(self.pull(cursor.replace("-", "-9", 1))["reset"])
+
+    def test_pruning_resets_stale_cursors_only(self):
+        cursor = self.pull()["cursor"]
+        Mark.objects.create(evaluation=self.evaluation, enrollment=self.enrollment, score=12)
+        fresh = self.pull(cursor)["cursor"]
+        call_command("prune_sync_changes", days=0, stdout=StringIO())
+        self.assertTrue(self.pull(cursor)["reset"])
+        self.assertFalse(self.pull(fresh)["reset"])
+
+    def test_push_applies_valid_rows_and_reports_invalid_ones(self):
+        response = self.push([
+            {"evaluation": self.evaluation.pk, "enrollment": self.enrollment.pk, "score": "14"},
+            {"evaluation": self.evaluation.pk, "enrollment": self.enrollment.pk, "score": "NaN"},
+            {"evaluation": self.evaluation.pk, "enrollment": 999999, "score": "10"},
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]["marks"]
+        self.assertEqual([result["status"] for result in results], ["applied", "invalid", "invalid"])
+        self.assertEqual(results[1]["errors"], {"score": "Nombre attendu."})
+        self.assertEqual(Mark.objects.get().score, 14)
+
+    def test_push_on_a_stale_version_is_a_conflict(self):
+        mark = Mark.objects.create(evaluation=self.evaluation, enrollment=self.enrollment, score=12)
+        response = self.push([{
+            "evaluation": self.evaluation.pk,
+            "enrollment": self.enrollment.pk,
+            "score": "15",
+            "base_updated_at": "2000-01-01T00:00:00Z",
+        }])
+        result = response.json()["results"]["marks"][0]
+        self.assertEqual(result["status"], "conflict")
+        self.assertEqual(result["server"]["id"], mark.pk)
+        mark.refresh_from_db()
+        self.assertEqual(mark.score, 12)
+
+    def test_non_teacher_is_denied(self):
+        self.client.force_login(make_user("parent@x.io"))
+        self.assertEqual(self.client.get(reverse("api_sync")).status_code, 403)
@@ -0,0 +1,14 @@
+from django.urls import path
+
+from api.bulk import AttendanceBulkView, EnrollmentBulkView, MarkBulkView
+from api.sync import SyncView
+from api.views import ResourceDetailView, ResourceListView
+
+urlpatterns = [
+    path("classroom-subjects/<int:pk>/marks/", MarkBulkView.as_view(), name="api_bulk_marks"),
+    path("classrooms/<int:pk>/attendance/", AttendanceBulkView.as_view(), name="api_bulk_attendance"),
+    path("classrooms/<int:pk>/enrollments/", EnrollmentBulkView.as_view(), name="api_bulk_enrollments"),
+    path("sync/", SyncView.as_view(), name="api_sync"),
+    path("<slug:resource>/", ResourceListView.as_view(), name="api_list"),
+    path("<slug:resource>/<int:pk>/", ResourceDetailView.as_view(), name="api_detail"),
+]
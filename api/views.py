@@ -0,0 +1,271 @@
+import base64
+import hashlib
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views import View
+
+from api.resources import RESOURCES
+from core.cache import get_model_versions
+from core.mixins import ReplicaReadMixin
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class ApiError(Exception):
+    def __init__(self, status, message, errors=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.errors = errors
+
+
+def encode_cursor(pk):
+    return base64.urlsafe_b64encode(str(pk).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except ValueError:
+        raise ApiError(400, "Curseur invalide.")
+
+
+class JsonApiMixin:
+    """Authentification obligatoire et erreurs ``ApiError`` rendues en JSON."""
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            if not request.user.is_authenticated:
+                raise ApiError(401, "Authentification requise.")
+            self.check_permissions(request)
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as exc:
+            body = {"detail": exc.message}
+            if exc.errors:
+                body["errors"] = exc.errors
+            return JsonResponse(body, status=exc.status)
+
+    def check_permissions(self, request):
+        pass
+
+    def parse_json(self):
+        try:
+            data = json.loads(self.request.body or b"{}")
+        except ValueError:
+            raise ApiError(400, "Corps JSON invalide.")
+        if not isinstance(data, dict):
+            raise ApiError(400, "Le corps doit être un objet JSON.")
+        return data
+
+
+class ResourceMixin(ReplicaReadMixin, JsonApiMixin):
+    """
+    Socle commun des vues de ressources : permissions du modèle, champs
+    demandés et en-têtes de validation (ETag / Last-Modified).
+    """
+    action_permissions = {
+        "GET": "view",
+        "HEAD": "view",
+        "POST": "add",
+        "PUT": "change",
+        "PATCH": "change",
+        "DELETE": "delete",
+    }
+
+    def dispatch(self, request, *args, **kwargs):
+        self.resource = RESOURCES.get(kwargs.pop("resource"))
+        if self.resource is None:
+            raise Http404
+        return super().dispatch(request, *args, **kwargs)
+
+    def check_permissions(self, request):
+        action = self.action_permissions.get(request.method)
+        if action and not self.resource.has_permission(request.user, action):
+            raise ApiError(403, "Permission refusée.")
+
+    def get_field_names(self):
+        requested = self.request.GET.get("fields")
+        if not requested:
+            return list(self.resource.fields)
+        names = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.resource.fields]
+        if unknown:
+            raise ApiError(400, f"Champs inconnus : {', '.join(unknown)}.")
+        return names
+
+    def read(self, queryset, names):
+        """
+        Lignes de ``queryset`` réduites aux champs ``names``, en une requête.
+        Chaque ligne est précédée de sa clé primaire : ``[(pk, {champ: valeur}), …]``.
+        """
+        paths = [self.resource.fields[name] for name in names]
+        return [(row[0], dict(zip(names, row[1:]))) for row in queryset.values_list("pk", *paths)]
+
+    def conditional(self, etag, last_modified, build_response):
+        """
+        Répond 304 (ou 412 pour un ``If-Match`` périmé) sans construire la
+        réponse si le client a déjà la bonne version.
+        """
+        # Les dates HTTP sont à la seconde près.
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(self.request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = build_response()
+        response["ETag"] = etag
+        if timestamp is not None:
+            response["Last-Modified"] = http_date(timestamp)
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    def parse_body(self):
+        data = self.parse_json()
+        unknown = sorted(set(data) - set(self.resource.writable))
+        if unknown:
+            raise ApiError(400, f"Champs non modifiables : {', '.join(unknown)}.")
+        return data
+
+    def save(self, obj, data):
+        for name, value in data.items():
+            setattr(obj, self.resource.writable[name], value)
+        if hasattr(obj, "updated_by_id"):
+            if obj._state.adding:
+                obj.created_by = self.request.user
+            obj.updated_by = self.request.user
+        try:
+            # Les champs d'abord : ``clean()`` suppose les relations renseignées et existantes.
+            obj.clean_fields()
+            obj.clean()
+            obj.validate_unique()
+            obj.validate_constraints()
+            with transaction.atomic():
+                obj.save()
+        except ValidationError as exc:
+            raise ApiError(400, "Données invalides.", getattr(exc, "message_dict", {"__all__": exc.messages}))
+        except IntegrityError as exc:
+            raise ApiError(409, str(exc))
+        return obj
+
+
+def make_etag(*parts):
+    digest = hashlib.md5(":".join(str(part) for part in parts).encode(), usedforsecurity=False).hexdigest()
+    return f'"{digest}"'
+
+
+class ResourceListView(ResourceMixin, View):
+    """
+    ``GET`` : page de résultats triés par identifiant, pagination par curseur
+    (``?cursor=``, ``?limit=``) : chaque page est un ``WHERE id > …`` indexé,
+    quel que soit son rang. ``POST`` : création.
+
+    L'ETag d'une liste est dérivé des versions des modèles lus par la
+    ressource (``core.cache``) : une création, une modification ou une
+    suppression le change, et le client qui interroge à nouveau reçoit un 304
+    sinon, sans requête SQL. Une liste n'a pas de ``Last-Modified`` : la date
+    de la dernière modification ne voit pas les suppressions.
+    """
+
+    def get(self, request, *args, **kwargs):
+        names = self.get_field_names()
+        queryset = self.resource.get_queryset()
+        for param, path in self.resource.filters.items():
+            if param in request.GET:
+                try:
+                    queryset = queryset.filter(**{path: int(request.GET[param])})
+                except ValueError:
+                    raise ApiError(400, f"Le filtre {param} doit être un entier.")
+        try:
+            limit = min(int(request.GET.get("limit", DEFAULT_LIMIT)), MAX_LIMIT)
+        except ValueError:
+            raise ApiError(400, "limit doit être un entier.")
+        if limit < 1:
+            raise ApiError(400, "limit doit être positif.")
+
+        versions = get_model_versions(self.resource.dependencies)
+        etag = make_etag(self.resource.name, *versions, request.get_full_path())
+
+        def build_response():
+            page = queryset.order_by("pk")
+            cursor = request.GET.get("cursor")
+            if cursor:
+                page = page.filter(pk__gt=decode_cursor(cursor))
+            # Une ligne de plus pour savoir s'il existe une page suivante.
+            rows = self.read(page[:limit + 1], names)
+            next_url = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                params = request.GET.copy()
+                params["cursor"] = encode_cursor(rows[-1][0])
+                next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+            return JsonResponse({"results": [row for _, row in rows], "next": next_url})
+
+        return self.conditional(etag, None, build_response)
+
+    def post(self, request, *args, **kwargs):
+        obj = self.save(self.resource.model(), self.parse_body())
+        _, row = self.read(self.resource.get_queryset().filter(pk=obj.pk), self.get_field_names())[0]
+        response = JsonResponse(row, status=201)
+        response["Location"] = request.build_absolute_uri(f"{request.path}{obj.pk}/")
+        return response
+
+
+class ResourceDetailView(ResourceMixin, View):
+    """
+    ``GET``, ``PATCH``/``PUT`` et ``DELETE`` d'un objet ; ``If-Match`` protège
+    les écritures concurrentes. L'ETag désigne la version de l'objet, quels que
+    soient les champs demandés.
+
+    Comme pour les listes, il inclut les versions des modèles lus par la
+    ressource : les champs joints (nom du niveau, de l'établissement…) et le
+    libellé, recalculé sans toucher ``updated_at``, le changent aussi. Pour la
+    même raison, un ``GET`` n'a pas de ``Last-Modified``.
+    """
+
+    def get_state(self, pk):
+        updated_at = self.resource.get_queryset().filter(pk=pk).values_list("updated_at", flat=True).first()
+        if updated_at is None:
+            raise ApiError(404, "Objet introuvable.")
+        versions = get_model_versions(self.resource.dependencies)
+        return make_etag(self.resource.name, *versions, pk, updated_at), updated_at
+
+    def get(self, request, pk, *args, **kwargs):
+        names = self.get_field_names()
+        etag, _ = self.get_state(pk)
+        return self.conditional(
+            etag,
+            None,
+            lambda: JsonResponse(self.read(self.resource.get_queryset().filter(pk=pk), names)[0][1]),
+        )
+
+    def check_precondition(self, pk):
+        etag, updated_at = self.get_state(pk)
+        response = get_conditional_response(self.request, etag=etag, last_modified=int(updated_at.timestamp()))
+        if response is not None and response.status_code == 412:
+            raise ApiError(412, "L'objet a été modifié depuis sa lecture.")
+
+    def patch(self, request, pk, *args, **kwargs):
+        data = self.parse_body()
+        self.check_precondition(pk)
+        self.save(self.resource.get_queryset().get(pk=pk), data)
+        etag, updated_at = self.get_state(pk)
+        _, row = self.read(self.resource.get_queryset().filter(pk=pk), self.get_field_names())[0]
+        response = JsonResponse(row)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(int(updated_at.timestamp()))
+        return response
+
+    def put(self, request, pk, *args, **kwargs):
+        missing = sorted(set(self.resource.writable) - set(self.parse_body()))
+        if missing:
+            raise ApiError(400, f"Champs manquants : {', '.join(missing)}.")
+        return self.patch(request, pk, *args, **kwargs)
+
+    def delete(self, request, pk, *args, **kwargs):
+        self.check_precondition(pk)
+        self.resource.get_queryset().filter(pk=pk).delete()
+        return HttpResponse(status=204)
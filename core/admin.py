@@ -1,6 +1,14 @@
-from django.contrib import admin
-
-from django.utils.translation import gettext_lazy as _
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _, ngettext
+
+from core.admin_tools import LargeTableAdminMixin, action_with_form, scoped_filter, stamp_update
+from core.changes import record_changes
+from core.placement import move_enrollments
+from core.tasks import archive_school_year
 # Register your models here.
 from core.models import (
      School,
@@ -12,19 +20,53 @@ from core.models import (
      SchoolYearLevel,
      Classroom,
      Subject,
+     SubjectYear,
      ClassroomSubject,
      Teacher,
      Student,
-    # Enrollment,
+     StudentGuardian,
+     Enrollment,
+     EnrollmentSequence,
+     SchoolYearArchive,
     # EvalType,
     # MarkType,
-    # Evaluation,
-    # Timetable,
-    # Timeslot,
-    # TimetableEntry,
+     Evaluation,
+     Mark,
+     Attendance,
+     Room,
+     Timeslot,
+     TimetableEntry,
 )
 
 
+class ChangeClassroomForm(forms.Form):
+    classroom = forms.ModelChoiceField(queryset=Classroom.objects.none(), label=_("Nouvelle classe"))
+
+    def __init__(self, *args, queryset, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Classes des années scolaires de la sélection.
+        self.fields["classroom"].queryset = (
+            Classroom.objects
+            .filter(school_year_level__school_year__in=queryset.values("school_year"))
+            .select_related("school_year_level")
+            .order_by("display_label")
+        )
+
+
+class CoefficientForm(forms.Form):
+    coefficient = forms.DecimalField(
+        max_digits=4,
+        decimal_places=2,
+        min_value=0.01,
+        required=False,
+        label=_("Coefficient"),
+        help_text=_("Laisser vide pour reprendre le coefficient de la matière pour l'année."),
+    )
+
+    def __init__(self, *args, queryset, **kwargs):
+        super().__init__(*args, **kwargs)
+
+
 @admin.register(School)
 class SchoolAdmin(admin.ModelAdmin):
     list_display = ("name", "ville", "quartier", "foundation_date", "created_at", "updated_at")
@@ -60,6 +102,7 @@ class SchoolYearAdmin(admin.ModelAdmin):
     list_filter = ("school", "start_date")
     search_fields = ("school__name", "name")
     readonly_fields = ("name", "created_at", "created_by", "updated_at", "updated_by")
+    actions = ("archive",)
 
     def save_model(self, request, obj, form, change):
         if not obj.pk:
@@ -67,6 +110,24 @@ class SchoolYearAdmin(admin.ModelAdmin):
         obj.updated_by = request.user
         super().save_model(request, obj, form, change)
 
+    @admin.action(description=_("Archiver les années closes (export puis suppression)"), permissions=["delete"])
+    def archive(self, request, queryset):
+        today = timezone.localdate()
+        closed = list(queryset.filter(end_date__lt=today).values_list("pk", flat=True))
+        for pk in closed:
+            archive_school_year.enqueue(school_year_id=pk, user=request.user)
+        skipped = queryset.count() - len(closed)
+        if skipped:
+            self.message_user(request, ngettext(
+                "%d année en cours ignorée.", "%d années en cours ignorées.", skipped
+            ) % skipped, messages.WARNING)
+        if closed:
+            self.message_user(request, ngettext(
+                "%d archivage en file : avancement dans les tâches de fond.",
+                "%d archivages en file : avancement dans les tâches de fond.",
+                len(closed),
+            ) % len(closed))
+
 
 
 @admin.register(Grade)
@@ -133,13 +194,20 @@ class SchoolYearLevelAdmin(admin.ModelAdmin):
         'updated_at', 
         'updated_by',
     )
-    list_filter = ('school_year', 'grade', 'level', 'is_active')
+    # Cycles et niveaux proposés : ceux de l'établissement de l'année choisie.
+    list_filter = (
+        'school_year',
+        ('grade', scoped_filter('school_year__id__exact', 'school__school_years')),
+        ('level', scoped_filter('school_year__id__exact', 'grade__school__school_years')),
+        'is_active',
+    )
     search_fields = (
         'school_year__name', 
         'grade__name', 
         'level__name',
     )
     readonly_fields = ('created_at', 'created_by', 'updated_at', 'updated_by')
+    actions = ('activate', 'deactivate')
 
     def save_model(self, request, obj, form, change):
         if not change:
@@ -147,31 +215,61 @@ class SchoolYearLevelAdmin(admin.ModelAdmin):
         obj.updated_by = request.user
         super().save_model(request, obj, form, change)
 
+    @admin.action(description=_("Activer les niveaux sélectionnés"), permissions=["change"])
+    def activate(self, request, queryset):
+        count = stamp_update(queryset, request.user, is_active=True)
+        self.message_user(request, ngettext("%d niveau activé.", "%d niveaux activés.", count) % count)
+
+    @admin.action(description=_("Désactiver les niveaux sélectionnés"), permissions=["change"])
+    def deactivate(self, request, queryset):
+        count = stamp_update(queryset, request.user, is_active=False)
+        self.message_user(request, ngettext("%d niveau désactivé.", "%d niveaux désactivés.", count) % count)
+
 
 @admin.register(Classroom)
 class ClassroomAdmin(admin.ModelAdmin):
-    list_display = ("__str__", "school_year_level", "grade_option", "created_at")
-    list_filter = ("school_year_level__school_year", "school_year_level__grade", "grade_option")
+    list_display = ("__str__", "school_year_level", "grade_option", "capacity", "created_at")
+    list_filter = (
+        "school_year_level__school_year",
+        (
+            "school_year_level__grade",
+            scoped_filter("school_year_level__school_year__id__exact", "school__school_years"),
+        ),
+        (
+            "grade_option",
+            scoped_filter("school_year_level__school_year__id__exact", "grade__school__school_years"),
+        ),
+    )
     search_fields = ("name",)
     autocomplete_fields = ("school_year_level", "grade_option", "created_by", "updated_by")
     readonly_fields = ("created_at", "updated_at", "created_by", "updated_by")
 
 
 
+class SubjectYearInline(admin.TabularInline):
+    model = SubjectYear
+    extra = 0
+    fields = ("school_year", "is_active", "coefficient")
+    autocomplete_fields = ("school_year",)
+
+
 @admin.register(Subject)
 class SubjectAdmin(admin.ModelAdmin):
     list_display = (
         "name", 
-        "school_year", 
+        "school", 
+        "coefficient",
+        "is_active",
         "created_at", 
         "created_by", 
         "updated_at", 
         "updated_by"
     )
-    list_filter = ("school_year",)
-    search_fields = ("name", "school_year__name")
+    list_filter = ("school", "is_active")
+    search_fields = ("name", "school__name")
     ordering = ("name",)
     readonly_fields = ("created_at", "updated_at", "created_by", "updated_by")
+    inlines = [SubjectYearInline]
 
     def save_model(self, request, obj, form, change):
         if not change:
@@ -180,25 +278,44 @@ class SubjectAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
+@admin.register(SubjectYear)
+class SubjectYearAdmin(admin.ModelAdmin):
+    list_display = ("subject", "school_year", "is_active", "coefficient", "updated_at")
+    list_filter = ("school_year", "is_active")
+    search_fields = ("subject__name", "school_year__name")
+    autocomplete_fields = ("subject", "school_year")
+    readonly_fields = ("created_at", "updated_at", "created_by", "updated_by")
+
+
 @admin.register(ClassroomSubject)
-class ClassroomSubjectAdmin(admin.ModelAdmin):
+class ClassroomSubjectAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = (
         "subject", 
         "classroom", 
         "coefficient",
+        "weekly_hours",
+        "teacher",
         "created_at", 
         "created_by", 
         "updated_at", 
         "updated_by"
     )
-    list_filter = ("classroom__school_year_level__school_year",)
+    list_filter = (
+        "classroom__school_year_level__school_year",
+        (
+            "classroom__school_year_level",
+            scoped_filter("classroom__school_year_level__school_year__id__exact", "school_year"),
+        ),
+    )
     search_fields = (
         "subject__name", 
         "classroom__name", 
         "classroom__school_year_level__school_year__name"
     )
     ordering = ("classroom__name", "subject__name")
+    autocomplete_fields = ("teacher",)
     readonly_fields = ("created_at", "updated_at", "created_by", "updated_by")
+    actions = ("set_coefficient",)
 
     def save_model(self, request, obj, form, change):
         if not change:
@@ -206,17 +323,133 @@ class ClassroomSubjectAdmin(admin.ModelAdmin):
         obj.updated_by = request.user
         super().save_model(request, obj, form, change)
 
+    @action_with_form(CoefficientForm, _("Modifier le coefficient"))
+    def set_coefficient(self, request, queryset, data):
+        with transaction.atomic():
+            count = stamp_update(queryset, request.user, coefficient=data["coefficient"])
+            record_changes(ClassroomSubject, queryset.values_list("pk", "classroom_id"))
+        self.message_user(request, ngettext("%d coefficient modifié.", "%d coefficients modifiés.", count) % count)
+
 
 @admin.register(Teacher)
 class TeacherAdmin(admin.ModelAdmin):
-    list_display = ('user', 'school_year', 'created_at', 'created_by')
+    list_display = ('user', 'school_year', 'service_hours', 'created_at', 'created_by')
     search_fields = ('user__first_name', 'user__last_name', 'school_year__name')
     list_filter = ('school_year',)
     readonly_fields = ("created_at", "updated_at", "created_by", "updated_by")
 
 @admin.register(Student)
-class StudentAdmin(admin.ModelAdmin):
-    list_display = ('user', 'classroom', 'schoolyear', 'enrollment_number', 'created_at', 'created_by')
-    search_fields = ('user__first_name', 'user__last_name', 'enrollment_number')
-    list_filter = ('schoolyear', 'classroom')
+class StudentAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('user', 'created_at', 'created_by')
+    search_fields = ('user__first_name', 'user__last_name', 'user__email', 'enrollments__enrollment_number')
+    readonly_fields = ("created_at", "updated_at", "created_by", "updated_by")
+
+
+@admin.register(Enrollment)
+class EnrollmentAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('student', 'classroom', 'school_year', 'enrollment_number', 'is_current', 'created_at', 'created_by')
+    search_fields = ('student__user__first_name', 'student__user__last_name', 'enrollment_number')
+    list_filter = (
+        'school_year',
+        ('classroom', scoped_filter('school_year__id__exact', 'school_year_level__school_year')),
+        'is_current',
+    )
+    autocomplete_fields = ('student',)
+    readonly_fields = ("created_at", "updated_at", "created_by", "updated_by")
+    actions = ('change_classroom',)
+
+    @action_with_form(ChangeClassroomForm, _("Changer de classe"))
+    def change_classroom(self, request, queryset, data):
+        try:
+            count = move_enrollments(queryset, data["classroom"], request.user)
+        except ValidationError as exc:
+            self.message_user(request, " ".join(exc.messages), messages.ERROR)
+        else:
+            self.message_user(request, ngettext("%d élève changé de classe.", "%d élèves changés de classe.", count) % count)
+
+
+@admin.register(StudentGuardian)
+class StudentGuardianAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('guardian', 'student', 'relationship', 'is_primary', 'created_at')
+    search_fields = ('guardian__email', 'guardian__last_name', 'student__user__last_name', 'student__enrollments__enrollment_number')
+    list_filter = ('relationship', 'is_primary')
+    list_select_related = ('guardian', 'student__user')
+    autocomplete_fields = ('guardian', 'student')
+    readonly_fields = ("created_at", "updated_at", "created_by", "updated_by")
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        obj.updated_by = request.user
+        super().save_model(request, obj, form, change)
+
+
+@admin.register(EnrollmentSequence)
+class EnrollmentSequenceAdmin(admin.ModelAdmin):
+    list_display = ('school_year', 'last_value')
+    list_select_related = ('school_year__school',)
+    search_fields = ('school_year__name', 'school_year__school__name')
+
+
+@admin.register(Evaluation)
+class EvaluationAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ("name", "classroom_subject", "date", "max_score")
+    list_filter = ("classroom_subject__classroom__school_year_level__school_year", "date")
+    search_fields = ("name", "classroom_subject__display_label")
+    list_select_related = ("classroom_subject",)
+    readonly_fields = ("created_at", "updated_at", "created_by", "updated_by")
+
+
+@admin.register(Mark)
+class MarkAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ("enrollment", "evaluation", "score", "updated_at")
+    search_fields = ("enrollment__display_label", "evaluation__name")
+    list_select_related = ("enrollment", "evaluation")
+    raw_id_fields = ("enrollment", "evaluation")
+    readonly_fields = ("created_at", "updated_at", "created_by", "updated_by")
+
+
+@admin.register(Attendance)
+class AttendanceAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ("enrollment", "classroom", "date", "status")
+    list_filter = ("status", "date")
+    search_fields = ("enrollment__display_label",)
+    list_select_related = ("enrollment", "classroom")
+    raw_id_fields = ("enrollment", "classroom")
+    readonly_fields = ("created_at", "updated_at", "created_by", "updated_by")
+
+
+@admin.register(Room)
+class RoomAdmin(admin.ModelAdmin):
+    list_display = ("name", "school", "capacity")
+    list_filter = ("school",)
+    search_fields = ("name",)
+    readonly_fields = ("created_at", "updated_at", "created_by", "updated_by")
+
+
+@admin.register(Timeslot)
+class TimeslotAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "school_year", "day", "start_time", "end_time")
+    list_filter = ("school_year", "day")
     readonly_fields = ("created_at", "updated_at", "created_by", "updated_by")
+
+
+@admin.register(TimetableEntry)
+class TimetableEntryAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ("timeslot", "classroom_subject", "room")
+    list_filter = ("timeslot__school_year", "timeslot__day")
+    search_fields = ("classroom_subject__display_label", "room__name")
+    list_select_related = ("timeslot", "classroom_subject", "room")
+    raw_id_fields = ("classroom_subject",)
+    readonly_fields = ("created_at", "updated_at", "created_by", "updated_by")
+
+
+@admin.register(SchoolYearArchive)
+class SchoolYearArchiveAdmin(admin.ModelAdmin):
+    list_display = ("name", "school", "file", "created_at", "purged_at")
+    list_filter = ("school",)
+    search_fields = ("name", "school__name")
+    readonly_fields = [field.name for field in SchoolYearArchive._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,146 @@
+"""
+Outils communs aux pages d'administration des grandes tables.
+
+- ``EstimatedCountPaginator`` : au-delà d'un seuil, le nombre de lignes vient
+  des statistiques de la base au lieu d'un ``COUNT(*)`` complet.
+- ``LargeTableAdminMixin`` : ce paginateur, sans le second comptage
+  (``show_full_result_count``).
+- ``scoped_filter`` : filtre de relation dont les choix se limitent à l'année
+  scolaire sélectionnée, et qui reste masqué tant qu'aucune ne l'est.
+- ``stamp_update`` et ``action_with_form`` : actions en masse exécutées en un
+  seul ``UPDATE`` sur la sélection.
+"""
+import functools
+import json
+
+from django.contrib import admin
+from django.contrib.admin import helpers
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max
+from django.template.response import TemplateResponse
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from core.cache import bump_model_version
+
+
+def estimate_count(queryset):
+    """
+    Nombre de lignes approximatif de ``queryset``, ou ``None`` si la base ne
+    sait pas l'estimer sans les compter.
+
+    PostgreSQL : ``pg_class.reltuples`` pour une table entière, l'estimation
+    du planificateur (``EXPLAIN``) pour une sélection filtrée. Ailleurs, le plus
+    grand identifiant d'une table entière (lu sur l'index de la clé primaire).
+    """
+    connection = connections[queryset.db]
+    filtered = bool(queryset.query.where)
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            if not filtered:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+                # -1 tant que la table n'a jamais été analysée.
+                return row[0] if row and row[0] >= 0 else None
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]["Plan"]["Plan Rows"]
+    if filtered or queryset.model._meta.pk.get_internal_type() not in ("AutoField", "BigAutoField"):
+        return None
+    return queryset.model._default_manager.using(queryset.db).aggregate(last=Max("pk"))["last"] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """Compte exactement les petites sélections, estime les grandes."""
+    exact_threshold = 10_000
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is not None and estimate > self.exact_threshold:
+            return estimate
+        return super().count
+
+
+class LargeTableAdminMixin:
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+class ScopedRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """
+    Filtre de relation restreint à l'année scolaire choisie par un autre filtre
+    de la page (paramètre ``scope_parameter``) : seuls les objets liés à cette
+    année sont proposés (``scope_lookup``, chemin depuis le modèle lié). Sans
+    année choisie, le filtre n'a pas de choix et n'est pas affiché.
+    """
+    scope_parameter = None
+    scope_lookup = None
+
+    def field_choices(self, field, request, model_admin):
+        scope = request.GET.get(self.scope_parameter)
+        if not scope:
+            return []
+        ordering = self.field_admin_ordering(field, request, model_admin) or field.related_model._meta.ordering
+        related = field.related_model._default_manager.filter(**{self.scope_lookup: scope})
+        return [(obj.pk, str(obj)) for obj in related.order_by(*ordering)]
+
+
+def scoped_filter(scope_parameter, scope_lookup):
+    """
+    ``list_filter = (("classroom", scoped_filter("school_year__id__exact",
+    "school_year_level__school_year")),)``
+    """
+    return type(
+        "ScopedRelatedFieldListFilter",
+        (ScopedRelatedFieldListFilter,),
+        {"scope_parameter": scope_parameter, "scope_lookup": scope_lookup},
+    )
+
+
+def stamp_update(queryset, user, **values):
+    """
+    ``UPDATE`` unique des lignes de ``queryset`` avec ``values``, en renseignant
+    ``updated_by`` / ``updated_at``. Retourne le nombre de lignes modifiées.
+    """
+    count = queryset.update(updated_by=user, updated_at=timezone.now(), **values)
+    # update() ne déclenche pas post_save.
+    bump_model_version(queryset.model)
+    return count
+
+
+def action_with_form(form_class, description, permissions=("change",)):
+    """
+    Action d'administration précédée d'un formulaire (classe cible,
+    coefficient…). La première soumission affiche le formulaire pour la
+    sélection ; la seconde appelle ``func(modeladmin, request, queryset, data)``
+    avec les données validées. ``form_class`` reçoit la sélection
+    (``queryset=``) pour restreindre ses choix.
+    """
+    def decorator(func):
+        @admin.action(description=description, permissions=permissions)
+        @functools.wraps(func)
+        def action(modeladmin, request, queryset):
+            form = form_class(request.POST if "apply" in request.POST else None, queryset=queryset)
+            if form.is_bound and form.is_valid():
+                return func(modeladmin, request, queryset, form.cleaned_data)
+            return TemplateResponse(request, "admin/action_form.html", {
+                **modeladmin.admin_site.each_context(request),
+                "title": description,
+                "opts": modeladmin.model._meta,
+                "form": form,
+                "action": func.__name__,
+                "count": queryset.count(),
+                "selected": request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+                "select_across": request.POST.get("select_across", "0"),
+            })
+        return action
+    return decorator
@@ -0,0 +1,164 @@
+"""
+Archivage des années scolaires closes.
+
+Supprimer une ``SchoolYear`` par l'ORM collecte en mémoire chaque objet
+dépendant (niveaux, classes, inscriptions, notes…) et envoie les signaux de
+chacun : des minutes de travail dans une seule transaction. Ici, les tables
+concernées se déduisent des clés étrangères (``archive_plan``) ; elles sont
+exportées dans un fichier JSON Lines compressé, puis vidées par des ``DELETE``
+bruts par lots, des dépendants vers l'année, chaque lot dans sa propre
+transaction. Interrompu, l'archivage reprend là où il s'était arrêté.
+"""
+import gzip
+import json
+import os
+from functools import cache
+from graphlib import TopologicalSorter
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.utils import timezone
+
+from core.cache import bump_model_version
+from core.changes import SYNC_MODELS, record_changes
+from core.models import SchoolYear, SchoolYearArchive
+
+CHUNK_SIZE = 2000
+
+
+@cache
+def archive_plan():
+    """
+    ``[(modèle, chemin vers l'année), …]`` des modèles supprimés en cascade
+    avec une ``SchoolYear``, dans l'ordre de suppression : un modèle vient
+    avant ceux qu'il référence, l'année en dernier.
+    """
+    paths = {SchoolYear: "pk"}
+    sorter = TopologicalSorter()
+    pending = [SchoolYear]
+    while pending:
+        parent = pending.pop()
+        sorter.add(parent)
+        for relation in parent._meta.related_objects:
+            if relation.many_to_many or relation.on_delete is not models.CASCADE:
+                continue
+            child = relation.related_model
+            sorter.add(parent, child)
+            if child not in paths:
+                paths[child] = f"{relation.field.name}__{paths[parent]}"
+                pending.append(child)
+    # Références internes sans cascade (ex. ``ClassroomSubject.teacher``) :
+    # la ligne qui référence part avant la ligne référencée.
+    for model in paths:
+        for field in model._meta.concrete_fields:
+            if field.is_relation and field.related_model in paths and field.related_model is not model:
+                sorter.add(field.related_model, model)
+    return [(model, paths[model]) for model in sorter.static_order()]
+
+
+def rows_of(model, path, school_year_id):
+    return model._base_manager.filter(**{path: school_year_id})
+
+
+def export_school_year(school_year, filename, on_rows):
+    """
+    Écrit l'année et ses dépendants, parents d'abord, une ligne JSON par objet
+    (``{"model": …, "fields": …}``) dans ``filename`` compressé en gzip.
+    """
+    encoder = DjangoJSONEncoder()
+    with gzip.open(filename, "wt", encoding="utf-8") as out:
+        for model, path in reversed(archive_plan()):
+            label = model._meta.label
+            count = 0
+            for row in rows_of(model, path, school_year.pk).order_by("pk").values().iterator(chunk_size=CHUNK_SIZE):
+                out.write(json.dumps({"model": label, "fields": row}, default=encoder.default) + "\n")
+                count += 1
+                if count % CHUNK_SIZE == 0:
+                    on_rows(CHUNK_SIZE)
+            on_rows(count % CHUNK_SIZE)
+
+
+def purge_school_year(school_year_id, on_rows):
+    """
+    Supprime l'année et ses dépendants par lots de ``CHUNK_SIZE`` identifiants,
+    sans collecte ni signaux : les agrégats et les libellés supprimés avec
+    l'année n'ont rien à recalculer ailleurs. Les suppressions des modèles
+    synchronisés sont journalisées (``core.changes``), comme le ferait
+    ``pre_delete`` : les appareils hors ligne les retirent à leur tour.
+    """
+    plan = archive_plan()
+    archived = {model for model, _ in plan}
+    for model, path in plan:
+        queryset = rows_of(model, path, school_year_id)
+        nullable = [
+            relation for relation in model._meta.related_objects
+            if relation.related_model not in archived and relation.on_delete is models.SET_NULL
+        ]
+        # Classe de chaque ligne, lue avec l'identifiant tant que les parents existent.
+        classroom_path = SYNC_MODELS.get(model)
+        columns = ("pk", classroom_path) if classroom_path else ("pk",)
+        while rows := list(queryset.values_list(*columns)[:CHUNK_SIZE]):
+            ids = [row[0] for row in rows]
+            with transaction.atomic():
+                for relation in nullable:
+                    relation.related_model._base_manager.filter(
+                        **{f"{relation.field.name}__in": ids}
+                    ).update(**{relation.field.name: None})
+                # _raw_delete : le DELETE ... WHERE id IN (...) des suppressions
+                # rapides de l'ORM, sans collecte des dépendants (déjà supprimés).
+                model._base_manager.filter(pk__in=ids)._raw_delete(queryset.db)
+                if classroom_path:
+                    record_changes(model, rows, deleted=True)
+            on_rows(len(ids))
+        bump_model_version(model)
+
+
+def archive_school_year(school_year, export=True, user=None, on_progress=None):
+    """
+    Exporte puis supprime une année scolaire close. ``on_progress(fait, total,
+    message)`` suit l'avancement. Retourne le ``SchoolYearArchive``.
+    """
+    if school_year.end_date >= timezone.localdate():
+        raise ValueError(f"L'année {school_year} n'est pas close.")
+    on_progress = on_progress or (lambda done, total, message: None)
+    counts = {
+        model._meta.label: rows_of(model, path, school_year.pk).count()
+        for model, path in archive_plan()
+    }
+    archive, _ = SchoolYearArchive.objects.get_or_create(
+        school_year_id=school_year.pk,
+        defaults={
+            "school_id": school_year.school_id,
+            "name": school_year.name,
+            "start_date": school_year.start_date,
+            "end_date": school_year.end_date,
+            "row_counts": counts,
+            "created_by": user,
+        },
+    )
+    pending_export = export and not archive.file
+    total = sum(counts.values()) * (2 if pending_export else 1)
+    done = 0
+
+    def on_rows(count, message):
+        nonlocal done
+        done += count
+        on_progress(done, total, message)
+
+    if pending_export:
+        os.makedirs(settings.ARCHIVE_ROOT, exist_ok=True)
+        filename = os.path.join(
+            settings.ARCHIVE_ROOT,
+            f"school-{school_year.school_id}-{school_year.name}-{timezone.now():%Y%m%d%H%M%S}.jsonl.gz",
+        )
+        export_school_year(school_year, filename + ".part", lambda count: on_rows(count, "Export"))
+        # Le fichier n'est référencé qu'une fois complet.
+        os.replace(filename + ".part", filename)
+        archive.file = filename
+        archive.save(update_fields=["file"])
+
+    purge_school_year(school_year.pk, lambda count: on_rows(count, "Suppression"))
+    archive.purged_at = timezone.now()
+    archive.save(update_fields=["purged_at"])
+    return archive
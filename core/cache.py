@@ -0,0 +1,209 @@
+"""
+Versions de modèles pour les clés de cache.
+
+Chaque modèle a un numéro de version stocké dans le cache, incrémenté à chaque
+écriture (voir ``core.signals``). Une clé construite avec ces versions devient
+simplement introuvable dès qu'une donnée sous-jacente change : aucune
+invalidation explicite n'est nécessaire.
+
+``cached_value`` s'appuie sur ces versions et protège le calcul contre les
+ruées (« stampede ») : une seule requête recalcule une valeur expirée pendant
+que les autres servent l'ancienne. Une valeur calculée sur un réplica n'est
+pas conservée (voir ``core.replicas``). Les succès et échecs sont comptés par nom
+(``record_cache_access``) et consultables avec ``cache_counters``.
+"""
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+from core.replicas import reads_from_replica
+
+VERSION_KEY = "model-version:{}"
+
+
+def _version_key(model):
+    return VERSION_KEY.format(model._meta.label_lower)
+
+
+def _initial_version():
+    # Partir de l'horloge plutôt que de 1 : si la clé de version est évincée,
+    # elle ne retombe pas sur une valeur déjà utilisée par d'anciens fragments.
+    return time.time_ns()
+
+
+def get_model_versions(models):
+    keys = [_version_key(model) for model in models]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        # ``add`` puis relecture : des processus concurrents retiennent tous la
+        # même version initiale, donc la même clé.
+        for key in missing:
+            cache.add(key, _initial_version(), timeout=None)
+        found.update(cache.get_many(missing))
+    return [found[key] for key in keys]
+
+
+async def aget_model_versions(models):
+    keys = [_version_key(model) for model in models]
+    found = await cache.aget_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            await cache.aadd(key, _initial_version(), timeout=None)
+        found.update(await cache.aget_many(missing))
+    return [found[key] for key in keys]
+
+
+def bump_model_version(model):
+    """
+    Invalide tous les fragments qui dépendent de ``model``. À appeler après les
+    écritures qui ne déclenchent pas de signaux (``update()``, ``bulk_create()``…).
+    """
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), timeout=None)
+
+
+def make_fragment_key(name, versions, *parts):
+    digest = hashlib.md5(
+        ":".join(str(part) for part in (*versions, *parts)).encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    return f"fragment:{name}:{digest}"
+
+
+def versioned_key(name, models, *parts):
+    """Clé qui change dès qu'un des ``models`` est modifié."""
+    return make_fragment_key(name, get_model_versions(models), *parts)
+
+
+# Marqueur « valeur absente », distinct d'un ``None`` mis en cache.
+_MISSING = object()
+
+
+def cached_value(name, models, compute, *parts, timeout=300, lock_timeout=30):
+    """
+    Valeur de ``compute()`` mise en cache sous une clé versionnée par
+    ``models`` (ex. ``(School, SchoolYear, Classroom)``) et ``parts``.
+
+    Passé ``timeout``, la valeur est encore conservée ``lock_timeout`` secondes
+    : le premier appelant qui obtient le verrou la recalcule, les autres
+    reçoivent l'ancienne. Sans aucune valeur, les autres attendent le calcul
+    (au plus ``lock_timeout``) plutôt que de le lancer à leur tour.
+    """
+    key = versioned_key(name, models, *parts)
+    lock_key = f"{key}:lock"
+    entry = cache.get(key)
+    if entry is not None:
+        value, fresh_until = entry
+        if time.time() < fresh_until or not cache.add(lock_key, 1, lock_timeout):
+            record_cache_access(name, hit=True)
+            return value
+    else:
+        value = _MISSING
+        if not cache.add(lock_key, 1, lock_timeout):
+            value = _wait_for(key, lock_key, lock_timeout)
+            if value is not _MISSING:
+                record_cache_access(name, hit=True)
+                return value
+
+    record_cache_access(name, hit=False)
+    try:
+        value = compute()
+        if not reads_from_replica():
+            cache.set(key, (value, time.time() + timeout), timeout + lock_timeout)
+    finally:
+        cache.delete(lock_key)
+    return value
+
+
+def _wait_for(key, lock_key, lock_timeout):
+    deadline = time.monotonic() + lock_timeout
+    delay = 0.05
+    while time.monotonic() < deadline:
+        time.sleep(delay)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+        if cache.get(lock_key) is None:
+            break
+        delay = min(delay * 2, 0.5)
+    return _MISSING
+
+
+# Compteurs de succès / échecs, cumulés par processus puis reportés dans le
+# cache partagé au plus toutes les ``COUNTER_FLUSH_INTERVAL`` secondes pour ne
+# pas ajouter une écriture à chaque lecture.
+COUNTER_KEY = "cache-counter:{}:{}"
+COUNTER_NAMES_KEY = "cache-counter:names"
+COUNTER_FLUSH_INTERVAL = 10
+
+_counters = Counter()
+_counters_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def _count(name, hit):
+    global _last_flush
+    with _counters_lock:
+        _counters[name, "hit" if hit else "miss"] += 1
+        if time.monotonic() - _last_flush < COUNTER_FLUSH_INTERVAL:
+            return None
+        pending = dict(_counters)
+        _counters.clear()
+        _last_flush = time.monotonic()
+    return pending
+
+
+def record_cache_access(name, hit):
+    pending = _count(name, hit)
+    if pending:
+        _flush_counters(pending)
+
+
+async def arecord_cache_access(name, hit):
+    pending = _count(name, hit)
+    if pending:
+        await sync_to_async(_flush_counters)(pending)
+
+
+def _flush_counters(pending):
+    names = cache.get(COUNTER_NAMES_KEY, set())
+    if not {name for name, _ in pending} <= names:
+        cache.set(COUNTER_NAMES_KEY, names | {name for name, _ in pending}, timeout=None)
+    for (name, outcome), count in pending.items():
+        key = COUNTER_KEY.format(name, outcome)
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            cache.set(key, count, timeout=None)
+
+
+def flush_cache_counters():
+    """Reporte immédiatement les compteurs de ce processus dans le cache partagé."""
+    with _counters_lock:
+        pending = dict(_counters)
+        _counters.clear()
+    if pending:
+        _flush_counters(pending)
+
+
+def cache_counters():
+    """``{nom: {"hit": n, "miss": n, "ratio": r}}`` cumulé sur tous les processus."""
+    flush_cache_counters()
+    names = sorted(cache.get(COUNTER_NAMES_KEY, set()))
+    keys = [COUNTER_KEY.format(name, outcome) for name in names for outcome in ("hit", "miss")]
+    values = cache.get_many(keys)
+    counters = {}
+    for name in names:
+        hit = values.get(COUNTER_KEY.format(name, "hit"), 0)
+        miss = values.get(COUNTER_KEY.format(name, "miss"), 0)
+        counters[name] = {"hit": hit, "miss": miss, "ratio": round(hit / (hit + miss), 3) if hit + miss else None}
+    return counters
@@ -0,0 +1,104 @@
+"""
+Journal des changements pour la synchronisation hors ligne (``api.sync``).
+
+Chaque écriture sur un modèle de ``SYNC_MODELS`` ajoute une ligne
+``SyncChange`` rattachée à la classe concernée : un appareil ne
+télécharge que les changements de ses classes postérieurs à son curseur. Les
+``post_save`` / ``pre_delete`` s'en chargent (``core.signals``) ; les écritures
+en masse appellent ``record_changes`` elles-mêmes. Les numéros sont propres à
+chaque classe (``SyncCounter``) : les écritures de classes différentes ne
+s'attendent pas.
+"""
+from collections import Counter
+
+from django.db import transaction
+
+from core.models import Attendance, Classroom, ClassroomSubject, Enrollment, Evaluation, Mark, SyncChange, SyncCounter
+
+# {modèle: chemin de l'objet vers l'identifiant de sa classe}
+SYNC_MODELS = {
+    Classroom: "pk",
+    ClassroomSubject: "classroom_id",
+    Enrollment: "classroom_id",
+    Evaluation: "classroom_subject__classroom_id",
+    Mark: "evaluation__classroom_subject__classroom_id",
+    Attendance: "classroom_id",
+}
+
+
+def sync_name(model):
+    return model._meta.model_name
+
+
+def classroom_id_of(instance):
+    """
+    Classe de ``instance`` : un attribut, ou une requête sur le parent direct
+    (``evaluation__classroom_subject__classroom_id`` lit ``Evaluation``).
+    """
+    path = SYNC_MODELS[type(instance)]
+    if "__" not in path:
+        return getattr(instance, path)
+    relation, rest = path.split("__", 1)
+    related_model = type(instance)._meta.get_field(relation).related_model
+    return (
+        related_model._default_manager
+        .filter(pk=getattr(instance, f"{relation}_id"))
+        .values_list(rest, flat=True)
+        .first()
+    )
+
+
+def record_changes(model, entries, deleted=False):
+    """
+    Journalise ``entries`` (``[(identifiant, classe), …]``) de ``model``. Voir
+    ``write_journal``.
+    """
+    write_journal([(model, object_id, classroom_id, deleted) for object_id, classroom_id in entries])
+
+
+def record_moves(model, moves):
+    """
+    Journalise des changements de classe (``[(identifiant, ancienne classe,
+    nouvelle classe), …]``) : une suppression dans l'ancienne classe quand elle
+    diffère, un ajout dans la nouvelle.
+    """
+    write_journal([
+        *((model, object_id, previous, True) for object_id, previous, classroom_id in moves if previous != classroom_id),
+        *((model, object_id, classroom_id, False) for object_id, _, classroom_id in moves),
+    ])
+
+
+def write_journal(changes):
+    """
+    Journalise ``changes`` (``[(modèle, identifiant, classe, suppression), …]``)
+    : une allocation de numéros par classe et un ``bulk_create``. À appeler dans
+    la transaction de l'écriture, pour que le journal et les données soient
+    visibles ensemble, et en dernier : les compteurs des classes concernées
+    restent verrouillés jusqu'à la validation. Une écriture qui touche plusieurs
+    modèles ou classes les journalise en un seul appel, qui verrouille les
+    compteurs dans l'ordre.
+
+    L'allocation et l'insertion ont lieu dans une même transaction même hors de
+    celle de l'écriture : un client ne peut pas avancer son curseur au-delà
+    d'un numéro dont la ligne n'est pas encore validée.
+    """
+    changes = [change for change in changes if change[2] is not None]
+    if not changes:
+        return
+    with transaction.atomic():
+        numbers = {
+            classroom_id: iter(seqs)
+            for classroom_id, seqs in SyncCounter.objects.allocate(
+                Counter(classroom_id for _, _, classroom_id, _ in changes)
+            ).items()
+        }
+        SyncChange.objects.bulk_create([
+            SyncChange(
+                seq=next(numbers[classroom_id]),
+                model=sync_name(model),
+                object_id=object_id,
+                classroom_id=classroom_id,
+                deleted=deleted,
+            )
+            for model, object_id, classroom_id, deleted in changes
+        ])
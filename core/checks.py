@@ -0,0 +1,34 @@
+from itertools import chain
+
+from django.apps import apps
+from django.core.checks import Error, Tags, register
+
+from core.models import DisplayLabelModel
+from core.template_warmup import warm_templates
+
+
+@register(Tags.templates)
+def check_templates_compile(app_configs, **kwargs):
+    return [
+        Error(f"Le template {name!r} ne compile pas : {exc}", id="core.E001")
+        for name, exc in warm_templates()
+    ]
+
+
+@register(Tags.models)
+def check_display_labels(app_configs, **kwargs):
+    """Chaque modèle concret de ``DisplayLabelModel`` définit ``build_display_label``."""
+    models = (
+        chain.from_iterable(app_config.get_models() for app_config in app_configs)
+        if app_configs else apps.get_models()
+    )
+    return [
+        Error(
+            f"{model._meta.label} doit définir build_display_label().",
+            obj=model,
+            id="core.E002",
+        )
+        for model in models
+        if issubclass(model, DisplayLabelModel)
+        and getattr(model.build_display_label, "__isabstractmethod__", False)
+    ]
@@ -0,0 +1,185 @@
+"""
+Certificats de scolarité et relevés de notes pluriannuels.
+
+Les documents sont des pages HTML prêtes à imprimer. Pour en produire des
+centaines à la suite :
+
+- chaque template n'est compilé qu'une fois par processus
+  (``document_template``), même sans le loader ``cached`` ;
+- l'en-tête de l'établissement (``School.document_header``) n'est décodé et
+  réduit qu'une fois par fichier (``header_image``), puis intégré en
+  ``data:`` URI ;
+- toutes les années de tous les élèves d'un lot sont lues en une requête
+  (``student_records``) ;
+- ``stream_zip`` produit l'archive au fil de l'eau : un seul document est en
+  mémoire à la fois.
+"""
+import base64
+import io
+import zipfile
+from functools import cache, lru_cache
+
+from django.core.files.storage import default_storage
+from django.db.models import Avg, Count, F, FloatField
+from django.db.models.functions import Cast
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.text import slugify
+from PIL import Image, UnidentifiedImageError
+
+from core.models import Enrollment
+
+DOCUMENT_TEMPLATES = {
+    "certificate": "core/documents/certificate.html",
+    "transcript": "core/documents/transcript.html",
+}
+# Taille maximale de l'en-tête intégré (px) : assez pour l'impression A4.
+HEADER_SIZE = (1600, 400)
+# Élèves lus par requête en mode lot.
+BATCH_SIZE = 200
+
+
+@cache
+def document_template(kind):
+    return get_template(DOCUMENT_TEMPLATES[kind])
+
+
+@lru_cache(maxsize=32)
+def _decoded_header(name):
+    try:
+        with default_storage.open(name) as source:
+            image = Image.open(source)
+            image.thumbnail(HEADER_SIZE)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG", optimize=True)
+    except (OSError, UnidentifiedImageError):
+        return None
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def header_image(school):
+    """
+    En-tête de ``school`` en ``data:`` URI, ou ``None``. Le cache est indexé
+    par le nom du fichier : un nouvel en-tête est enregistré sous un autre nom.
+    """
+    if not school.document_header:
+        return None
+    return _decoded_header(school.document_header.name)
+
+
+def student_records(student_ids, school_year_id=None):
+    """
+    ``{élève: dossier}`` des élèves ``student_ids``, en une requête : nom et,
+    par année (la plus ancienne d'abord), classe, niveau et moyenne sur 20 de
+    chaque matière notée. ``school_year_id`` limite le dossier à cette année.
+    """
+    enrollments = Enrollment.objects.filter(student_id__in=student_ids)
+    if school_year_id is not None:
+        enrollments = enrollments.filter(school_year_id=school_year_id)
+    rows = (
+        enrollments
+        .values(
+            "student_id",
+            "school_year_id",
+            "enrollment_number",
+            first_name=F("student__user__first_name"),
+            last_name=F("student__user__last_name"),
+            school_year_name=F("school_year__name"),
+            start_date=F("school_year__start_date"),
+            end_date=F("school_year__end_date"),
+            classroom_name=F("classroom__name"),
+            level=F("classroom__school_year_level__level__name"),
+            subject=F("marks__evaluation__classroom_subject__subject__name"),
+        )
+        .annotate(
+            mark_count=Count("marks"),
+            average=Avg(
+                Cast("marks__score", FloatField()) * 20 / Cast("marks__evaluation__max_score", FloatField())
+            ),
+        )
+        .order_by("student_id", "start_date", "subject")
+    )
+    records = {}
+    for row in rows:
+        record = records.setdefault(row["student_id"], {
+            "student_id": row["student_id"],
+            "first_name": row["first_name"],
+            "last_name": row["last_name"],
+            "years": [],
+        })
+        years = record["years"]
+        if not years or years[-1]["school_year_id"] != row["school_year_id"]:
+            years.append({
+                key: row[key] for key in (
+                    "school_year_id", "school_year_name", "start_date", "end_date",
+                    "enrollment_number", "classroom_name", "level",
+                )
+            } | {"subjects": []})
+        # Une inscription sans note donne une ligne sans matière.
+        if row["subject"] is not None:
+            years[-1]["subjects"].append(
+                {"name": row["subject"], "mark_count": row["mark_count"], "average": row["average"]}
+            )
+    return records
+
+
+def render_document(kind, record, school, issued_on=None):
+    """HTML du document ``kind`` pour le dossier ``record`` d'un élève."""
+    return document_template(kind).render({
+        "record": record,
+        # Un certificat porte sur la dernière année du dossier.
+        "year": record["years"][-1] if record["years"] else None,
+        "school": school,
+        "header": header_image(school),
+        "issued_on": issued_on or timezone.localdate(),
+    })
+
+
+def document_filename(kind, record):
+    name = slugify(f"{record['last_name']} {record['first_name']}") or "eleve"
+    return f"{kind}-{name}-{record['student_id']}.html"
+
+
+def iter_documents(kind, student_ids, school, school_year_id=None):
+    """``(nom de fichier, contenu)`` de chaque document, par lots de ``BATCH_SIZE`` élèves."""
+    student_ids = list(student_ids)
+    issued_on = timezone.localdate()
+    for start in range(0, len(student_ids), BATCH_SIZE):
+        records = student_records(student_ids[start:start + BATCH_SIZE], school_year_id=school_year_id)
+        for record in records.values():
+            yield document_filename(kind, record), render_document(kind, record, school, issued_on).encode()
+
+
+class _ChunkSink:
+    """Fichier en écriture seule : ``ZipFile`` y écrit, ``drain`` rend ce qui a été écrit."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def stream_zip(files):
+    """
+    Archive ZIP de ``files`` (``(nom, contenu)``) produite morceau par morceau.
+    Sans ``tell`` ni ``seek`` sur la sortie, ``zipfile`` écrit la taille de
+    chaque fichier après son contenu : rien n'est à réécrire ensuite.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in files:
+            archive.writestr(name, content)
+            yield sink.drain()
+    yield sink.drain()
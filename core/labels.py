@@ -0,0 +1,72 @@
+"""
+Propagation des libellés dénormalisés (``DisplayLabelModel.display_label``).
+
+Les dépendances se déduisent de ``label_parents`` : un chemin
+``school_year_level__level`` de ``Classroom`` rend ses libellés dépendants de
+``SchoolYearLevel`` et de ``Level``. Quand un ancêtre est enregistré, les
+libellés qui en dépendent sont recalculés en masse, puis ceux qui dépendent
+des libellés modifiés, et ainsi de suite.
+"""
+from functools import cache
+from graphlib import TopologicalSorter
+
+from django.apps import apps
+
+from core.cache import bump_model_version
+from core.models import DisplayLabelModel
+
+# Champs susceptibles d'apparaître dans un libellé. Un ``save(update_fields=...)``
+# qui n'en touche aucun (ex. ``last_login`` à la connexion) ne propage rien.
+LABEL_SOURCE_FIELDS = {
+    "name", "abbreviation", "quartier", "ville", "first_name", "last_name",
+    "display_label", "school", "school_id", "grade", "grade_id", "level", "level_id",
+    "school_year", "school_year_id", "school_year_level", "school_year_level_id",
+    "grade_option", "grade_option_id", "classroom", "classroom_id",
+    "subject", "subject_id", "student", "student_id", "user", "user_id",
+}
+
+
+@cache
+def label_dependents():
+    """``{modèle ancêtre: [(modèle dépendant, chemin), ...]}``"""
+    dependents = {}
+    for model in apps.get_models():
+        if not issubclass(model, DisplayLabelModel):
+            continue
+        for path in model.label_parents:
+            parts = path.split("__")
+            related = model
+            for depth, part in enumerate(parts, start=1):
+                related = related._meta.get_field(part).related_model
+                dependents.setdefault(related, []).append((model, "__".join(parts[:depth])))
+    return dependents
+
+
+def refresh_dependent_labels(model, pks):
+    """Recalcule les libellés qui dépendent des objets ``pks`` de ``model``."""
+    for dependent, path in label_dependents().get(model, ()):
+        changed = dependent.refresh_display_labels(
+            dependent._default_manager.filter(**{f"{path}__in": pks})
+        )
+        if changed:
+            # bulk_update ne déclenche pas post_save.
+            bump_model_version(dependent)
+            refresh_dependent_labels(dependent, changed)
+
+
+def should_propagate(update_fields):
+    return update_fields is None or not LABEL_SOURCE_FIELDS.isdisjoint(update_fields)
+
+
+def labelled_models_in_order():
+    """Modèles à libellé, chaque ancêtre avant ses dépendants."""
+    graph = {
+        model: set()
+        for model in apps.get_models()
+        if issubclass(model, DisplayLabelModel)
+    }
+    for ancestor, dependents in label_dependents().items():
+        for dependent, _ in dependents:
+            if ancestor in graph:
+                graph[dependent].add(ancestor)
+    return list(TopologicalSorter(graph).static_order())
@@ -0,0 +1,76 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Executed in a fresh interpreter so every measurement starts cold.
+PROBE = """
+import json, time
+t0 = time.perf_counter()
+import django
+django.setup()
+t1 = time.perf_counter()
+from django.test import Client
+client = Client()
+t2 = time.perf_counter()
+response = client.get({path!r}, HTTP_HOST="localhost")
+t3 = time.perf_counter()
+response = client.get({path!r}, HTTP_HOST="localhost")
+t4 = time.perf_counter()
+print(json.dumps({{
+    "setup": t1 - t0,
+    "handler": t2 - t1,
+    "first_request": t3 - t2,
+    "warm_request": t4 - t3,
+    "status": response.status_code,
+}}))
+"""
+
+
+class Command(BaseCommand):
+    help = "Mesure le temps de démarrage et de la première requête pour chaque profil de settings."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", nargs="+", default=["dev", "prod", "test"])
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--path", default="/")
+
+    def handle(self, *args, **options):
+        probe = PROBE.format(path=options["path"])
+        header = f"{'profile':<8}{'process':>10}{'setup':>10}{'handler':>10}{'1st req':>10}{'warm req':>10}  status"
+        self.stdout.write(header)
+        for profile in options["profiles"]:
+            runs = [self._run(profile, probe) for _ in range(options["repeat"])]
+            median = {key: statistics.median(run[key] for run in runs) for key in runs[0] if key != "status"}
+            self.stdout.write(
+                f"{profile:<8}"
+                + "".join(f"{median[key] * 1000:>8.1f}ms" for key in ("process", "setup", "handler", "first_request", "warm_request"))
+                + f"  {runs[-1]['status']}"
+            )
+
+    def _run(self, profile, probe):
+        env = {
+            **os.environ,
+            "DJANGO_ENV": profile,
+            "DJANGO_SETTINGS_MODULE": "myapp.settings",
+            # The prod profile refuses to start without these.
+            "DJANGO_SECRET_KEY": os.environ.get("DJANGO_SECRET_KEY", "bench-startup-secret-key"),
+            "DJANGO_ALLOWED_HOSTS": "localhost",
+        }
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-c", probe],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        result["process"] = time.perf_counter() - start
+        return result
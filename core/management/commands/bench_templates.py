@@ -0,0 +1,60 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.test import RequestFactory, override_settings
+
+from core.template_warmup import warm_templates
+
+LOADERS = [
+    "django_cotton.cotton_loader.Loader",
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
+CARD_LISTING = """
+{% for person in people %}
+<c-card title="Fiche" url="home" :person="person">Carte {{ forloop.counter }}</c-card>
+{% endfor %}
+"""
+
+
+def templates_setting(cached):
+    options = {key: value for key, value in settings.TEMPLATES[0]["OPTIONS"].items() if key != "loaders"}
+    options["loaders"] = [("django.template.loaders.cached.Loader", LOADERS)] if cached else LOADERS
+    config = {key: value for key, value in settings.TEMPLATES[0].items() if key != "APP_DIRS"}
+    return [{**config, "OPTIONS": options}]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le rendu de la page d'accueil et d'une liste de 100 cartes cotton, "
+        "sans loader cached puis avec loader cached préchauffé."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get("/", HTTP_HOST="localhost")
+        people = [{"name": f"Élève {i}"} for i in range(100)]
+        self.stdout.write(f"{'mode':<10}{'home.html':>14}{'100 cartes':>14}")
+        for cached in (False, True):
+            with override_settings(TEMPLATES=templates_setting(cached)):
+                backend = engines["django"]
+                if cached:
+                    warm_templates(strict=True)
+                listing = backend.from_string(CARD_LISTING)
+                home = self._time(lambda: backend.get_template("home.html").render({}, request), options["iterations"])
+                cards = self._time(lambda: listing.render({"people": people}, request), options["iterations"])
+            self.stdout.write(f"{'cached' if cached else 'uncached':<10}{home * 1000:>12.3f}ms{cards * 1000:>12.3f}ms")
+
+    def _time(self, render, iterations):
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            render()
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings)
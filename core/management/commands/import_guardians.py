@@ -0,0 +1,97 @@
+import csv
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.cache import bump_model_version
+from core.models import Enrollment, StudentGuardian
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Importe en masse les liens tuteur/élève depuis un CSV "
+        "(colonnes : guardian_email, enrollment_number, relationship, "
+        "first_name, last_name, is_primary). Les comptes tuteurs manquants sont "
+        "créés sans mot de passe ; les liens existants sont ignorés, ainsi que "
+        "les lignes dont l'adresse appartient à un compte qui n'est pas tuteur."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        with open(options["csv_path"], newline="", encoding="utf-8-sig") as f:
+            rows = list(csv.DictReader(f))
+        required = {"guardian_email", "enrollment_number"}
+        if rows and not required <= rows[0].keys():
+            raise CommandError(f"Colonnes obligatoires : {', '.join(sorted(required))}.")
+
+        relationships = set(StudentGuardian.Relationship.values)
+        for row in rows:
+            row["guardian_email"] = User.objects.normalize_email(row["guardian_email"].strip())
+            row["enrollment_number"] = row["enrollment_number"].strip()
+            if row.get("relationship") not in relationships:
+                row["relationship"] = StudentGuardian.Relationship.OTHER
+
+        with transaction.atomic():
+            emails = {row["guardian_email"] for row in rows}
+            existing = dict(User.objects.filter(email__in=emails).values_list("email", "is_tutor"))
+            # Comptes existants qui ne sont pas tuteurs : ``StudentGuardian.clean`` les refuserait.
+            not_tutors = sorted(email for email, is_tutor in existing.items() if not is_tutor)
+            new_tutors = []
+            for row in rows:
+                if row["guardian_email"] in existing:
+                    continue
+                existing[row["guardian_email"]] = True
+                tutor = User(
+                    email=row["guardian_email"],
+                    first_name=row.get("first_name", ""),
+                    last_name=row.get("last_name", ""),
+                    is_tutor=True,
+                )
+                tutor.set_unusable_password()
+                new_tutors.append(tutor)
+            User.objects.bulk_create(new_tutors, batch_size=BATCH_SIZE)
+
+            tutor_ids = dict(User.objects.filter(email__in=emails).values_list("email", "pk"))
+            student_ids = dict(
+                Enrollment.objects
+                .filter(enrollment_number__in={row["enrollment_number"] for row in rows})
+                .values_list("enrollment_number", "student_id")
+            )
+            links = []
+            unknown = []
+            for row in rows:
+                if not existing[row["guardian_email"]]:
+                    continue
+                student_id = student_ids.get(row["enrollment_number"])
+                if student_id is None:
+                    unknown.append(row["enrollment_number"])
+                    continue
+                links.append(StudentGuardian(
+                    guardian_id=tutor_ids[row["guardian_email"]],
+                    student_id=student_id,
+                    relationship=row["relationship"],
+                    is_primary=row.get("is_primary", "").strip().lower() in ("1", "true", "oui"),
+                ))
+            StudentGuardian.objects.bulk_create(links, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+        # bulk_create ne déclenche pas les signaux qui invalident les fragments.
+        bump_model_version(User)
+        bump_model_version(StudentGuardian)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(new_tutors)} tuteur(s) créé(s), {len(links)} lien(s) traité(s)."
+        ))
+        if not_tutors:
+            self.stdout.write(self.style.WARNING(
+                f"{len(not_tutors)} compte(s) non tuteur(s) ignoré(s) : {', '.join(not_tutors[:20])}"
+            ))
+        if unknown:
+            self.stdout.write(self.style.WARNING(
+                f"{len(unknown)} numéro(s) d'inscription inconnu(s) : {', '.join(unknown[:20])}"
+            ))
@@ -0,0 +1,98 @@
+import asyncio
+import itertools
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Test de charge HTTP : N utilisateurs concurrents (connexions keep-alive) "
+        "sur une ou plusieurs URL pendant une durée donnée. À lancer contre le "
+        "serveur WSGI puis ASGI (voir gunicorn.conf.py) pour comparer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="+", help="URL(s) visitées à tour de rôle par chaque utilisateur.")
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument("--duration", type=float, default=30.0, help="Durée en secondes.")
+        parser.add_argument("--cookie", default="", help="En-tête Cookie, ex: sessionid=...")
+        parser.add_argument("--htmx", action="store_true", help="Ajoute HX-Request: true aux requêtes.")
+
+    def handle(self, *args, **options):
+        targets = [urlsplit(url) for url in options["urls"]]
+        if {(t.hostname, t.port) for t in targets} != {(targets[0].hostname, targets[0].port)}:
+            raise CommandError("Toutes les URL doivent viser le même hôte.")
+        latencies, errors, elapsed = asyncio.run(self._run(targets, options))
+
+        total = len(latencies) + errors
+        self.stdout.write(f"users={options['users']} duration={elapsed:.1f}s requests={total} errors={errors}")
+        if not latencies:
+            raise CommandError("Aucune requête réussie.")
+        quantiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"throughput={len(latencies) / elapsed:.1f} req/s "
+            f"p50={quantiles[49] * 1000:.1f}ms p95={quantiles[94] * 1000:.1f}ms p99={quantiles[98] * 1000:.1f}ms"
+        )
+
+    async def _run(self, targets, options):
+        latencies = []
+        errors = 0
+        start = time.perf_counter()
+        deadline = start + options["duration"]
+
+        async def user():
+            nonlocal errors
+            connection = None
+            for target in itertools.cycle(targets):
+                if time.perf_counter() >= deadline:
+                    break
+                try:
+                    if connection is None:
+                        connection = await asyncio.open_connection(target.hostname, target.port or 80)
+                    sent = time.perf_counter()
+                    status, keep_alive = await self._request(*connection, target, options)
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    errors += 1
+                    connection = None
+                    continue
+                if 200 <= status < 400:
+                    latencies.append(time.perf_counter() - sent)
+                else:
+                    errors += 1
+                if not keep_alive:
+                    connection[1].close()
+                    connection = None
+            if connection is not None:
+                connection[1].close()
+
+        await asyncio.gather(*(user() for _ in range(options["users"])))
+        return latencies, errors, time.perf_counter() - start
+
+    async def _request(self, reader, writer, target, options):
+        path = target.path or "/"
+        if target.query:
+            path += "?" + target.query
+        lines = [f"GET {path} HTTP/1.1", f"Host: {target.netloc}", "Connection: keep-alive"]
+        if options["cookie"]:
+            lines.append(f"Cookie: {options['cookie']}")
+        if options["htmx"]:
+            lines.append("HX-Request: true")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+        status = int((await reader.readline()).split()[1])
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip().lower()
+
+        if headers.get("transfer-encoding") == "chunked":
+            while size := int((await reader.readline()).split(b";")[0], 16):
+                await reader.readexactly(size + 2)
+            await reader.readline()
+        else:
+            await reader.readexactly(int(headers.get("content-length", 0)))
+        return status, headers.get("connection") != "close"
@@ -0,0 +1,33 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from core.models import SyncChange, SyncCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Purge le journal de synchronisation au-delà d'un délai. Un appareil "
+        "dont le curseur est antérieur à la purge reçoit un instantané complet."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=90, help="Conserver les changements de ces derniers jours.")
+
+    def handle(self, *args, **options):
+        old = SyncChange.objects.filter(created_at__lt=timezone.now() - datetime.timedelta(days=options["days"]))
+        with transaction.atomic():
+            through = dict(old.values("classroom_id").annotate(seq=Max("seq")).values_list("classroom_id", "seq"))
+            if not through:
+                self.stdout.write("Rien à purger.")
+                return
+            deleted = 0
+            # Numéros propres à chaque classe, purgés par classe croissante comme à l'allocation.
+            for classroom_id in sorted(through):
+                SyncCounter.objects.filter(classroom_id=classroom_id).update(pruned_through=through[classroom_id])
+                count, _ = SyncChange.objects.filter(classroom_id=classroom_id, seq__lte=through[classroom_id]).delete()
+                deleted += count
+        self.stdout.write(self.style.SUCCESS(f"{deleted} changement(s) purgé(s) dans {len(through)} classe(s)."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.cache import bump_model_version
+from core.labels import labelled_models_in_order
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule tous les libellés dénormalisés (display_label), ancêtres "
+        "d'abord. À lancer après la migration qui les ajoute ou après des "
+        "écritures en masse faites hors de l'ORM."
+    )
+
+    def handle(self, *args, **options):
+        for model in labelled_models_in_order():
+            changed = model.refresh_display_labels()
+            if changed:
+                bump_model_version(model)
+            self.stdout.write(f"{model._meta.label}: {len(changed)} libellé(s) mis à jour")
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.stats import refresh_classroom_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruit les agrégats statistiques de toutes les classes. Les "
+        "écritures courantes les tiennent à jour ; à planifier (cron) pour "
+        "rattraper les modifications faites hors de l'ORM."
+    )
+
+    def handle(self, *args, **options):
+        count = refresh_classroom_stats()
+        self.stdout.write(self.style.SUCCESS(f"{count} classe(s) recalculée(s)."))
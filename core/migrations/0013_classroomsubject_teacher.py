@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-19 03:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_student_teacher'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classroomsubject',
+            name='teacher',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='classroom_subjects', to='core.teacher', verbose_name='Enseignant'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-19 03:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_classroomsubject_teacher'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentGuardian',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Date de mise à jour')),
+                ('relationship', models.CharField(choices=[('father', 'Père'), ('mother', 'Mère'), ('legal_guardian', 'Tuteur légal'), ('other', 'Autre')], default='other', max_length=20, verbose_name='Lien de parenté')),
+                ('is_primary', models.BooleanField(default=False, verbose_name='Contact principal')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_created', to=settings.AUTH_USER_MODEL, verbose_name='Créé par')),
+                ('guardian', models.ForeignKey(limit_choices_to={'is_tutor': True}, on_delete=django.db.models.deletion.CASCADE, related_name='guarded_students', to=settings.AUTH_USER_MODEL, verbose_name='Tuteur')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='guardians', to='core.student', verbose_name='Élève')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_updated', to=settings.AUTH_USER_MODEL, verbose_name='Modifié par')),
+            ],
+            options={
+                'verbose_name': "Tuteur d'élève",
+                'verbose_name_plural': "Tuteurs d'élèves",
+                'constraints': [models.UniqueConstraint(fields=('guardian', 'student'), name='unique_guardian_per_student')],
+            },
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.1 on 2026-10-19 03:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_studentguardian'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Enrollment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Date de mise à jour')),
+                ('enrollment_number', models.CharField(max_length=30, unique=True, verbose_name="Numéro d'inscription")),
+                ('is_current', models.BooleanField(default=True, verbose_name='Inscription courante')),
+                ('classroom', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='core.classroom', verbose_name='Classe')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_created', to=settings.AUTH_USER_MODEL, verbose_name='Créé par')),
+                ('school_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='core.schoolyear', verbose_name='Année scolaire')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='core.student', verbose_name='Élève')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_updated', to=settings.AUTH_USER_MODEL, verbose_name='Modifié par')),
+            ],
+            options={
+                'verbose_name': 'Inscription',
+                'verbose_name_plural': 'Inscriptions',
+                'constraints': [models.UniqueConstraint(fields=('student', 'school_year'), name='unique_enrollment_per_year'), models.UniqueConstraint(condition=models.Q(('is_current', True)), fields=('student',), name='unique_current_enrollment')],
+            },
+        ),
+        # Une inscription par profil élève existant, en une seule instruction.
+        migrations.RunSQL(
+            sql="""
+                INSERT INTO core_enrollment (
+                    created_at, updated_at, created_by_id, updated_by_id,
+                    student_id, school_year_id, classroom_id, enrollment_number, is_current
+                )
+                SELECT
+                    created_at, updated_at, created_by_id, updated_by_id,
+                    id, schoolyear_id, classroom_id, enrollment_number, TRUE
+                FROM core_student
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AlterUniqueTogether(
+            name='student',
+            unique_together=set(),
+        ),
+        migrations.RemoveField(
+            model_name='student',
+            name='classroom',
+        ),
+        migrations.RemoveField(
+            model_name='student',
+            name='enrollment_number',
+        ),
+        migrations.RemoveField(
+            model_name='student',
+            name='schoolyear',
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-19 03:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_enrollment'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='enrollment',
+            name='enrollment_number',
+            field=models.CharField(blank=True, help_text='Laisser vide pour attribuer automatiquement le numéro suivant.', max_length=30, unique=True, verbose_name="Numéro d'inscription"),
+        ),
+        migrations.CreateModel(
+            name='EnrollmentSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_value', models.PositiveIntegerField(default=0, verbose_name='Dernier numéro attribué')),
+                ('school_year', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='enrollment_sequence', to='core.schoolyear', verbose_name='Année scolaire')),
+            ],
+            options={
+                'verbose_name': "Séquence de numéros d'inscription",
+                'verbose_name_plural': "Séquences de numéros d'inscription",
+            },
+        ),
+    ]
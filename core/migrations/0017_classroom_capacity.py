@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-19 03:50
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_enrollmentsequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classroom',
+            name='capacity',
+            field=models.PositiveSmallIntegerField(default=50, help_text="Nombre maximum d'élèves dans la classe.", validators=[django.core.validators.MinValueValidator(1)], verbose_name='capacité'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.1 on 2026-10-19 03:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_classroom_capacity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classroom',
+            name='display_label',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Libellé'),
+        ),
+        migrations.AddField(
+            model_name='classroomsubject',
+            name='display_label',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Libellé'),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='display_label',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Libellé'),
+        ),
+        migrations.AddField(
+            model_name='grade',
+            name='display_label',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Libellé'),
+        ),
+        migrations.AddField(
+            model_name='gradeoption',
+            name='display_label',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Libellé'),
+        ),
+        migrations.AddField(
+            model_name='level',
+            name='display_label',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Libellé'),
+        ),
+        migrations.AddField(
+            model_name='schoolyear',
+            name='display_label',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Libellé'),
+        ),
+        migrations.AddField(
+            model_name='schoolyearlevel',
+            name='display_label',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Libellé'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='display_label',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Libellé'),
+        ),
+        migrations.AddField(
+            model_name='subject',
+            name='display_label',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Libellé'),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='display_label',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Libellé'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.1 on 2026-10-19 03:54
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_display_label'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubjectYear',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Date de mise à jour')),
+                ('is_active', models.BooleanField(blank=True, null=True, verbose_name='Active cette année')),
+                ('coefficient', models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True, validators=[django.core.validators.MinValueValidator(0.01)], verbose_name="Coefficient de l'année")),
+            ],
+            options={
+                'verbose_name': 'Matière annuelle',
+                'verbose_name_plural': 'Matières annuelles',
+            },
+        ),
+        migrations.AddField(
+            model_name='subject',
+            name='coefficient',
+            field=models.DecimalField(decimal_places=2, default=1.0, max_digits=4, validators=[django.core.validators.MinValueValidator(0.01)], verbose_name='Coefficient par défaut'),
+        ),
+        migrations.AddField(
+            model_name='subject',
+            name='is_active',
+            field=models.BooleanField(default=True, help_text='Valeur par défaut pour les années sans surcharge.', verbose_name='Active'),
+        ),
+        migrations.AddField(
+            model_name='subject',
+            name='school',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='subjects', to='core.school', verbose_name='Établissement'),
+        ),
+        migrations.AlterField(
+            model_name='classroomsubject',
+            name='coefficient',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text="Laisser vide pour reprendre le coefficient de la matière pour l'année.", max_digits=4, null=True, validators=[django.core.validators.MinValueValidator(0.01)], verbose_name='Coefficient'),
+        ),
+        migrations.AddField(
+            model_name='subjectyear',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_created', to=settings.AUTH_USER_MODEL, verbose_name='Créé par'),
+        ),
+        migrations.AddField(
+            model_name='subjectyear',
+            name='school_year',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_overrides', to='core.schoolyear', verbose_name='Année scolaire'),
+        ),
+        migrations.AddField(
+            model_name='subjectyear',
+            name='subject',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='year_overrides', to='core.subject', verbose_name='Matière'),
+        ),
+        migrations.AddField(
+            model_name='subjectyear',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_updated', to=settings.AUTH_USER_MODEL, verbose_name='Modifié par'),
+        ),
+        migrations.AddConstraint(
+            model_name='subjectyear',
+            constraint=models.UniqueConstraint(fields=('school_year', 'subject'), name='unique_subject_override_per_year'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+from collections import defaultdict
+
+from django.db import migrations
+
+
+def merge_yearly_subjects(apps, schema_editor):
+    """
+    Regroupe les matières annuelles de même nom d'un établissement en une seule
+    matière du catalogue, et désactive celle-ci (``SubjectYear``) pour les
+    années où elle n'existait pas.
+    """
+    Subject = apps.get_model("core", "Subject")
+    SubjectYear = apps.get_model("core", "SubjectYear")
+    SchoolYear = apps.get_model("core", "SchoolYear")
+    ClassroomSubject = apps.get_model("core", "ClassroomSubject")
+
+    kept = {}
+    merged = defaultdict(list)
+    years = defaultdict(set)
+    for subject_id, name, school_year_id, school_id in (
+        Subject.objects.order_by("pk").values_list("pk", "name", "school_year_id", "school_year__school_id")
+    ):
+        keep = kept.setdefault((school_id, name), subject_id)
+        years[keep].add(school_year_id)
+        if keep != subject_id:
+            merged[keep].append(subject_id)
+
+    for (school_id, _), keep in kept.items():
+        Subject.objects.filter(pk=keep).update(school_id=school_id)
+        if merged[keep]:
+            # Une classe n'a qu'une année : aucun doublon (classe, matière) possible.
+            ClassroomSubject.objects.filter(subject_id__in=merged[keep]).update(subject_id=keep)
+    Subject.objects.filter(pk__in=[pk for pks in merged.values() for pk in pks]).delete()
+    # Le libellé ne porte plus l'année ; ``__str__`` le recalcule tant qu'il est vide.
+    Subject.objects.update(display_label="")
+
+    school_years = defaultdict(set)
+    for school_year_id, school_id in SchoolYear.objects.values_list("pk", "school_id"):
+        school_years[school_id].add(school_year_id)
+    SubjectYear.objects.bulk_create(
+        [
+            SubjectYear(subject_id=keep, school_year_id=school_year_id, is_active=False)
+            for (school_id, _), keep in kept.items()
+            for school_year_id in sorted(school_years[school_id] - years[keep])
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_subject_catalog'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_yearly_subjects, migrations.RunPython.noop),
+    ]
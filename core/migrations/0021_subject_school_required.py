@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-19 03:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_merge_yearly_subjects'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='subject',
+            options={'ordering': ['name'], 'verbose_name': 'Matière', 'verbose_name_plural': 'Matières'},
+        ),
+        migrations.RemoveConstraint(
+            model_name='subject',
+            name='unique_subject_per_year',
+        ),
+        migrations.RemoveField(
+            model_name='subject',
+            name='school_year',
+        ),
+        migrations.AlterField(
+            model_name='subject',
+            name='school',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subjects', to='core.school', verbose_name='Établissement'),
+        ),
+        migrations.AddConstraint(
+            model_name='subject',
+            constraint=models.UniqueConstraint(fields=('school', 'name'), name='unique_subject_per_school'),
+        ),
+    ]
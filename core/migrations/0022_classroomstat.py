@@ -0,0 +1,34 @@
+# Generated by Django 5.2.1 on 2026-10-19 03:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_subject_school_required'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassroomStat',
+            fields=[
+                ('classroom', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stat', serialize=False, to='core.classroom', verbose_name='Classe')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='Année de début')),
+                ('student_count', models.PositiveIntegerField(default=0, verbose_name='Élèves')),
+                ('capacity', models.PositiveIntegerField(default=0, verbose_name='Capacité')),
+                ('refreshed_at', models.DateTimeField(verbose_name='Calculé le')),
+                ('grade', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.grade', verbose_name='Cycle')),
+                ('grade_option', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.gradeoption', verbose_name='Option')),
+                ('level', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.level', verbose_name='Niveau')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.school', verbose_name='Établissement')),
+                ('school_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.schoolyear', verbose_name='Année scolaire')),
+            ],
+            options={
+                'verbose_name': 'Statistique de classe',
+                'verbose_name_plural': 'Statistiques de classes',
+                'indexes': [models.Index(fields=['year', 'school'], name='classroomstat_year_school')],
+            },
+        ),
+    ]
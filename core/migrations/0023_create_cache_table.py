@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.db import migrations
+
+DATABASE_CACHE = "django.core.cache.backends.db.DatabaseCache"
+
+
+def create_cache_table(apps, schema_editor):
+    # Uniquement si DJANGO_CACHE_URL désigne la base (db://) : le cache par
+    # défaut n'en a pas besoin.
+    if any(cache["BACKEND"] == DATABASE_CACHE for cache in settings.CACHES.values()):
+        call_command("createcachetable", database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_classroomstat'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
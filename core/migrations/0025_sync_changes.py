@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-19 04:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_evaluation_mark_attendance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_value', models.PositiveBigIntegerField(default=0, verbose_name='Dernier numéro attribué')),
+                ('pruned_through', models.PositiveBigIntegerField(default=0, verbose_name="Purgé jusqu'au numéro")),
+            ],
+            options={
+                'verbose_name': 'Compteur de synchronisation',
+                'verbose_name_plural': 'Compteurs de synchronisation',
+            },
+        ),
+        migrations.CreateModel(
+            name='SyncChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.PositiveBigIntegerField(unique=True, verbose_name='Numéro')),
+                ('model', models.CharField(max_length=50, verbose_name='Modèle')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='Objet')),
+                ('classroom_id', models.PositiveBigIntegerField(verbose_name='Classe')),
+                ('deleted', models.BooleanField(default=False, verbose_name='Suppression')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date')),
+            ],
+            options={
+                'verbose_name': 'Changement synchronisé',
+                'verbose_name_plural': 'Changements synchronisés',
+                'indexes': [models.Index(fields=['classroom_id', 'seq'], name='syncchange_classroom_seq')],
+            },
+        ),
+    ]
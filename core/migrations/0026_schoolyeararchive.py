@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-19 04:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_sync_changes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchoolYearArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('school_year_id', models.PositiveBigIntegerField(unique=True, verbose_name='Année scolaire (identifiant)')),
+                ('name', models.CharField(max_length=50, verbose_name='Année scolaire')),
+                ('start_date', models.DateField(verbose_name='Date de début')),
+                ('end_date', models.DateField(verbose_name='Date de fin')),
+                ('file', models.CharField(blank=True, max_length=255, verbose_name="Fichier d'export")),
+                ('row_counts', models.JSONField(default=dict, verbose_name='Lignes par modèle')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('purged_at', models.DateTimeField(blank=True, null=True, verbose_name='Date de purge')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Créé par')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archives', to='core.school', verbose_name='Établissement')),
+            ],
+            options={
+                'verbose_name': "Archive d'année scolaire",
+                'verbose_name_plural': "Archives d'années scolaires",
+                'ordering': ('-start_date',),
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-19 04:19
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_timetable'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classroomsubject',
+            name='weekly_hours',
+            field=models.DecimalField(blank=True, decimal_places=1, help_text='Heures de cours par semaine, pour le calcul des services (core.workload).', max_digits=4, null=True, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Heures hebdomadaires'),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='service_hours',
+            field=models.DecimalField(blank=True, decimal_places=1, help_text='Heures dues par semaine. Laisser vide pour reprendre TEACHER_SERVICE_HOURS.', max_digits=4, null=True, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Service hebdomadaire'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+from django.db import migrations, models
+
+
+def split_counter(apps, schema_editor):
+    """
+    Remplace le compteur unique par un compteur par classe. Chaque classe
+    repart du dernier numéro global : les numéros déjà attribués et les
+    curseurs déjà distribués restent valables.
+    """
+    Classroom = apps.get_model("core", "Classroom")
+    SyncChange = apps.get_model("core", "SyncChange")
+    SyncCounter = apps.get_model("core", "SyncCounter")
+    last_value, pruned_through = (
+        SyncCounter.objects.filter(classroom_id__isnull=True).values_list("last_value", "pruned_through").first()
+        or (0, 0)
+    )
+    classroom_ids = {
+        *Classroom.objects.values_list("pk", flat=True),
+        *SyncChange.objects.values_list("classroom_id", flat=True).distinct(),
+    }
+    SyncCounter.objects.all().delete()
+    SyncCounter.objects.bulk_create([
+        SyncCounter(classroom_id=classroom_id, last_value=last_value, pruned_through=pruned_through)
+        for classroom_id in sorted(classroom_ids)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_workload_hours'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='synccounter',
+            name='classroom_id',
+            field=models.PositiveBigIntegerField(null=True, unique=True, verbose_name='Classe'),
+        ),
+        migrations.RunPython(split_counter, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='synccounter',
+            name='classroom_id',
+            field=models.PositiveBigIntegerField(unique=True, verbose_name='Classe'),
+        ),
+        migrations.RemoveIndex(
+            model_name='syncchange',
+            name='syncchange_classroom_seq',
+        ),
+        migrations.AlterField(
+            model_name='syncchange',
+            name='seq',
+            field=models.PositiveBigIntegerField(verbose_name='Numéro'),
+        ),
+        migrations.AddConstraint(
+            model_name='syncchange',
+            constraint=models.UniqueConstraint(fields=('classroom_id', 'seq'), name='syncchange_classroom_seq'),
+        ),
+    ]
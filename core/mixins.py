@@ -0,0 +1,156 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template import loader
+from django.template.context import make_context
+from django.template.loader_tags import BlockNode
+from django.utils.cache import patch_vary_headers
+
+from core.cache import (
+    aget_model_versions,
+    arecord_cache_access,
+    get_model_versions,
+    make_fragment_key,
+    record_cache_access,
+)
+from core.replicas import prefer_replica, reads_from_replica
+
+
+def render_block_to_string(template_name, block_name, context=None, request=None):
+    """
+    Rend un seul ``{% block %}`` d'un template (y compris un template qui en
+    étend un autre), sans le reste de la page.
+    """
+    template = loader.get_template(template_name).template
+    for node in template.nodelist.get_nodes_by_type(BlockNode):
+        if node.name == block_name:
+            break
+    else:
+        raise ValueError(f"Le bloc {block_name!r} n'existe pas dans {template_name!r}.")
+    context = make_context(context, request)
+    with context.bind_template(template):
+        return node.render(context)
+
+
+class HtmxPartialMixin:
+    """
+    Pour une requête HTMX, ne rend que la partie de la page visée par
+    ``HX-Target`` :
+
+    - ``partial_templates`` associe une cible à un template partiel ou à un
+      composant cotton (ex. ``"cotton/student_card.html"``) ;
+    - ``partial_blocks`` associe une cible à un bloc du template de la page.
+
+    Une cible inconnue, ou une restauration d'historique, rend la page entière.
+
+    Si ``fragment_cache_models`` est renseigné, la réponse est mise en cache
+    sous une clé dérivée des versions de ces modèles (voir ``core.cache``) :
+    toute écriture sur l'un d'eux l'invalide. Sans ``fragment_cache_vary_on_user``,
+    la clé porte ``access_scope`` (défini par la vue) au lieu de l'utilisateur.
+    """
+    partial_templates = {}
+    partial_blocks = {"content": "content"}
+    fragment_cache_models = ()
+    fragment_cache_timeout = 300
+    fragment_cache_vary_on_user = True
+
+    def get_partial(self):
+        htmx = getattr(self.request, "htmx", None)
+        if not htmx or htmx.history_restore_request:
+            return None
+        if htmx.target in self.partial_templates:
+            return self.partial_templates[htmx.target], None
+        if htmx.target in self.partial_blocks:
+            return self.get_template_names()[0], self.partial_blocks[htmx.target]
+        return None
+
+    def render_to_response(self, context, **response_kwargs):
+        partial = self.get_partial()
+        if partial is None:
+            response = super().render_to_response(context, **response_kwargs)
+        else:
+            template_name, block_name = partial
+            if block_name is None:
+                content = loader.render_to_string(template_name, context, self.request)
+            else:
+                content = render_block_to_string(template_name, block_name, context, self.request)
+            response = HttpResponse(content, **response_kwargs)
+        patch_vary_headers(response, ("HX-Request", "HX-Target"))
+        return response
+
+    def _fragment_key_parts(self, user):
+        htmx = getattr(self.request, "htmx", None)
+        return (
+            self.request.get_full_path(),
+            bool(htmx) and not htmx.history_restore_request,
+            htmx.target if htmx else "",
+            user.pk if self.fragment_cache_vary_on_user else "",
+            # Droit d'accès établi par la vue : un fragment partagé ne sert qu'à ce périmètre.
+            getattr(self, "access_scope", ""),
+        )
+
+    def get_fragment_cache_key(self, user):
+        if not self.fragment_cache_models:
+            return None
+        versions = get_model_versions(self.fragment_cache_models)
+        return make_fragment_key(type(self).__name__, versions, *self._fragment_key_parts(user))
+
+    async def aget_fragment_cache_key(self, user):
+        if not self.fragment_cache_models:
+            return None
+        versions = await aget_model_versions(self.fragment_cache_models)
+        return make_fragment_key(type(self).__name__, versions, *self._fragment_key_parts(user))
+
+    def cached_response(self, content):
+        response = HttpResponse(content)
+        patch_vary_headers(response, ("HX-Request", "HX-Target"))
+        return response
+
+    def get(self, request, *args, **kwargs):
+        key = self.get_fragment_cache_key(request.user)
+        if key:
+            content = cache.get(key)
+            record_cache_access("fragment", hit=content is not None)
+            if content is not None:
+                return self.cached_response(content)
+        response = super().get(request, *args, **kwargs)
+        # Un fragment lu sur un réplica peut être en retard sur les versions de la clé.
+        if key and response.status_code == 200 and not reads_from_replica():
+            if hasattr(response, "render"):
+                response.render()
+            cache.set(key, response.content, self.fragment_cache_timeout)
+        return response
+
+
+class AsyncHtmxPartialMixin(HtmxPartialMixin):
+    """
+    Variante de ``HtmxPartialMixin`` pour les vues asynchrones : la lecture du
+    cache et des versions est asynchrone, le rendu se fait dans un thread.
+    """
+
+    async def render_fragment(self, user, build_context):
+        key = await self.aget_fragment_cache_key(user)
+        if key:
+            content = await cache.aget(key)
+            await arecord_cache_access("fragment", hit=content is not None)
+            if content is not None:
+                return self.cached_response(content)
+        context = await build_context()
+        response = await sync_to_async(self.render_to_response)(context)
+        if hasattr(response, "render"):
+            await sync_to_async(response.render)()
+        if key and not reads_from_replica():
+            await cache.aset(key, response.content, self.fragment_cache_timeout)
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    Lectures sur un réplica pour les ``GET`` et ``HEAD`` de la vue, sauf
+    écriture récente du client (voir ``core.replicas``).
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in ("GET", "HEAD"):
+            prefer_replica()
+        return super().dispatch(request, *args, **kwargs)
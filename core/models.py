@@ -1,9 +1,14 @@
-from django.db import models
+from abc import abstractmethod
+
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 
+from core.cache import bump_model_version
+
 class TimeStampedModelWithUser(models.Model):
     """
     Classe abstraite pour le suivi automatique des créations et modifications
@@ -32,6 +37,65 @@ class TimeStampedModelWithUser(models.Model):
         abstract = True
 
 
+class DisplayLabelModel(models.Model):
+    """
+    Classe abstraite pour les modèles dont le libellé dépend d'objets liés.
+
+    Le libellé est calculé à l'enregistrement et stocké dans ``display_label`` :
+    afficher N objets ne coûte plus de requêtes supplémentaires. Quand un
+    ancêtre change (nom d'une école, d'un niveau…), les libellés dépendants sont
+    recalculés en masse (voir ``core.labels``).
+
+    ``label_parents`` liste les relations (chemins ``a__b``) lues par
+    ``build_display_label`` ; elles servent au ``select_related`` des
+    recalculs et à déterminer les dépendances.
+    """
+    display_label = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        verbose_name=_("Libellé"),
+    )
+
+    label_parents = ()
+
+    class Meta:
+        abstract = True
+
+    # ``ModelBase`` n'est pas un ``ABCMeta`` : la vérification ``core.E002``
+    # (``core.checks``) s'assure au démarrage que chaque modèle concret la définit.
+    @abstractmethod
+    def build_display_label(self):
+        """Libellé de l'objet, lu sur lui-même et sur ``label_parents``."""
+
+    def save(self, *args, **kwargs):
+        self.display_label = self.build_display_label()[:255]
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "display_label" not in update_fields:
+            kwargs["update_fields"] = {*update_fields, "display_label"}
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.display_label or self.build_display_label()
+
+    @classmethod
+    def refresh_display_labels(cls, queryset=None, batch_size=1000):
+        """
+        Recalcule les libellés de ``queryset`` (tous par défaut) et n'écrit que
+        ceux qui ont changé, en ``bulk_update``. Retourne leurs clés primaires.
+        """
+        if queryset is None:
+            queryset = cls._default_manager.all()
+        changed = []
+        for obj in queryset.select_related(*cls.label_parents).order_by("pk").iterator(chunk_size=batch_size):
+            label = obj.build_display_label()[:255]
+            if label != obj.display_label:
+                obj.display_label = label
+                changed.append(obj)
+        cls._default_manager.bulk_update(changed, ["display_label"], batch_size=batch_size)
+        return [obj.pk for obj in changed]
+
+
 class School(TimeStampedModelWithUser):
     """
     Modèle représentant un établissement scolaire.
@@ -66,7 +130,7 @@ class School(TimeStampedModelWithUser):
         return f"{self.name} - {self.quartier}, {self.ville}"
 
 
-class SchoolYear(models.Model):
+class SchoolYear(DisplayLabelModel):
     school = models.ForeignKey("School", on_delete=models.CASCADE, related_name="school_years", verbose_name=_("Établissement"))
     start_date = models.DateField(verbose_name=_("Date de début"))
     end_date = models.DateField(verbose_name=_("Date de fin"), blank=True)
@@ -105,11 +169,13 @@ class SchoolYear(models.Model):
 
         super().save(*args, **kwargs)
 
-    def __str__(self):
+    label_parents = ("school",)
+
+    def build_display_label(self):
         return f"{self.name} ({self.school})"
 
 
-class Grade(TimeStampedModelWithUser):
+class Grade(DisplayLabelModel, TimeStampedModelWithUser):
     # L'école à laquelle appartient ce cycle
     school = models.ForeignKey(
         "School",
@@ -150,13 +216,15 @@ class Grade(TimeStampedModelWithUser):
         unique_together = [("school", "name")]
         ordering = ["order"]
 
-    def __str__(self):
+    label_parents = ("school",)
+
+    def build_display_label(self):
         return f"{self.name} ({self.school})"
 
 
 
 
-class GradeOption(TimeStampedModelWithUser):
+class GradeOption(DisplayLabelModel, TimeStampedModelWithUser):
     """
     Représente une option spécifique à un cycle éducatif (Grade), 
     par ex. : Sciences, Lettres, Techniques.
@@ -187,11 +255,13 @@ class GradeOption(TimeStampedModelWithUser):
         unique_together = [("grade", "name")]
         ordering = ["grade", "order"]
 
-    def __str__(self):
+    label_parents = ("grade",)
+
+    def build_display_label(self):
         return f"{self.name} ({self.grade})"
 
 
-class Level(TimeStampedModelWithUser):
+class Level(DisplayLabelModel, TimeStampedModelWithUser):
     """
     Représente un niveau d'étude dans un cycle (Grade), ex: 6e, 5e, Terminale.
     """
@@ -221,10 +291,12 @@ class Level(TimeStampedModelWithUser):
         unique_together = [("grade", "name")]
         ordering = ["grade", "order"]
 
-    def __str__(self):
+    label_parents = ("grade",)
+
+    def build_display_label(self):
         return f"{self.name} ({self.grade})"
 
-class SchoolYearLevel(TimeStampedModelWithUser):
+class SchoolYearLevel(DisplayLabelModel, TimeStampedModelWithUser):
     school_year = models.ForeignKey(
         SchoolYear,
         on_delete=models.CASCADE,
@@ -263,10 +335,12 @@ class SchoolYearLevel(TimeStampedModelWithUser):
         if self.grade.school != self.school_year.school:
             raise ValidationError(_("Le cycle sélectionné n'appartient pas au même établissement que l'année scolaire."))
 
-    def __str__(self):
+    label_parents = ("level", "school_year")
+
+    def build_display_label(self):
         return f"{self.level} ({self.school_year})"
 
-class Classroom(TimeStampedModelWithUser):
+class Classroom(DisplayLabelModel, TimeStampedModelWithUser):
     school_year_level = models.ForeignKey(
         'SchoolYearLevel',
         on_delete=models.CASCADE,
@@ -287,6 +361,12 @@ class Classroom(TimeStampedModelWithUser):
         verbose_name=_("option"),
         help_text=_("Option du grade, ex: Sciences, Lettres..."),
     )
+    capacity = models.PositiveSmallIntegerField(
+        default=50,
+        validators=[MinValueValidator(1)],
+        verbose_name=_("capacité"),
+        help_text=_("Nombre maximum d'élèves dans la classe."),
+    )
 
     class Meta:
         verbose_name = _("classe")
@@ -309,45 +389,160 @@ class Classroom(TimeStampedModelWithUser):
         if self.grade_option and self.grade_option.grade != self.school_year_level.grade:
             raise ValidationError(_("L'option ne correspond pas au grade de ce niveau."))
 
-    def __str__(self):
+    label_parents = ("school_year_level__level", "grade_option")
+
+    def build_display_label(self):
         if self.grade_option:
             return f"{self.school_year_level.level.name} {self.grade_option.abbreviation} {self.name}"
         return f"{self.school_year_level.level.name} - {self.name}"
 
 
 
-class Subject(TimeStampedModelWithUser):
+class SubjectQuerySet(models.QuerySet):
+    def for_year(self, school_year):
+        """
+        Matières actives pour ``school_year`` avec leur coefficient de l'année
+        (``year_coefficient``) : le catalogue de l'établissement, moins les
+        matières désactivées cette année-là, surchargé par ``SubjectYear``.
+        """
+        override = SubjectYear.objects.filter(school_year=school_year, subject=models.OuterRef("pk"))
+        return (
+            self.filter(school_id=school_year.school_id)
+            .annotate(
+                year_is_active=Coalesce(
+                    models.Subquery(override.values("is_active")[:1]), "is_active"
+                ),
+                year_coefficient=Coalesce(
+                    models.Subquery(override.values("coefficient")[:1]), "coefficient"
+                ),
+            )
+            .filter(year_is_active=True)
+        )
+
+
+class Subject(DisplayLabelModel, TimeStampedModelWithUser):
     """
-    Représente une matière définie pour une année scolaire spécifique dans un établissement donné.
-    Exemple : 'Mathématiques' pour l'année 2024-2025 du Collège Sainte-Marie.
+    Matière du catalogue d'un établissement, commune à toutes ses années.
+    Exemple : 'Mathématiques' au Collège Sainte-Marie.
+
+    Une année ne diffère du catalogue que par ses ``SubjectYear`` : la bascule
+    d'année ne copie aucune matière, et un même ``subject_id`` regroupe les
+    notes et statistiques de toutes les années.
     """
-    school_year = models.ForeignKey(
-        SchoolYear,
+    school = models.ForeignKey(
+        School,
         on_delete=models.CASCADE,
         related_name="subjects",
-        verbose_name=_("Année scolaire")
+        verbose_name=_("Établissement")
     )
     name = models.CharField(
         max_length=100,
         verbose_name=_("Nom de la matière")
     )
+    coefficient = models.DecimalField(
+        max_digits=4,
+        decimal_places=2,
+        default=1.0,
+        validators=[MinValueValidator(0.01)],
+        verbose_name=_("Coefficient par défaut")
+    )
+    is_active = models.BooleanField(
+        default=True,
+        verbose_name=_("Active"),
+        help_text=_("Valeur par défaut pour les années sans surcharge.")
+    )
+
+    objects = SubjectQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("Matière")
+        verbose_name_plural = _("Matières")
+        ordering = ["name"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["school", "name"],
+                name="unique_subject_per_school"
+            )
+        ]
+
+    label_parents = ("school",)
+
+    def build_display_label(self):
+        return f"{self.name} ({self.school.name})"
+
+
+class SubjectYear(TimeStampedModelWithUser):
+    """
+    Surcharge d'une matière du catalogue pour une année scolaire : activation
+    ou coefficient propres à l'année. N'existe que si l'année diffère du
+    catalogue ; un champ vide reprend la valeur de ``Subject``.
+    """
+    school_year = models.ForeignKey(
+        SchoolYear,
+        on_delete=models.CASCADE,
+        related_name="subject_overrides",
+        verbose_name=_("Année scolaire")
+    )
+    subject = models.ForeignKey(
+        Subject,
+        on_delete=models.CASCADE,
+        related_name="year_overrides",
+        verbose_name=_("Matière")
+    )
+    is_active = models.BooleanField(
+        null=True,
+        blank=True,
+        verbose_name=_("Active cette année")
+    )
+    coefficient = models.DecimalField(
+        max_digits=4,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(0.01)],
+        verbose_name=_("Coefficient de l'année")
+    )
 
     class Meta:
         verbose_name = _("Matière annuelle")
         verbose_name_plural = _("Matières annuelles")
-        ordering = ["name"]
         constraints = [
             models.UniqueConstraint(
-                fields=["school_year", "name"],
-                name="unique_subject_per_year"
+                fields=["school_year", "subject"],
+                name="unique_subject_override_per_year"
             )
         ]
 
+    def clean(self):
+        if self.subject.school_id != self.school_year.school_id:
+            raise ValidationError(
+                _("La matière et l'année scolaire doivent appartenir au même établissement.")
+            )
+
     def __str__(self):
-        return f"{self.name} ({self.school_year.name})"
+        return f"{self.subject.name} ({self.school_year.name})"
+
+
+class ClassroomSubjectQuerySet(models.QuerySet):
+    def with_coefficient(self):
+        """
+        Annote ``effective_coefficient`` : celui de la classe, sinon celui de
+        l'année (``SubjectYear``), sinon celui du catalogue.
+        """
+        override = SubjectYear.objects.filter(
+            subject=models.OuterRef("subject_id"),
+            school_year=models.OuterRef("classroom__school_year_level__school_year_id"),
+        )
+        return self.annotate(
+            effective_coefficient=Coalesce(
+                "coefficient",
+                models.Subquery(override.values("coefficient")[:1]),
+                "subject__coefficient",
+            )
+        )
 
 
-class ClassroomSubject(TimeStampedModelWithUser):
+class ClassroomSubject(DisplayLabelModel, TimeStampedModelWithUser):
     """
     Lien entre une matière et une classe pour une année scolaire,
     avec un coefficient et potentiellement un enseignant assigné.
@@ -367,11 +562,32 @@ class ClassroomSubject(TimeStampedModelWithUser):
     coefficient = models.DecimalField(
         max_digits=4,
         decimal_places=2,
-        default=1.0,
+        null=True,
+        blank=True,
         validators=[MinValueValidator(0.01)],
-        verbose_name=_("Coefficient")
+        verbose_name=_("Coefficient"),
+        help_text=_("Laisser vide pour reprendre le coefficient de la matière pour l'année.")
+    )
+    teacher = models.ForeignKey(
+        "core.Teacher",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="classroom_subjects",
+        verbose_name=_("Enseignant")
+    )
+    weekly_hours = models.DecimalField(
+        max_digits=4,
+        decimal_places=1,
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(0)],
+        verbose_name=_("Heures hebdomadaires"),
+        help_text=_("Heures de cours par semaine, pour le calcul des services (core.workload).")
     )
 
+    objects = ClassroomSubjectQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Matière en classe")
         verbose_name_plural = _("Matières en classe")
@@ -383,30 +599,35 @@ class ClassroomSubject(TimeStampedModelWithUser):
         ]
 
     def clean(self):
-        # Vérifier la correspondance des écoles et années scolaires
         classroom_sy = self.classroom.school_year_level.school_year
-        subject_sy = self.subject.school_year
 
-        if subject_sy != classroom_sy:
+        if self.subject.school_id != classroom_sy.school_id:
             raise ValidationError(
-                _("La matière et la classe doivent appartenir à la même année scolaire.")
+                _("La matière et la classe doivent appartenir au même établissement.")
             )
 
-        if subject_sy.school != classroom_sy.school:
+        if not Subject.objects.for_year(classroom_sy).filter(pk=self.subject_id).exists():
             raise ValidationError(
-                _("La matière et la classe doivent appartenir au même établissement.")
+                _("La matière n'est pas active pour l'année scolaire de la classe.")
             )
 
-        if self.coefficient <= 0:
+        if self.coefficient is not None and self.coefficient <= 0:
             raise ValidationError(
                 _("Le coefficient doit être un nombre positif.")
             )
 
-    def __str__(self):
+        if self.teacher and self.teacher.school_year_id != classroom_sy.pk:
+            raise ValidationError(
+                _("L'enseignant doit appartenir à l'année scolaire de la classe.")
+            )
+
+    label_parents = ("subject", "classroom")
+
+    def build_display_label(self):
         return f"{self.subject.name} - {self.classroom.name}"
 
 
-class Teacher(TimeStampedModelWithUser):
+class Teacher(DisplayLabelModel, TimeStampedModelWithUser):
     """
     Représente un enseignant pour une année scolaire donnée.
     Un même utilisateur peut être enseignant dans plusieurs écoles, mais pas dans la même SchoolYear.
@@ -424,57 +645,713 @@ class Teacher(TimeStampedModelWithUser):
         related_name="teachers",
         verbose_name=_("Année scolaire"),
     )
+    service_hours = models.DecimalField(
+        max_digits=4,
+        decimal_places=1,
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(0)],
+        verbose_name=_("Service hebdomadaire"),
+        help_text=_("Heures dues par semaine. Laisser vide pour reprendre TEACHER_SERVICE_HOURS.")
+    )
 
     class Meta:
         verbose_name = _("Enseignant")
         verbose_name_plural = _("Enseignants")
         unique_together = ("user", "school_year")  # Un enseignant par année scolaire
 
-    def __str__(self):
+    label_parents = ("user", "school_year")
+
+    def build_display_label(self):
         return f"{self.user.first_name} - {self.school_year.name}"
 
     def clean(self):
-        # Vérifie que l'utilisateur appartient bien à l'école de l'année scolaire
-        if hasattr(self.user, "student_profiles"):
-            if self.user.student_profiles.filter(school_year=self.school_year).exists():
-                raise ValidationError(
-                    _("Un utilisateur ne peut pas être enseignant dans une année scolaire où il est élève.")
-                )
-
-class Student(TimeStampedModelWithUser):
+        # Un élève inscrit cette année ne peut pas y être enseignant
+        if Enrollment.objects.filter(student__user_id=self.user_id, school_year=self.school_year).exists():
+            raise ValidationError(
+                _("Un utilisateur ne peut pas être enseignant dans une année scolaire où il est élève.")
+            )
+
+class StudentQuerySet(models.QuerySet):
+    def for_guardian(self, user):
+        """
+        Enfants d'un tuteur avec l'historique de leurs inscriptions (toutes écoles
+        et années confondues), la classe et ses matières : trois requêtes quel que
+        soit le nombre d'enfants ou d'années.
+        """
+        return (
+            self.filter(guardians__guardian=user)
+            .select_related("user")
+            .prefetch_related(
+                models.Prefetch(
+                    "enrollments",
+                    queryset=Enrollment.objects.select_related(
+                        "school_year__school",
+                        "classroom__school_year_level__level",
+                        "classroom__grade_option",
+                    ).order_by("-school_year__start_date"),
+                    to_attr="enrollment_history",
+                ),
+                models.Prefetch(
+                    "enrollment_history__classroom__classroom_subjects",
+                    queryset=(
+                        ClassroomSubject.objects.with_coefficient()
+                        .select_related("subject", "teacher__user")
+                        .order_by("subject__name")
+                    ),
+                ),
+            )
+            .order_by("user__first_name")
+        )
+
+
+class Student(DisplayLabelModel, TimeStampedModelWithUser):
+    """
+    Profil élève d'un utilisateur, stable d'une année à l'autre. La classe,
+    l'année et le numéro d'inscription sont portés par ``Enrollment``.
+    """
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='student_profile')
-    classroom = models.ForeignKey(Classroom, on_delete=models.CASCADE, related_name='students', verbose_name=_("Classe"))
-    schoolyear = models.ForeignKey(SchoolYear, on_delete=models.CASCADE, related_name='students', verbose_name=_("Année scolaire"))
-    enrollment_number = models.CharField(_("Numéro d'inscription"), max_length=30, unique=True)
+
+    objects = StudentQuerySet.as_manager()
 
     class Meta:
-        unique_together = ('user', 'schoolyear')
         verbose_name = _("Élève")
         verbose_name_plural = _("Élèves")
 
+    label_parents = ("user",)
+
+    def build_display_label(self):
+        return f"{self.user.first_name} {self.user.last_name}"
+
+
+class EnrollmentSequenceManager(models.Manager):
+    def allocate(self, school_year, count=1):
+        """
+        Réserve ``count`` numéros consécutifs pour ``school_year`` et retourne
+        la plage ``range`` correspondante.
+
+        L'UPDATE passe en premier : il verrouille la ligne (PostgreSQL) ou prend
+        directement le verrou d'écriture de la base (SQLite), si bien que des
+        imports parallèles obtiennent des blocs disjoints sans lecture préalable
+        ni nouvelle tentative.
+        """
+        if count < 1:
+            raise ValueError("count doit être supérieur ou égal à 1.")
+        sequence = self.filter(school_year_id=school_year.pk)
+        with transaction.atomic(using=self.db):
+            if not sequence.update(last_value=models.F("last_value") + count):
+                try:
+                    with transaction.atomic(using=self.db):
+                        self.create(school_year_id=school_year.pk, last_value=count)
+                except IntegrityError:
+                    # Créée entre-temps par une autre transaction.
+                    sequence.update(last_value=models.F("last_value") + count)
+            last_value = sequence.values_list("last_value", flat=True).get()
+        return range(last_value - count + 1, last_value + 1)
+
+
+class EnrollmentSequence(models.Model):
+    """
+    Compteur des numéros d'inscription d'une année scolaire (donc d'un
+    établissement). Voir ``EnrollmentSequence.objects.allocate``.
+    """
+    school_year = models.OneToOneField(
+        SchoolYear,
+        on_delete=models.CASCADE,
+        related_name="enrollment_sequence",
+        verbose_name=_("Année scolaire"),
+    )
+    last_value = models.PositiveIntegerField(default=0, verbose_name=_("Dernier numéro attribué"))
+
+    objects = EnrollmentSequenceManager()
+
+    class Meta:
+        verbose_name = _("Séquence de numéros d'inscription")
+        verbose_name_plural = _("Séquences de numéros d'inscription")
+
+    @staticmethod
+    def format_number(school_year, value):
+        # Ex. « 12-2024-00042 » : établissement, année de rentrée, rang.
+        return f"{school_year.school_id}-{school_year.start_date.year}-{value:05d}"
+
+    def __str__(self):
+        return f"{self.school_year} : {self.last_value}"
+
+
+def assign_enrollment_numbers(enrollments):
+    """
+    Attribue un numéro aux inscriptions qui n'en ont pas, avec un seul bloc
+    réservé par année scolaire.
+    """
+    missing = {}
+    for enrollment in enrollments:
+        if not enrollment.enrollment_number:
+            missing.setdefault(enrollment.school_year_id, []).append(enrollment)
+    if not missing:
+        return
+    school_years = SchoolYear.objects.in_bulk(missing)
+    for school_year_id, pending in missing.items():
+        school_year = school_years[school_year_id]
+        numbers = EnrollmentSequence.objects.allocate(school_year, len(pending))
+        for enrollment, value in zip(pending, numbers):
+            enrollment.enrollment_number = EnrollmentSequence.format_number(school_year, value)
+
+
+class EnrollmentQuerySet(models.QuerySet):
+    def current(self):
+        return self.filter(is_current=True)
+
+    def enroll(self, student, classroom, enrollment_number="", **extra_fields):
+        """
+        Inscrit l'élève dans ``classroom`` : l'inscription précédente reste dans
+        l'historique mais n'est plus courante. Sans ``enrollment_number``, un
+        numéro est attribué automatiquement.
+        """
+        with transaction.atomic(using=self.db):
+            self.filter(student=student, is_current=True).update(is_current=False)
+            return self.create(
+                student=student,
+                classroom=classroom,
+                school_year_id=classroom.school_year_level.school_year_id,
+                enrollment_number=enrollment_number,
+                is_current=True,
+                **extra_fields,
+            )
+
+    def bulk_enroll(self, enrollments, batch_size=1000):
+        """
+        Version en masse de ``enroll`` pour la bascule d'année : un seul UPDATE
+        pour clore les inscriptions courantes, puis un ``bulk_create`` ; les
+        libellés sont calculés ensuite en une passe.
+        """
+        assign_enrollment_numbers(enrollments)
+        with transaction.atomic(using=self.db):
+            self.filter(
+                student_id__in={enrollment.student_id for enrollment in enrollments},
+                is_current=True,
+            ).update(is_current=False)
+            for enrollment in enrollments:
+                enrollment.is_current = True
+            created = self.bulk_create(enrollments, batch_size=batch_size)
+            self.model.refresh_display_labels(self.filter(pk__in=[enrollment.pk for enrollment in created]))
+            from core.changes import record_changes
+
+            record_changes(self.model, [(enrollment.pk, enrollment.classroom_id) for enrollment in created])
+        from core.stats import refresh_classroom_stats
+
+        refresh_classroom_stats({enrollment.classroom_id for enrollment in created})
+        # bulk_create ne déclenche pas post_save.
+        bump_model_version(self.model)
+        return created
+
+
+class Enrollment(DisplayLabelModel, TimeStampedModelWithUser):
+    """
+    Inscription d'un élève dans une classe pour une année scolaire. Un élève a
+    une inscription par année, dont au plus une courante.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='enrollments', verbose_name=_("Élève"))
+    school_year = models.ForeignKey(SchoolYear, on_delete=models.CASCADE, related_name='enrollments', verbose_name=_("Année scolaire"))
+    classroom = models.ForeignKey(Classroom, on_delete=models.CASCADE, related_name='enrollments', verbose_name=_("Classe"))
+    enrollment_number = models.CharField(
+        _("Numéro d'inscription"),
+        max_length=30,
+        unique=True,
+        blank=True,
+        help_text=_("Laisser vide pour attribuer automatiquement le numéro suivant."),
+    )
+    is_current = models.BooleanField(default=True, verbose_name=_("Inscription courante"))
+
+    objects = EnrollmentQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("Inscription")
+        verbose_name_plural = _("Inscriptions")
+        constraints = [
+            # Sert aussi d'index pour « toutes les années de cet élève ».
+            models.UniqueConstraint(
+                fields=["student", "school_year"],
+                name="unique_enrollment_per_year"
+            ),
+            # Index partiel pour « l'inscription courante de cet élève ».
+            models.UniqueConstraint(
+                fields=["student"],
+                condition=models.Q(is_current=True),
+                name="unique_current_enrollment"
+            ),
+        ]
+
     def clean(self):
-        if self.classroom.school_year_level.school_year != self.schoolyear:
+        if self.classroom.school_year_level.school_year != self.school_year:
             raise ValidationError(_("La classe sélectionnée ne correspond pas à l'année scolaire de l'inscription."))
 
-        if self.classroom.school_year_level.grade.school != self.schoolyear.school:
+        if self.classroom.school_year_level.grade.school != self.school_year.school:
             raise ValidationError(_("La classe ne correspond pas à l’école de l’année scolaire."))
 
         # Vérifier que l'utilisateur n'est pas enseignant dans cette même classe
-        teacher_profile = getattr(self.user, 'teacher_profile', None)
-        if teacher_profile:
-            from core.models import ClassroomSubject
-            is_teacher_here = ClassroomSubject.objects.filter(
-                classroom=self.classroom,
-                teacher=teacher_profile
-            ).exists()
-            if is_teacher_here:
-                raise ValidationError(_("Un utilisateur ne peut pas être enseignant dans une classe où il est aussi élève."))
+        is_teacher_here = ClassroomSubject.objects.filter(
+            classroom=self.classroom,
+            teacher__user_id=self.student.user_id
+        ).exists()
+        if is_teacher_here:
+            raise ValidationError(_("Un utilisateur ne peut pas être enseignant dans une classe où il est aussi élève."))
+
+    def save(self, *args, **kwargs):
+        if not self.enrollment_number:
+            assign_enrollment_numbers([self])
+        super().save(*args, **kwargs)
+
+    label_parents = ("student__user", "classroom", "school_year")
+
+    def build_display_label(self):
+        return f"{self.student.user.first_name} - {self.classroom} - {self.school_year.name}"
+
+
+class StudentGuardian(TimeStampedModelWithUser):
+    """
+    Lien entre un tuteur (parent, tuteur légal…) et le profil élève d'un enfant.
+    Un tuteur peut suivre plusieurs enfants, un enfant avoir plusieurs tuteurs.
+    """
+
+    class Relationship(models.TextChoices):
+        FATHER = "father", _("Père")
+        MOTHER = "mother", _("Mère")
+        LEGAL_GUARDIAN = "legal_guardian", _("Tuteur légal")
+        OTHER = "other", _("Autre")
+
+    guardian = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="guarded_students",
+        limit_choices_to={"is_tutor": True},
+        verbose_name=_("Tuteur"),
+    )
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name="guardians",
+        verbose_name=_("Élève"),
+    )
+    relationship = models.CharField(
+        max_length=20,
+        choices=Relationship.choices,
+        default=Relationship.OTHER,
+        verbose_name=_("Lien de parenté"),
+    )
+    is_primary = models.BooleanField(
+        default=False,
+        verbose_name=_("Contact principal"),
+    )
+
+    class Meta:
+        verbose_name = _("Tuteur d'élève")
+        verbose_name_plural = _("Tuteurs d'élèves")
+        constraints = [
+            # Sert aussi d'index pour « les enfants de ce tuteur ».
+            models.UniqueConstraint(
+                fields=["guardian", "student"],
+                name="unique_guardian_per_student"
+            )
+        ]
+
+    def clean(self):
+        if not self.guardian.is_tutor:
+            raise ValidationError(_("L'utilisateur sélectionné n'est pas un tuteur."))
+
+    def __str__(self):
+        return f"{self.guardian} → {self.student}"
+
+
+class Evaluation(TimeStampedModelWithUser):
+    """
+    Devoir ou composition d'une matière dans une classe, noté sur ``max_score``.
+    """
+    classroom_subject = models.ForeignKey(
+        ClassroomSubject,
+        on_delete=models.CASCADE,
+        related_name="evaluations",
+        verbose_name=_("Matière en classe"),
+    )
+    name = models.CharField(max_length=100, verbose_name=_("Intitulé"))
+    date = models.DateField(verbose_name=_("Date"))
+    max_score = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        default=20,
+        validators=[MinValueValidator(1)],
+        verbose_name=_("Note maximale"),
+    )
+
+    class Meta:
+        verbose_name = _("Évaluation")
+        verbose_name_plural = _("Évaluations")
+        ordering = ["-date"]
+
+    def __str__(self):
+        return f"{self.name} ({self.date:%d/%m/%Y})"
+
+
+class Mark(TimeStampedModelWithUser):
+    """Note d'un élève (par son inscription) à une évaluation."""
+    evaluation = models.ForeignKey(
+        Evaluation,
+        on_delete=models.CASCADE,
+        related_name="marks",
+        verbose_name=_("Évaluation"),
+    )
+    enrollment = models.ForeignKey(
+        Enrollment,
+        on_delete=models.CASCADE,
+        related_name="marks",
+        verbose_name=_("Inscription"),
+    )
+    score = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        validators=[MinValueValidator(0)],
+        verbose_name=_("Note"),
+    )
+    comment = models.CharField(max_length=255, blank=True, verbose_name=_("Appréciation"))
+
+    class Meta:
+        verbose_name = _("Note")
+        verbose_name_plural = _("Notes")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["evaluation", "enrollment"],
+                name="unique_mark_per_evaluation"
+            )
+        ]
+
+    def clean(self):
+        if self.score is not None and self.score > self.evaluation.max_score:
+            raise ValidationError(_("La note dépasse la note maximale de l'évaluation."))
+
+    def __str__(self):
+        return f"{self.enrollment_id} : {self.score}"
+
+
+class Attendance(TimeStampedModelWithUser):
+    """Présence d'un élève à une date (appel de la classe)."""
+
+    class Status(models.TextChoices):
+        PRESENT = "present", _("Présent")
+        ABSENT = "absent", _("Absent")
+        LATE = "late", _("En retard")
+        EXCUSED = "excused", _("Absence justifiée")
+
+    enrollment = models.ForeignKey(
+        Enrollment,
+        on_delete=models.CASCADE,
+        related_name="attendances",
+        verbose_name=_("Inscription"),
+    )
+    # Recopiée de l'inscription : l'appel d'une classe se lit sans jointure.
+    classroom = models.ForeignKey(
+        Classroom,
+        on_delete=models.CASCADE,
+        related_name="attendances",
+        verbose_name=_("Classe"),
+    )
+    date = models.DateField(verbose_name=_("Date"))
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PRESENT,
+        verbose_name=_("Statut"),
+    )
+    note = models.CharField(max_length=255, blank=True, verbose_name=_("Remarque"))
+
+    class Meta:
+        verbose_name = _("Présence")
+        verbose_name_plural = _("Présences")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["enrollment", "date"],
+                name="unique_attendance_per_day"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["classroom", "date"], name="attendance_classroom_date"),
+        ]
+
+    def __str__(self):
+        return f"{self.enrollment_id} {self.date} : {self.get_status_display()}"
+
+
+class Room(TimeStampedModelWithUser):
+    """Salle d'un établissement, partagée par toutes ses années scolaires."""
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name="rooms", verbose_name=_("Établissement"))
+    name = models.CharField(max_length=50, verbose_name=_("Nom"))
+    capacity = models.PositiveIntegerField(null=True, blank=True, verbose_name=_("Capacité"))
+
+    class Meta:
+        verbose_name = _("Salle")
+        verbose_name_plural = _("Salles")
+        ordering = ["name"]
+        constraints = [
+            models.UniqueConstraint(fields=["school", "name"], name="unique_room_per_school"),
+        ]
 
     def __str__(self):
-        return f"{self.user.first_name} - {self.classroom} - {self.schoolyear.name}"
+        return self.name
 
 
+class Timeslot(TimeStampedModelWithUser):
+    """Créneau hebdomadaire de l'emploi du temps d'une année scolaire."""
 
+    class Day(models.IntegerChoices):
+        MONDAY = 1, _("Lundi")
+        TUESDAY = 2, _("Mardi")
+        WEDNESDAY = 3, _("Mercredi")
+        THURSDAY = 4, _("Jeudi")
+        FRIDAY = 5, _("Vendredi")
+        SATURDAY = 6, _("Samedi")
 
+    school_year = models.ForeignKey(
+        SchoolYear,
+        on_delete=models.CASCADE,
+        related_name="timeslots",
+        verbose_name=_("Année scolaire"),
+    )
+    day = models.PositiveSmallIntegerField(choices=Day.choices, verbose_name=_("Jour"))
+    start_time = models.TimeField(verbose_name=_("Début"))
+    end_time = models.TimeField(verbose_name=_("Fin"))
 
+    class Meta:
+        verbose_name = _("Créneau")
+        verbose_name_plural = _("Créneaux")
+        ordering = ["day", "start_time"]
+        constraints = [
+            models.UniqueConstraint(fields=["school_year", "day", "start_time"], name="unique_timeslot_per_year"),
+        ]
+
+    def clean(self):
+        if self.start_time and self.end_time and self.end_time <= self.start_time:
+            raise ValidationError(_("Le créneau doit finir après son début."))
 
+    def __str__(self):
+        return f"{self.get_day_display()} {self.start_time:%H:%M}-{self.end_time:%H:%M}"
+
+
+class TimetableEntry(TimeStampedModelWithUser):
+    """
+    Cours d'une matière en classe sur un créneau, dans une salle. Les conflits
+    (classe, enseignant ou salle déjà occupés) sont vérifiés par l'index
+    d'occupation de l'année (``core.timetable``).
+    """
+    timeslot = models.ForeignKey(
+        Timeslot,
+        on_delete=models.CASCADE,
+        related_name="entries",
+        verbose_name=_("Créneau"),
+    )
+    classroom_subject = models.ForeignKey(
+        ClassroomSubject,
+        on_delete=models.CASCADE,
+        related_name="timetable_entries",
+        verbose_name=_("Matière en classe"),
+    )
+    room = models.ForeignKey(
+        Room,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="entries",
+        verbose_name=_("Salle"),
+    )
+
+    class Meta:
+        verbose_name = _("Cours de l'emploi du temps")
+        verbose_name_plural = _("Emploi du temps")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["timeslot", "room"],
+                condition=models.Q(room__isnull=False),
+                name="unique_room_per_timeslot",
+            ),
+        ]
+
+    def clean(self):
+        from core.timetable import occupancy
+
+        if self.timeslot_id is None or self.classroom_subject_id is None:
+            return
+        school_year = self.classroom_subject.classroom.school_year_level.school_year
+        if self.timeslot.school_year_id != school_year.pk:
+            raise ValidationError(_("Le créneau et la classe doivent appartenir à la même année scolaire."))
+        if self.room and self.room.school_id != school_year.school_id:
+            raise ValidationError(_("La salle doit appartenir à l'établissement de la classe."))
+        conflicts = occupancy(school_year.pk, max_age=0).conflicts(
+            self.timeslot_id,
+            classroom_id=self.classroom_subject.classroom_id,
+            teacher_id=self.classroom_subject.teacher_id,
+            room_id=self.room_id,
+            exclude=self.pk,
+        )
+        if conflicts:
+            raise ValidationError(conflicts)
+
+    def __str__(self):
+        return f"{self.timeslot} : {self.classroom_subject}"
+
+
+class SyncCounterManager(models.Manager):
+    def allocate(self, counts):
+        """
+        Réserve, pour chaque classe de ``counts`` (``{classe: nombre}``), des
+        numéros de changement consécutifs et retourne ``{classe: range}``.
+
+        Un compteur par classe : seules les écritures d'une même classe
+        s'attendent. Comme pour ``EnrollmentSequence``, l'UPDATE passe en
+        premier : la ligne reste verrouillée jusqu'à la fin de la transaction,
+        donc les numéros d'une classe deviennent visibles dans l'ordre où ils
+        ont été attribués. Un client qui a lu jusqu'au numéro n d'une classe ne
+        peut pas voir apparaître plus tard un changement de numéro inférieur.
+        Les compteurs sont verrouillés par classe croissante, pour que deux
+        écritures sur les mêmes classes ne s'interbloquent pas.
+        """
+        with transaction.atomic(using=self.db):
+            for classroom_id in sorted(counts):
+                counter = self.filter(classroom_id=classroom_id)
+                count = counts[classroom_id]
+                if not counter.update(last_value=models.F("last_value") + count):
+                    try:
+                        with transaction.atomic(using=self.db):
+                            self.create(classroom_id=classroom_id, last_value=count)
+                    except IntegrityError:
+                        counter.update(last_value=models.F("last_value") + count)
+            last_values = dict(self.filter(classroom_id__in=counts).values_list("classroom_id", "last_value"))
+        return {
+            classroom_id: range(last_values[classroom_id] - count + 1, last_values[classroom_id] + 1)
+            for classroom_id, count in counts.items()
+        }
+
+    def state(self, classroom_ids):
+        """``{classe: (dernier numéro attribué, dernier numéro purgé)}``, ``(0, 0)`` sans compteur."""
+        states = {
+            classroom_id: (last_value, pruned_through)
+            for classroom_id, last_value, pruned_through in self.filter(classroom_id__in=classroom_ids)
+            .values_list("classroom_id", "last_value", "pruned_through")
+        }
+        return {classroom_id: states.get(classroom_id, (0, 0)) for classroom_id in classroom_ids}
+
+
+class SyncCounter(models.Model):
+    """Compteur des numéros de changement de ``SyncChange``, un par classe."""
+    # Pas de clé étrangère, comme ``SyncChange.classroom_id``.
+    classroom_id = models.PositiveBigIntegerField(unique=True, verbose_name=_("Classe"))
+    last_value = models.PositiveBigIntegerField(default=0, verbose_name=_("Dernier numéro attribué"))
+    pruned_through = models.PositiveBigIntegerField(default=0, verbose_name=_("Purgé jusqu'au numéro"))
+
+    objects = SyncCounterManager()
+
+    class Meta:
+        verbose_name = _("Compteur de synchronisation")
+        verbose_name_plural = _("Compteurs de synchronisation")
+
+    def __str__(self):
+        return f"{self.classroom_id} : {self.last_value}"
+
+
+class SyncChange(models.Model):
+    """
+    Journal des écritures synchronisées vers les appareils des enseignants
+    (voir ``core.changes``). Chaque entrée est rattachée à la classe qui
+    détermine quels appareils la reçoivent ; ``seq`` est strictement croissant
+    dans chaque classe.
+    """
+    seq = models.PositiveBigIntegerField(verbose_name=_("Numéro"))
+    model = models.CharField(max_length=50, verbose_name=_("Modèle"))
+    object_id = models.PositiveBigIntegerField(verbose_name=_("Objet"))
+    # Pas de clé étrangère : le journal survit à la suppression de la classe,
+    # et les suppressions en cascade y sont journalisées sans contrainte.
+    classroom_id = models.PositiveBigIntegerField(verbose_name=_("Classe"))
+    deleted = models.BooleanField(default=False, verbose_name=_("Suppression"))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Date"))
+
+    class Meta:
+        verbose_name = _("Changement synchronisé")
+        verbose_name_plural = _("Changements synchronisés")
+        constraints = [
+            models.UniqueConstraint(fields=["classroom_id", "seq"], name="syncchange_classroom_seq"),
+        ]
+
+    def __str__(self):
+        return f"#{self.seq} {self.model}:{self.object_id}"
+
+
+class ClassroomStat(models.Model):
+    """
+    Agrégat précalculé par classe pour les statistiques inter-établissements.
+
+    Les clés de la hiérarchie (établissement, cycle, niveau, option) sont
+    recopiées : regrouper par l'une d'elles ne lit que cette table. Maintenu par
+    ``core.stats`` à chaque écriture d'inscription ou de classe, et reconstruit
+    par ``manage.py refresh_stats``.
+    """
+    classroom = models.OneToOneField(
+        Classroom,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stat",
+        verbose_name=_("Classe"),
+    )
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name="+", verbose_name=_("Établissement"))
+    school_year = models.ForeignKey(SchoolYear, on_delete=models.CASCADE, related_name="+", verbose_name=_("Année scolaire"))
+    year = models.PositiveSmallIntegerField(verbose_name=_("Année de début"))
+    grade = models.ForeignKey(Grade, on_delete=models.CASCADE, related_name="+", verbose_name=_("Cycle"))
+    level = models.ForeignKey(Level, on_delete=models.CASCADE, related_name="+", verbose_name=_("Niveau"))
+    grade_option = models.ForeignKey(
+        GradeOption,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+        verbose_name=_("Option"),
+    )
+    student_count = models.PositiveIntegerField(default=0, verbose_name=_("Élèves"))
+    capacity = models.PositiveIntegerField(default=0, verbose_name=_("Capacité"))
+    refreshed_at = models.DateTimeField(verbose_name=_("Calculé le"))
+
+    class Meta:
+        verbose_name = _("Statistique de classe")
+        verbose_name_plural = _("Statistiques de classes")
+        indexes = [
+            models.Index(fields=["year", "school"], name="classroomstat_year_school"),
+        ]
+
+    def __str__(self):
+        return f"{self.classroom_id} : {self.student_count}/{self.capacity}"
+
+
+class SchoolYearArchive(models.Model):
+    """
+    Trace d'une année scolaire archivée (voir ``core.archive``) : l'année et
+    ses dépendants sont exportés dans ``file`` puis supprimés de la base.
+    """
+    # Pas de clé étrangère : l'année est supprimée par l'archivage.
+    school_year_id = models.PositiveBigIntegerField(unique=True, verbose_name=_("Année scolaire (identifiant)"))
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name="archives", verbose_name=_("Établissement"))
+    name = models.CharField(max_length=50, verbose_name=_("Année scolaire"))
+    start_date = models.DateField(verbose_name=_("Date de début"))
+    end_date = models.DateField(verbose_name=_("Date de fin"))
+    file = models.CharField(max_length=255, blank=True, verbose_name=_("Fichier d'export"))
+    row_counts = models.JSONField(default=dict, verbose_name=_("Lignes par modèle"))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Date de création"))
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name=_("Créé par"),
+    )
+    purged_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Date de purge"))
+
+    class Meta:
+        verbose_name = _("Archive d'année scolaire")
+        verbose_name_plural = _("Archives d'années scolaires")
+        ordering = ("-start_date",)
+
+    def __str__(self):
+        return f"{self.name} ({self.school})"
@@ -0,0 +1,158 @@
+"""
+Répartition des élèves d'un niveau annuel dans ses classes.
+
+L'algorithme est glouton : les élèves sont placés un par un dans la classe qui
+minimise le taux de remplissage et la part déjà reçue de leur catégorie
+(``criteria``). Pour n élèves et k classes le coût est O(n·k), soit quelques
+dizaines de millisecondes pour 1 000 élèves ; l'écriture est un seul ``bulk_update``.
+"""
+from collections import Counter, defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from core.cache import bump_model_version
+from core.changes import record_moves
+from core.models import Classroom, Enrollment
+from core.stats import refresh_classroom_stats
+
+
+def current_option(enrollment):
+    """Option par défaut : celle de la classe actuelle de l'inscription."""
+    classroom = enrollment.classroom if enrollment.classroom_id else None
+    return classroom.grade_option_id if classroom else None
+
+
+def place_students(school_year_level, enrollments, option_for=current_option, criteria=None, commit=True):
+    """
+    Affecte chaque inscription de ``enrollments`` à une classe de
+    ``school_year_level``, sans dépasser les capacités.
+
+    - ``option_for(enrollment)`` donne l'id de la ``GradeOption`` voulue ; seules
+      les classes de cette option sont candidates. Ignoré si le cycle n'a pas
+      d'options.
+    - ``criteria(enrollment)`` donne une catégorie à répartir équitablement
+      (ex. ancienne classe, sexe, redoublant).
+
+    Les inscriptions déjà enregistrées sont mises à jour en un ``bulk_update``
+    si ``commit`` ; les autres sont seulement modifiées en mémoire (à créer
+    ensuite, par exemple avec ``Enrollment.objects.bulk_enroll``). Retourne un
+    ``Counter`` du nombre d'élèves placés par classe.
+    """
+    enrollments = list(enrollments)
+    school_year_id = school_year_level.school_year_id
+    if any(enrollment.school_year_id != school_year_id for enrollment in enrollments):
+        raise ValidationError(_("Toutes les inscriptions doivent appartenir à l'année scolaire du niveau."))
+
+    has_option = school_year_level.grade.has_option
+    moving = [enrollment.pk for enrollment in enrollments if enrollment.pk]
+    classrooms = list(
+        Classroom.objects
+        .filter(school_year_level=school_year_level)
+        .annotate(occupied=Count("enrollments", filter=~Q(enrollments__pk__in=moving)))
+        .order_by("pk")
+    )
+
+    groups = defaultdict(list)
+    for enrollment in enrollments:
+        groups[option_for(enrollment) if has_option else None].append(enrollment)
+
+    placed = Counter()
+    for option_id, group in groups.items():
+        candidates = [classroom for classroom in classrooms if classroom.grade_option_id == option_id]
+        free = sum(max(classroom.capacity - classroom.occupied, 0) for classroom in candidates)
+        if len(group) > free:
+            raise ValidationError(
+                _("Capacité insuffisante : %(needed)d élèves pour %(free)d places.")
+                % {"needed": len(group), "free": free}
+            )
+        _place_group(group, candidates, criteria, placed)
+
+    if commit:
+        saved = [enrollment for enrollment in enrollments if enrollment.pk]
+        if saved:
+            previous = dict(
+                Enrollment.objects.filter(pk__in=[enrollment.pk for enrollment in saved])
+                .values_list("pk", "classroom_id")
+            )
+            now = timezone.now()
+            for enrollment in saved:
+                enrollment.updated_at = now
+            with transaction.atomic():
+                Enrollment.objects.bulk_update(saved, ["classroom", "updated_at"])
+                record_moves(
+                    Enrollment,
+                    [
+                        (enrollment.pk, previous.get(enrollment.pk), enrollment.classroom_id)
+                        for enrollment in saved
+                    ],
+                )
+            Enrollment.refresh_display_labels(Enrollment.objects.filter(pk__in=[enrollment.pk for enrollment in saved]))
+            refresh_classroom_stats(set(previous.values()) | {enrollment.classroom_id for enrollment in saved})
+            # bulk_update ne déclenche pas post_save.
+            bump_model_version(Enrollment)
+    return placed
+
+
+def _place_group(group, classrooms, criteria, placed):
+    load = {classroom.pk: classroom.occupied for classroom in classrooms}
+    by_category = defaultdict(Counter)
+
+    categories = [criteria(enrollment) if criteria else None for enrollment in group]
+    # Les catégories les plus nombreuses d'abord : elles sont les plus difficiles
+    # à étaler une fois les classes remplies.
+    sizes = Counter(categories)
+    order = sorted(range(len(group)), key=lambda index: -sizes[categories[index]])
+
+    for index in order:
+        category = categories[index]
+
+        def cost(classroom):
+            if load[classroom.pk] >= classroom.capacity:
+                return (1, 0, 0)
+            return (
+                0,
+                (by_category[classroom.pk][category] + 1) / classroom.capacity,
+                (load[classroom.pk] + 1) / classroom.capacity,
+            )
+
+        classroom = min(classrooms, key=cost)
+        load[classroom.pk] += 1
+        by_category[classroom.pk][category] += 1
+        placed[classroom] += 1
+        group[index].classroom = classroom
+
+
+def move_enrollments(queryset, classroom, user):
+    """
+    Transfère les inscriptions de ``queryset`` dans ``classroom`` par un seul
+    UPDATE. La validation est ensembliste : une lecture des inscriptions
+    (même année scolaire que la classe) et un comptage de la classe cible
+    (capacité). Retourne le nombre d'inscriptions déplacées.
+    """
+    target_year_id = classroom.school_year_level.school_year_id
+    rows = list(queryset.values_list("pk", "classroom_id", "school_year_id"))
+    if any(school_year_id != target_year_id for _, _, school_year_id in rows):
+        raise ValidationError(_("Toutes les inscriptions doivent appartenir à l'année scolaire de la classe cible."))
+    previous = {pk: classroom_id for pk, classroom_id, _ in rows if classroom_id != classroom.pk}
+    if not previous:
+        return 0
+    free = classroom.capacity - classroom.enrollments.count()
+    if len(previous) > free:
+        raise ValidationError(
+            _("Capacité insuffisante : %(needed)d élèves pour %(free)d places.")
+            % {"needed": len(previous), "free": max(free, 0)}
+        )
+
+    moved = Enrollment.objects.filter(pk__in=previous)
+    with transaction.atomic():
+        moved.update(classroom=classroom, updated_by=user, updated_at=timezone.now())
+        record_moves(Enrollment, [(pk, classroom_id, classroom.pk) for pk, classroom_id in previous.items()])
+    Enrollment.refresh_display_labels(moved)
+    refresh_classroom_stats({*previous.values(), classroom.pk})
+    # update() ne déclenche pas post_save.
+    bump_model_version(Enrollment)
+    return len(previous)
@@ -0,0 +1,162 @@
+"""
+Lectures sur les réplicas (``settings.REPLICA_DATABASES``).
+
+Une requête n'est lue sur un réplica que si la vue le demande
+(``ReplicaReadMixin``, pour un ``GET`` ou un ``HEAD``) et tant qu'elle n'a rien
+écrit. Après une écriture, le navigateur reçoit un cookie qui maintient ses
+lectures sur la base principale pendant ``REPLICA_PIN_SECONDS`` : le temps que
+les réplicas rattrapent leur retard, il relit ce qu'il vient d'écrire.
+
+Les tables du cache, des sessions et des tâches sont toujours lues sur la base
+principale, comme toute lecture faite dans une transaction. Ce qui a été lu
+sur un réplica n'est pas mis en cache (``reads_from_replica``) : en retard sur
+la base principale, il serait rangé sous des versions de modèles déjà à jour
+et servi jusqu'à la prochaine écriture.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = "primary_pin"
+# Applications lues sur la base principale : les écritures récentes y comptent
+# (versions du cache, session juste ouverte, tâche juste mise en file).
+PRIMARY_ONLY_APPS = {"django_cache", "sessions", "tasks"}
+
+
+class RoutingState:
+    def __init__(self, pinned=False, replica=False):
+        # Lectures sur la base principale (écriture récente ou dans la requête).
+        self.pinned = pinned
+        # La vue accepte des lectures sur un réplica.
+        self.replica = replica
+        self.wrote = False
+        self.alias = None
+
+
+_state = ContextVar("replica_routing", default=None)
+
+
+def prefer_replica():
+    """Autorise les lectures sur un réplica pour le reste de la requête."""
+    state = _state.get()
+    if state is not None:
+        state.replica = True
+
+
+def reads_from_replica():
+    """Vrai si les lectures de la requête en cours sont faites sur un réplica."""
+    state = _state.get()
+    return state is not None and state.alias is not None and not (state.pinned or state.wrote)
+
+
+@contextmanager
+def replica_reads():
+    """Lectures sur un réplica hors requête HTTP (tâches, commandes)."""
+    token = _state.set(RoutingState(replica=True))
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+def keep_routing(iterable):
+    """
+    Itère ``iterable`` avec l'état de routage de la requête en cours. Le
+    contenu d'une ``StreamingHttpResponse`` est produit après le passage du
+    middleware, qui a déjà rétabli l'état : sans cela, ses lectures iraient sur
+    la base principale. L'état est posé à chaque étape seulement, jamais à
+    travers un ``yield``.
+    """
+    # Lu à l'appel, pendant la vue : le corps d'un générateur ne s'exécuterait
+    # qu'au premier ``next``, après le middleware.
+    state = _state.get()
+
+    def steps():
+        iterator = iter(iterable)
+        while True:
+            token = _state.set(state)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                _state.reset(token)
+            yield item
+
+    return steps()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        replicas = settings.REPLICA_DATABASES
+        if (
+            not replicas
+            or state is None
+            or not state.replica
+            or state.pinned
+            or state.wrote
+            or model._meta.app_label in PRIMARY_ONLY_APPS
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        if state.alias is None:
+            # Un seul réplica par requête : ses lectures restent cohérentes entre elles.
+            state.alias = random.choice(replicas)
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        # Les écritures du cache et des sessions ne concernent pas les données lues ensuite.
+        if state is not None and model._meta.app_label not in PRIMARY_ONLY_APPS:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Les réplicas reçoivent le schéma par la réplication.
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
+
+
+class ReplicaPinningMiddleware:
+    """État de routage de chaque requête et cookie de maintien sur la base principale."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def begin(self, request):
+        return _state.set(RoutingState(pinned=PIN_COOKIE in request.COOKIES))
+
+    def finish(self, token, response):
+        state = _state.get()
+        _state.reset(token)
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE, "1", max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite="Lax"
+            )
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = self.begin(request)
+        return self.finish(token, self.get_response(request))
+
+    async def __acall__(self, request):
+        token = self.begin(request)
+        return self.finish(token, await self.get_response(request))
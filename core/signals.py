@@ -0,0 +1,86 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from core.cache import bump_model_version
+from core.changes import SYNC_MODELS, classroom_id_of, record_changes, record_moves
+from core.labels import label_dependents, refresh_dependent_labels, should_propagate
+from core.models import Classroom, Enrollment, SchoolYearLevel, TimetableEntry
+from core.stats import refresh_classroom_stats
+from core.timetable import entry_changed
+
+# Applications dont les modèles alimentent des fragments mis en cache.
+VERSIONED_APPS = {"core", "account"}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_version_on_write(sender, **kwargs):
+    if sender._meta.app_label in VERSIONED_APPS:
+        bump_model_version(sender)
+
+
+@receiver(m2m_changed)
+def bump_version_on_m2m_change(sender, instance, action, **kwargs):
+    if action.startswith("post_") and type(instance)._meta.app_label in VERSIONED_APPS:
+        bump_model_version(type(instance))
+
+
+@receiver(post_save)
+def refresh_labels_on_save(sender, instance, created, update_fields, **kwargs):
+    # Un objet tout juste créé n'a pas encore de dépendants.
+    if not created and sender in label_dependents() and should_propagate(update_fields):
+        refresh_dependent_labels(sender, [instance.pk])
+
+
+@receiver(pre_save, sender=Enrollment)
+def remember_previous_classroom(sender, instance, update_fields, **kwargs):
+    instance._previous_classroom_id = None
+    if instance.pk and (update_fields is None or "classroom" in update_fields):
+        instance._previous_classroom_id = (
+            sender.objects.filter(pk=instance.pk).values_list("classroom_id", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def refresh_stats_on_enrollment_write(sender, instance, **kwargs):
+    refresh_classroom_stats([instance.classroom_id, getattr(instance, "_previous_classroom_id", None)])
+
+
+@receiver(post_save, sender=Classroom)
+def refresh_stats_on_classroom_save(sender, instance, **kwargs):
+    refresh_classroom_stats([instance.pk])
+
+
+@receiver(post_save, sender=SchoolYearLevel)
+def refresh_stats_on_level_save(sender, instance, created, **kwargs):
+    if not created:
+        refresh_classroom_stats(instance.classrooms.values_list("pk", flat=True))
+
+
+@receiver(post_save)
+def record_sync_change_on_save(sender, instance, **kwargs):
+    if sender not in SYNC_MODELS:
+        return
+    # Changement de classe : l'ancienne classe voit une suppression, journalisée
+    # avec l'ajout en une seule écriture.
+    previous = getattr(instance, "_previous_classroom_id", None)
+    record_moves(sender, [(instance.pk, previous, classroom_id_of(instance))])
+
+
+@receiver(pre_delete)
+def record_sync_change_on_delete(sender, instance, **kwargs):
+    # Avant la suppression, tant que les parents permettent de retrouver la classe.
+    if sender in SYNC_MODELS:
+        record_changes(sender, [(instance.pk, classroom_id_of(instance))], deleted=True)
+
+
+# Après bump_version_on_write : l'index compare les versions qu'elle vient d'avancer.
+@receiver(post_save, sender=TimetableEntry)
+def update_occupancy_on_save(sender, instance, **kwargs):
+    entry_changed(instance)
+
+
+@receiver(post_delete, sender=TimetableEntry)
+def update_occupancy_on_delete(sender, instance, **kwargs):
+    entry_changed(instance, deleted=True)
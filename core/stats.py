@@ -0,0 +1,123 @@
+"""
+Statistiques inter-établissements à partir des agrégats ``ClassroomStat``.
+
+Chaque ligne résume une classe (effectif, capacité) avec les clés de sa
+hiérarchie ; un regroupement par établissement, cycle, niveau ou option est un
+seul ``GROUP BY`` sur cette table, sans parcourir inscriptions et classes.
+"""
+from django.db.models import Count, F, Min, Sum
+from django.utils import timezone
+
+from core.cache import bump_model_version, cached_value
+from core.models import Classroom, ClassroomStat, Grade, GradeOption, Level, School
+
+# Modèles dont dépend un regroupement : les agrégats et les libellés affichés.
+ROLLUP_MODELS = (ClassroomStat, School, Grade, Level, GradeOption, Classroom)
+
+# Colonnes de chaque dimension : identifiant puis libellé.
+DIMENSIONS = {
+    "school": ("school_id", {"school_name": F("school__name")}),
+    "grade": ("grade_id", {"grade_name": F("grade__name")}),
+    "level": ("level_id", {"level_name": F("level__name")}),
+    "grade_option": ("grade_option_id", {"grade_option_name": F("grade_option__name")}),
+    "classroom": ("classroom_id", {"classroom_label": F("classroom__display_label")}),
+}
+GROUPINGS = {
+    "school": ("school",),
+    "grade": ("school", "grade"),
+    "level": ("school", "grade", "level"),
+    "grade_option": ("school", "grade", "grade_option"),
+    "classroom": ("school", "classroom"),
+}
+STAT_FIELDS = [
+    "school", "school_year", "year", "grade", "level", "grade_option",
+    "student_count", "capacity", "refreshed_at",
+]
+
+
+def refresh_classroom_stats(classroom_ids=None):
+    """
+    Recalcule les agrégats des classes ``classroom_ids`` (toutes par défaut) :
+    une requête d'agrégation et un upsert. Retourne le nombre de lignes écrites.
+    """
+    classrooms = Classroom.objects.all()
+    if classroom_ids is not None:
+        classroom_ids = {pk for pk in classroom_ids if pk is not None}
+        if not classroom_ids:
+            return 0
+        classrooms = classrooms.filter(pk__in=classroom_ids)
+
+    now = timezone.now()
+    rows = []
+    for values in (
+        classrooms
+        .values(
+            "grade_option_id",
+            "capacity",
+            classroom_id=F("pk"),
+            school_id=F("school_year_level__school_year__school_id"),
+            school_year_id=F("school_year_level__school_year_id"),
+            start_date=F("school_year_level__school_year__start_date"),
+            grade_id=F("school_year_level__grade_id"),
+            level_id=F("school_year_level__level_id"),
+        )
+        .annotate(student_count=Count("enrollments"))
+        .order_by()
+    ):
+        values["year"] = values.pop("start_date").year
+        rows.append(ClassroomStat(refreshed_at=now, **values))
+
+    ClassroomStat.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["classroom"],
+        update_fields=STAT_FIELDS,
+    )
+    # L'upsert ne déclenche pas post_save.
+    bump_model_version(ClassroomStat)
+    return len(rows)
+
+
+def rollup(group_by="school", year=None, school_id=None):
+    """
+    Effectifs regroupés selon ``group_by`` (clé de ``GROUPINGS``), filtrés
+    éventuellement par année de début et par établissement.
+
+    Retourne ``(lignes, refreshed_at)`` ; ``refreshed_at`` est la date du plus
+    ancien agrégat lu, donc la fraîcheur garantie de l'ensemble.
+    """
+    stats = ClassroomStat.objects.all()
+    if year is not None:
+        stats = stats.filter(year=year)
+    if school_id is not None:
+        stats = stats.filter(school_id=school_id)
+
+    keys, labels = [], {}
+    for dimension in GROUPINGS[group_by]:
+        key, label = DIMENSIONS[dimension]
+        keys.append(key)
+        labels.update(label)
+    rows = list(
+        stats
+        .values(*keys, **labels)
+        .annotate(
+            classroom_count=Count("pk"),
+            student_count=Sum("student_count"),
+            capacity=Sum("capacity"),
+        )
+        .order_by(*labels)
+    )
+    refreshed_at = stats.aggregate(refreshed_at=Min("refreshed_at"))["refreshed_at"]
+    return rows, refreshed_at
+
+
+def cached_rollup(group_by="school", year=None, school_id=None, timeout=300):
+    """``rollup`` mis en cache jusqu'à la prochaine écriture d'un agrégat ou d'un libellé."""
+    return cached_value(
+        "stats-rollup",
+        ROLLUP_MODELS,
+        lambda: rollup(group_by, year=year, school_id=school_id),
+        group_by, year, school_id,
+        timeout=timeout,
+    )
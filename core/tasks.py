@@ -0,0 +1,52 @@
+import time
+
+from core import archive
+from core.cache import bump_model_version
+from core.labels import labelled_models_in_order
+from core.models import SchoolYear
+from core.stats import refresh_classroom_stats
+from tasks.registry import task
+
+
+@task()
+def refresh_stats(job):
+    """Reconstruit tous les agrégats ``ClassroomStat``."""
+    job.set_progress(0, total=1, message="Recalcul des statistiques")
+    count = refresh_classroom_stats()
+    job.set_progress(1, message=f"{count} classe(s) recalculée(s)")
+    return {"classrooms": count}
+
+
+@task()
+def refresh_display_labels(job):
+    """Recalcule tous les libellés dénormalisés, ancêtres d'abord."""
+    models = labelled_models_in_order()
+    changed = {}
+    for index, model in enumerate(models):
+        job.set_progress(index, total=len(models), message=f"Libellés : {model._meta.verbose_name_plural}")
+        pks = model.refresh_display_labels()
+        if pks:
+            bump_model_version(model)
+        changed[model._meta.label] = len(pks)
+    job.set_progress(len(models), message="Libellés à jour")
+    return changed
+
+
+@task()
+def archive_school_year(job, school_year_id, export=True):
+    """Exporte puis supprime une année scolaire close (voir ``core.archive``)."""
+    school_year = SchoolYear.objects.filter(pk=school_year_id).first()
+    if school_year is None:
+        # Déjà supprimée : une tentative précédente est allée au bout.
+        return {"archived": False}
+    last = 0.0
+
+    def on_progress(done, total, message):
+        nonlocal last
+        # Une écriture d'avancement par seconde au plus.
+        if time.monotonic() - last >= 1 or done == total:
+            last = time.monotonic()
+            job.set_progress(done, total=total, message=f"{message} : {school_year}")
+
+    result = archive.archive_school_year(school_year, export=export, user=job.created_by, on_progress=on_progress)
+    return {"archived": True, "file": result.file, "rows": result.row_counts}
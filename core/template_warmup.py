@@ -0,0 +1,53 @@
+"""
+Préchargement des templates au démarrage.
+
+Avec le loader ``cached``, chaque template (et chaque composant cotton, compilé
+par ``django_cotton.cotton_loader.Loader``) n'est analysé qu'à sa première
+utilisation. ``warm_templates`` les charge tous d'avance, de sorte que la
+première requête d'un worker ne paie pas la compilation, et qu'un template
+invalide est détecté au démarrage plutôt qu'en production.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.utils import get_app_template_dirs
+
+TEMPLATE_EXTENSIONS = (".html", ".txt", ".xml")
+
+
+def iter_template_names(engine):
+    seen = set()
+    for directory in [*engine.dirs, *get_app_template_dirs("templates")]:
+        for root, _, files in os.walk(directory):
+            for filename in sorted(files):
+                if not filename.endswith(TEMPLATE_EXTENSIONS):
+                    continue
+                name = os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, "/")
+                # Le premier répertoire l'emporte, comme pour le chargement réel.
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+
+
+def warm_templates(strict=False):
+    """
+    Charge tous les templates des moteurs Django. Retourne la liste des
+    ``(nom, erreur)`` ; avec ``strict=True``, lève ``ImproperlyConfigured``
+    s'il y en a.
+    """
+    errors = []
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for name in iter_template_names(backend.engine):
+            try:
+                backend.engine.get_template(name)
+            except TemplateSyntaxError as exc:
+                errors.append((name, exc))
+    if strict and errors:
+        raise ImproperlyConfigured(
+            "Templates invalides : " + "; ".join(f"{name}: {exc}" for name, exc in errors)
+        )
+    return errors
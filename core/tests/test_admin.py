@@ -0,0 +1,149 @@
+import datetime
+
+from django.contrib import admin
+from django.test import TestCase
+from django.urls import reverse
+
+from core.admin_tools import EstimatedCountPaginator, estimate_count
+from core.models import ClassroomStat, ClassroomSubject, Enrollment, SchoolYearLevel
+from core.tests.utils import (
+    classrooms_of,
+    enroll,
+    make_classroom_subject,
+    make_school_year,
+    make_student,
+    make_user,
+)
+
+
+class ChangelistSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_year = make_school_year()
+        cls.student = make_student("eleve@x.io", last_name="Diallo")
+        cls.enrollment = enroll(cls.student, classrooms_of(cls.school_year)[0])
+        cls.superuser = make_user("root@x.io", is_staff=True, is_superuser=True)
+
+    def setUp(self):
+        self.client.force_login(self.superuser)
+
+    def test_every_searchable_changelist(self):
+        for model, model_admin in admin.site._registry.items():
+            if not model_admin.search_fields:
+                continue
+            opts = model._meta
+            with self.subTest(model=opts.label):
+                response = self.client.get(
+                    reverse(f"admin:{opts.app_label}_{opts.model_name}_changelist"), {"q": "x"}
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_guardian_search_by_enrollment_number(self):
+        response = self.client.get(
+            reverse("admin:core_studentguardian_changelist"), {"q": self.enrollment.enrollment_number}
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class EstimatedCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        classroom = classrooms_of(make_school_year())[0]
+        cls.enrollments = [enroll(make_student(f"eleve{index}@x.io"), classroom) for index in range(3)]
+        cls.enrollments[0].delete()
+
+    def test_large_tables_are_estimated(self):
+        paginator_class = type("Paginator", (EstimatedCountPaginator,), {"exact_threshold": 1})
+        # Sans PostgreSQL, l'estimation est le plus grand identifiant.
+        self.assertEqual(paginator_class(Enrollment.objects.order_by("pk"), 50).count, self.enrollments[-1].pk)
+        self.assertEqual(EstimatedCountPaginator(Enrollment.objects.order_by("pk"), 50).count, 2)
+
+    def test_filtered_selections_are_counted(self):
+        self.assertIsNone(estimate_count(Enrollment.objects.filter(is_current=True)))
+        paginator_class = type("Paginator", (EstimatedCountPaginator,), {"exact_threshold": 1})
+        self.assertEqual(paginator_class(Enrollment.objects.filter(is_current=True).order_by("pk"), 50).count, 2)
+
+
+class ScopedFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_year = make_school_year()
+        cls.other_year = make_school_year(cls.school_year.school, start=datetime.date(2025, 9, 1))
+        cls.superuser = make_user("root@x.io", is_staff=True, is_superuser=True)
+
+    def setUp(self):
+        self.client.force_login(self.superuser)
+
+    def classroom_choices(self, **params):
+        response = self.client.get(reverse("admin:core_enrollment_changelist"), params)
+        # Un filtre sans choix n'est pas retenu par la liste.
+        specs = [spec for spec in response.context["cl"].filter_specs if spec.field_path == "classroom"]
+        return {pk for spec in specs for pk, _ in spec.lookup_choices} if specs else None
+
+    def test_hidden_until_a_year_is_selected(self):
+        self.assertIsNone(self.classroom_choices())
+
+    def test_choices_come_from_the_selected_year(self):
+        self.assertEqual(
+            self.classroom_choices(school_year__id__exact=self.school_year.pk),
+            {classroom.pk for classroom in classrooms_of(self.school_year)},
+        )
+
+
+class BulkActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_year = make_school_year()
+        cls.classroom_a, cls.classroom_b = classrooms_of(cls.school_year)
+        cls.enrollments = [enroll(make_student(f"eleve{index}@x.io"), cls.classroom_a) for index in range(3)]
+        cls.superuser = make_user("root@x.io", is_staff=True, is_superuser=True)
+
+    def setUp(self):
+        self.client.force_login(self.superuser)
+
+    def run_action(self, model_name, action, objects, follow=False, **data):
+        return self.client.post(reverse(f"admin:core_{model_name}_changelist"), {
+            "action": action,
+            "_selected_action": [obj.pk for obj in objects],
+            **data,
+        }, follow=follow)
+
+    def test_form_carries_the_selection(self):
+        response = self.run_action("enrollment", "change_classroom", self.enrollments[:2])
+        self.assertTemplateUsed(response, "admin/action_form.html")
+        self.assertContains(response, f'name="_selected_action" value="{self.enrollments[1].pk}"')
+        self.assertEqual(Enrollment.objects.filter(classroom=self.classroom_b).count(), 0)
+
+    def test_change_classroom_moves_the_selection(self):
+        response = self.run_action(
+            "enrollment", "change_classroom", self.enrollments[:2], apply="1", classroom=self.classroom_b.pk
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Enrollment.objects.filter(classroom=self.classroom_b).count(), 2)
+        self.assertEqual(
+            set(Enrollment.objects.filter(classroom=self.classroom_b).values_list("updated_by", flat=True)),
+            {self.superuser.pk},
+        )
+        self.assertEqual(ClassroomStat.objects.get(classroom=self.classroom_b).student_count, 2)
+
+    def test_change_classroom_checks_capacity_for_the_whole_batch(self):
+        enroll(make_student("autre@x.io"), self.classroom_b)
+        response = self.run_action(
+            "enrollment", "change_classroom", self.enrollments, apply="1", classroom=self.classroom_b.pk, follow=True
+        )
+        self.assertContains(response, "Capacité insuffisante")
+        self.assertEqual(Enrollment.objects.filter(classroom=self.classroom_b).count(), 1)
+
+    def test_level_activation_is_stamped(self):
+        year_levels = SchoolYearLevel.objects.filter(school_year=self.school_year)
+        self.run_action("schoolyearlevel", "deactivate", year_levels)
+        self.assertEqual(
+            list(year_levels.values_list("is_active", "updated_by")), [(False, self.superuser.pk)]
+        )
+
+    def test_empty_coefficient_falls_back_to_the_catalog(self):
+        classroom_subject = make_classroom_subject(self.classroom_a)
+        self.run_action("classroomsubject", "set_coefficient", [classroom_subject], apply="1", coefficient="3")
+        self.assertEqual(ClassroomSubject.objects.get(pk=classroom_subject.pk).coefficient, 3)
+        self.run_action("classroomsubject", "set_coefficient", [classroom_subject], apply="1", coefficient="")
+        self.assertIsNone(ClassroomSubject.objects.get(pk=classroom_subject.pk).coefficient)
@@ -0,0 +1,84 @@
+import datetime
+import gzip
+import json
+import tempfile
+from collections import Counter
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.archive import archive_plan, archive_school_year
+from core.models import Classroom, Enrollment, Evaluation, Mark, SchoolYear, Student, SyncChange
+from core.tests.utils import classrooms_of, enroll, make_classroom_subject, make_school_year, make_student, make_teacher
+
+
+class ArchiveSchoolYearTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_year = make_school_year()
+        cls.next_year = make_school_year(cls.school_year.school, start=datetime.date(2025, 9, 1))
+        classroom = classrooms_of(cls.school_year)[0]
+        classroom_subject = make_classroom_subject(classroom, teacher=make_teacher(cls.school_year, "prof@x.io"))
+        evaluation = Evaluation.objects.create(
+            classroom_subject=classroom_subject, name="Devoir", date=datetime.date(2024, 10, 1)
+        )
+        for index in range(3):
+            student = make_student(f"eleve{index}@x.io")
+            Mark.objects.create(evaluation=evaluation, enrollment=enroll(student, classroom), score=10 + index)
+            Enrollment.objects.enroll(student, classrooms_of(cls.next_year)[0])
+
+    def setUp(self):
+        self.archive_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.archive_root.cleanup)
+        archive_settings = override_settings(ARCHIVE_ROOT=self.archive_root.name)
+        archive_settings.enable()
+        self.addCleanup(archive_settings.disable)
+
+    def test_plan_deletes_dependents_before_the_year(self):
+        order = [model for model, _ in archive_plan()]
+        self.assertEqual(order[-1], SchoolYear)
+        self.assertLess(order.index(Mark), order.index(Enrollment))
+        self.assertLess(order.index(Enrollment), order.index(Classroom))
+
+    def test_exports_then_purges_only_this_year(self):
+        progress = []
+        archive = archive_school_year(self.school_year, on_progress=lambda *args: progress.append(args))
+        with gzip.open(archive.file, "rt") as f:
+            exported = Counter(json.loads(line)["model"] for line in f)
+        self.assertEqual(exported["core.Mark"], 3)
+        self.assertEqual(exported["core.Enrollment"], 3)
+        self.assertEqual(exported["core.SchoolYear"], 1)
+        self.assertEqual(archive.row_counts["core.Mark"], 3)
+        self.assertIsNotNone(archive.purged_at)
+        self.assertEqual(progress[-1][0], progress[-1][1])
+
+        self.assertFalse(SchoolYear.objects.filter(pk=self.school_year.pk).exists())
+        self.assertFalse(Mark.objects.exists())
+        # Les élèves et leurs inscriptions de l'année suivante restent.
+        self.assertEqual(Enrollment.objects.filter(school_year=self.next_year).count(), 3)
+        self.assertEqual(Student.objects.count(), 3)
+
+    def test_open_year_is_refused(self):
+        current = make_school_year(self.school_year.school, start=timezone.localdate() - datetime.timedelta(days=10))
+        with self.assertRaises(ValueError):
+            archive_school_year(current)
+
+    def test_purge_without_export(self):
+        archive = archive_school_year(self.school_year, export=False)
+        self.assertFalse(archive.file)
+        self.assertFalse(SchoolYear.objects.filter(pk=self.school_year.pk).exists())
+
+    def test_purged_rows_are_journaled_as_deletions(self):
+        classrooms = {classroom.pk for classroom in classrooms_of(self.school_year)}
+        expected = {
+            "classroom": {(pk, pk) for pk in classrooms},
+            "enrollment": set(Enrollment.objects.filter(school_year=self.school_year).values_list("pk", "classroom_id")),
+            "mark": set(Mark.objects.values_list("pk", "enrollment__classroom_id")),
+        }
+        archive_school_year(self.school_year, export=False)
+        for model, rows in expected.items():
+            with self.subTest(model=model):
+                self.assertEqual(
+                    set(SyncChange.objects.filter(model=model, deleted=True).values_list("object_id", "classroom_id")),
+                    rows,
+                )
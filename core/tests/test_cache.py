@@ -0,0 +1,75 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from core.cache import bump_model_version, cache_counters, cached_value, get_model_versions, versioned_key
+from core.models import Classroom, School
+from core.tests.utils import make_user
+
+
+class CachedValueTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = []
+
+    def compute(self, value="valeur"):
+        self.calls.append(value)
+        return value
+
+    def test_value_is_computed_once_per_version(self):
+        for _ in range(2):
+            self.assertEqual(cached_value("essai", (School,), self.compute), "valeur")
+        self.assertEqual(len(self.calls), 1)
+        bump_model_version(School)
+        cached_value("essai", (School,), self.compute)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_none_is_a_cached_value(self):
+        for _ in range(2):
+            self.assertIsNone(cached_value("essai", (School,), lambda: self.compute(None)))
+        self.assertEqual(self.calls, [None])
+
+    def test_expired_value_is_served_while_another_caller_recomputes(self):
+        cached_value("essai", (School,), self.compute, timeout=0)
+        cache.add(f"{versioned_key('essai', (School,))}:lock", 1)
+        self.assertEqual(cached_value("essai", (School,), lambda: self.compute("nouvelle")), "valeur")
+        self.assertEqual(self.calls, ["valeur"])
+
+    def test_waiting_caller_computes_once_the_lock_expires(self):
+        cache.add(f"{versioned_key('essai', (School,))}:lock", 1, 0.1)
+        self.assertEqual(cached_value("essai", (School,), self.compute, lock_timeout=5), "valeur")
+        self.assertEqual(self.calls, ["valeur"])
+
+
+class ModelVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_versions_are_stable_until_a_write(self):
+        versions = get_model_versions((School, Classroom))
+        self.assertEqual(get_model_versions((School, Classroom)), versions)
+        bump_model_version(School)
+        school_version, classroom_version = get_model_versions((School, Classroom))
+        self.assertEqual((school_version, classroom_version), (versions[0] + 1, versions[1]))
+
+    def test_bump_recreates_an_evicted_version(self):
+        bump_model_version(School)
+        [version] = get_model_versions((School,))
+        bump_model_version(School)
+        self.assertEqual(get_model_versions((School,)), [version + 1])
+
+
+class CacheCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_hits_and_misses_are_reported(self):
+        for _ in range(3):
+            cached_value("compteur", (School,), lambda: 1)
+        self.assertEqual(cache_counters()["compteur"], {"hit": 2, "miss": 1, "ratio": 0.667})
+
+    def test_view_is_staff_only(self):
+        self.client.force_login(make_user("prof@x.io", is_teacher=True))
+        self.assertEqual(self.client.get(reverse("cache_statistics")).status_code, 403)
+        self.client.force_login(make_user("admin@x.io", is_staff=True))
+        self.assertIn("counters", self.client.get(reverse("cache_statistics")).json())
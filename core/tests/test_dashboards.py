@@ -0,0 +1,118 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import StudentGuardian
+from core.tests.utils import (
+    classrooms_of,
+    enroll,
+    make_classroom_subject,
+    make_school_year,
+    make_student,
+    make_teacher,
+    make_user,
+)
+
+
+class QueryCountTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assertConstantQueries(self, url, grow):
+        """Le nombre de requêtes de ``url`` ne dépend pas de ce qu'ajoute ``grow``."""
+        # Première requête : sessions et permissions mises en cache.
+        self.client.get(url)
+        before = self.count_queries(url)
+        grow()
+        self.assertEqual(self.count_queries(url), before)
+
+
+class TeacherDashboardTests(QueryCountTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_year = make_school_year()
+        cls.classrooms = classrooms_of(cls.school_year)
+        cls.teacher = make_teacher(cls.school_year, "prof@x.io")
+        make_classroom_subject(cls.classrooms[0], teacher=cls.teacher)
+        enroll(make_student("eleve0@x.io"), cls.classrooms[0])
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.teacher.user)
+
+    def test_lists_classrooms_with_student_counts(self):
+        response = self.client.get(reverse("teacher_dashboard"))
+        self.assertEqual([classroom.student_count for classroom in response.context["classrooms"]], [1])
+        self.assertEqual(response.context["student_total"], 1)
+
+    def test_query_count_does_not_grow_with_classrooms(self):
+        def grow():
+            for classroom in self.classrooms:
+                make_classroom_subject(classroom, "Français", teacher=self.teacher)
+                enroll(make_student(f"eleve-{classroom.pk}@x.io"), classroom)
+
+        self.assertConstantQueries(reverse("teacher_dashboard"), grow)
+
+    def test_other_roles_are_denied(self):
+        self.client.force_login(make_student("eleve@x.io").user)
+        self.assertEqual(self.client.get(reverse("teacher_dashboard")).status_code, 403)
+
+
+class StudentDashboardTests(QueryCountTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_year = make_school_year()
+        cls.classroom = classrooms_of(cls.school_year)[0]
+        cls.student = make_student("eleve@x.io")
+        enroll(cls.student, cls.classroom)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.student.user)
+
+    def test_query_count_does_not_grow_with_subjects(self):
+        def grow():
+            for name in ("Maths", "Français", "Histoire"):
+                make_classroom_subject(self.classroom, name, teacher=make_teacher(self.school_year, f"{name}@x.io"))
+            enroll(make_student("camarade@x.io"), self.classroom)
+
+        self.assertConstantQueries(reverse("student_dashboard"), grow)
+        response = self.client.get(reverse("student_dashboard"))
+        self.assertEqual(response.context["enrollment"].classmate_count, 2)
+        self.assertEqual(len(response.context["subjects"]), 3)
+
+
+class TutorDashboardTests(QueryCountTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_year = make_school_year()
+        cls.classrooms = classrooms_of(cls.school_year)
+        cls.tutor = make_user("parent@x.io", is_tutor=True)
+        cls.add_child("enfant0@x.io", cls.classrooms[0])
+
+    @classmethod
+    def add_child(cls, email, classroom):
+        student = make_student(email)
+        enroll(student, classroom)
+        make_classroom_subject(classroom, subject_name=email)
+        StudentGuardian.objects.create(guardian=cls.tutor, student=student)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.tutor)
+
+    def test_query_count_does_not_grow_with_children(self):
+        def grow():
+            self.add_child("enfant1@x.io", self.classrooms[1])
+            self.add_child("enfant2@x.io", self.classrooms[1])
+
+        self.assertConstantQueries(reverse("tutor_dashboard"), grow)
+        self.assertEqual(len(self.client.get(reverse("tutor_dashboard")).context["children"]), 3)
@@ -0,0 +1,120 @@
+import base64
+import datetime
+import io
+import shutil
+import tempfile
+import zipfile
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from core.documents import _decoded_header, header_image, stream_zip, student_records
+from core.models import Enrollment, Evaluation, Mark
+from core.tests.utils import classrooms_of, enroll, make_classroom_subject, make_school_year, make_student, make_user
+
+
+class DocumentTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.first_year = make_school_year()
+        cls.second_year = make_school_year(cls.first_year.school, start=datetime.date(2025, 9, 1))
+        cls.student = make_student("eleve@x.io", first_name="Awa", last_name="Diallo")
+        cls.other = make_student("autre@x.io", first_name="Binta", last_name="Camara")
+        first = enroll(cls.student, classrooms_of(cls.first_year)[0])
+        cls.enrollment = Enrollment.objects.enroll(cls.student, classrooms_of(cls.second_year)[0])
+        enroll(cls.other, classrooms_of(cls.second_year)[1])
+        classroom_subject = make_classroom_subject(first.classroom)
+        for index, score in enumerate((6, 8), start=1):
+            evaluation = Evaluation.objects.create(
+                classroom_subject=classroom_subject,
+                name=f"Devoir {index}",
+                date=datetime.date(2024, 10, index),
+                max_score=10,
+            )
+            Mark.objects.create(evaluation=evaluation, enrollment=first, score=score)
+
+
+class StudentRecordTests(DocumentTestCase):
+    def test_every_year_of_every_student_in_one_query(self):
+        with self.assertNumQueries(1):
+            records = student_records([self.student.pk, self.other.pk])
+        first_year, second_year = records[self.student.pk]["years"]
+        self.assertEqual(first_year["subjects"], [{"name": "Maths", "mark_count": 2, "average": 14.0}])
+        self.assertEqual(second_year["enrollment_number"], self.enrollment.enrollment_number)
+        self.assertEqual(second_year["subjects"], [])
+        self.assertEqual(len(records[self.other.pk]["years"]), 1)
+
+    def test_records_can_be_limited_to_one_year(self):
+        records = student_records([self.student.pk], school_year_id=self.second_year.pk)
+        self.assertEqual([year["school_year_id"] for year in records[self.student.pk]["years"]], [self.second_year.pk])
+
+
+class HeaderImageTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        _decoded_header.cache_clear()
+
+    def test_header_is_downscaled_and_decoded_once(self):
+        school = make_school_year().school
+        buffer = io.BytesIO()
+        Image.new("RGB", (3200, 800), "white").save(buffer, format="JPEG")
+        school.document_header.save("entete.jpg", ContentFile(buffer.getvalue()))
+        for _ in range(2):
+            header = header_image(school)
+        prefix, data = header.split(",", 1)
+        self.assertEqual(prefix, "data:image/png;base64")
+        self.assertEqual(Image.open(io.BytesIO(base64.b64decode(data))).size, (1600, 400))
+        self.assertEqual(_decoded_header.cache_info().misses, 1)
+
+    def test_unreadable_header_is_ignored(self):
+        school = make_school_year().school
+        school.document_header.save("entete.png", ContentFile(b"pas une image"))
+        self.assertIsNone(header_image(school))
+
+
+class DocumentViewTests(DocumentTestCase):
+    def setUp(self):
+        self.client.force_login(make_user("admin@x.io", is_staff=True))
+
+    def test_certificate_covers_the_latest_year(self):
+        response = self.client.get(reverse("student_document", args=[self.student.pk, "certificate"]))
+        self.assertContains(response, self.enrollment.enrollment_number)
+        self.assertContains(response, "Awa Diallo")
+
+    def test_transcript_lists_averages(self):
+        response = self.client.get(reverse("student_document", args=[self.student.pk, "transcript"]))
+        self.assertContains(response, "Maths")
+
+    def test_unknown_document_or_student(self):
+        self.assertEqual(
+            self.client.get(reverse("student_document", args=[self.student.pk, "diplome"])).status_code, 404
+        )
+        student = make_student("nouveau@x.io")
+        self.assertEqual(self.client.get(reverse("student_document", args=[student.pk, "certificate"])).status_code, 404)
+
+    def test_year_archive_is_streamed(self):
+        response = self.client.get(reverse("school_year_documents", args=[self.second_year.pk, "certificate"]))
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(
+            archive.namelist(),
+            [f"certificate-diallo-awa-{self.student.pk}.html", f"certificate-camara-binta-{self.other.pk}.html"],
+        )
+
+    def test_archive_can_be_limited_to_a_classroom(self):
+        response = self.client.get(
+            reverse("school_year_documents", args=[self.second_year.pk, "transcript"]),
+            {"classroom": classrooms_of(self.second_year)[1].pk},
+        )
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(archive.namelist(), [f"transcript-camara-binta-{self.other.pk}.html"])
+
+
+class StreamZipTests(TestCase):
+    def test_each_file_is_yielded_as_it_is_written(self):
+        chunks = list(stream_zip((f"{index}.txt", b"contenu") for index in range(3)))
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(zipfile.ZipFile(io.BytesIO(b"".join(chunks))).read("2.txt"), b"contenu")
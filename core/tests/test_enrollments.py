@@ -0,0 +1,104 @@
+import datetime
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Enrollment, EnrollmentSequence, SyncChange, Teacher
+from core.tests.utils import classrooms_of, enroll, make_school_year, make_student
+
+
+class EnrollmentSequenceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_year = make_school_year()
+
+    def test_blocks_are_consecutive_and_disjoint(self):
+        self.assertEqual(EnrollmentSequence.objects.allocate(self.school_year, 3), range(1, 4))
+        self.assertEqual(EnrollmentSequence.objects.allocate(self.school_year), range(4, 5))
+        self.assertEqual(EnrollmentSequence.objects.allocate(self.school_year, 2), range(5, 7))
+
+    def test_each_school_year_has_its_own_sequence(self):
+        other = make_school_year(self.school_year.school, start=datetime.date(2025, 9, 1))
+        EnrollmentSequence.objects.allocate(self.school_year, 5)
+        self.assertEqual(EnrollmentSequence.objects.allocate(other), range(1, 2))
+
+    def test_count_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            EnrollmentSequence.objects.allocate(self.school_year, 0)
+
+    def test_save_numbers_blank_enrollments_only(self):
+        classroom = classrooms_of(self.school_year)[0]
+        numbered = enroll(make_student("a@x.io"), classroom)
+        self.assertEqual(numbered.enrollment_number, f"{self.school_year.school_id}-2024-00001")
+        manual = Enrollment.objects.create(
+            student=make_student("b@x.io"), classroom=classroom, school_year=self.school_year, enrollment_number="M-1"
+        )
+        self.assertEqual(manual.enrollment_number, "M-1")
+        self.assertEqual(EnrollmentSequence.objects.get(school_year=self.school_year).last_value, 1)
+
+
+class BulkEnrollTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.previous_year = make_school_year()
+        cls.school_year = make_school_year(cls.previous_year.school, start=datetime.date(2025, 9, 1))
+        cls.classroom = classrooms_of(cls.school_year)[0]
+        cls.students = [make_student(f"eleve{index}@x.io", first_name=f"Eleve{index}") for index in range(3)]
+        cls.previous = [enroll(student, classrooms_of(cls.previous_year)[0]) for student in cls.students]
+
+    def build(self):
+        return [
+            Enrollment(student=student, classroom=self.classroom, school_year=self.school_year)
+            for student in self.students
+        ]
+
+    def test_numbers_come_from_one_block(self):
+        with CaptureQueriesContext(connection) as queries:
+            created = Enrollment.objects.bulk_enroll(self.build())
+        sequence_updates = [query for query in queries if "UPDATE" in query["sql"] and "enrollmentsequence" in query["sql"]]
+        self.assertEqual(len(sequence_updates), 1)
+        prefix = f"{self.school_year.school_id}-2025-"
+        self.assertEqual([enrollment.enrollment_number for enrollment in created], [f"{prefix}{n:05d}" for n in (1, 2, 3)])
+
+    def test_previous_enrollments_stay_in_history(self):
+        Enrollment.objects.bulk_enroll(self.build())
+        for student in self.students:
+            history = Enrollment.objects.filter(student=student).order_by("school_year__start_date")
+            self.assertEqual([enrollment.is_current for enrollment in history], [False, True])
+
+    def test_labels_and_sync_journal_are_written(self):
+        created = Enrollment.objects.bulk_enroll(self.build())
+        labels = dict(Enrollment.objects.filter(pk__in=[e.pk for e in created]).values_list("pk", "display_label"))
+        self.assertTrue(all(label.startswith("Eleve") for label in labels.values()))
+        self.assertEqual(
+            set(SyncChange.objects.filter(model="enrollment").values_list("object_id", flat=True)) & set(labels),
+            set(labels),
+        )
+
+
+class EnrollmentHistoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.first_year = make_school_year()
+        cls.second_year = make_school_year(cls.first_year.school, start=datetime.date(2025, 9, 1))
+        cls.student = make_student("eleve@x.io")
+
+    def test_enroll_keeps_previous_years(self):
+        first = Enrollment.objects.enroll(self.student, classrooms_of(self.first_year)[0])
+        second = Enrollment.objects.enroll(self.student, classrooms_of(self.second_year)[1])
+        self.assertEqual(list(Enrollment.objects.current().filter(student=self.student)), [second])
+        first.refresh_from_db()
+        self.assertFalse(first.is_current)
+        self.assertEqual(self.student.enrollments.count(), 2)
+
+    def test_one_enrollment_per_year(self):
+        Enrollment.objects.enroll(self.student, classrooms_of(self.first_year)[0])
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Enrollment.objects.enroll(self.student, classrooms_of(self.first_year)[1])
+
+    def test_student_cannot_teach_in_a_year_they_are_enrolled_in(self):
+        Enrollment.objects.enroll(self.student, classrooms_of(self.first_year)[0])
+        with self.assertRaises(ValidationError):
+            Teacher(user=self.student.user, school_year=self.first_year).full_clean()
@@ -0,0 +1,86 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.tests.utils import classrooms_of, enroll, make_school, make_school_year, make_student, make_teacher, make_user
+
+
+class SchoolYearFragmentAccessTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_year = make_school_year()
+        cls.student = make_student("eleve@x.io", first_name="Awa", last_name="Diallo")
+        cls.classroom = classrooms_of(cls.school_year)[0]
+        enroll(cls.student, cls.classroom)
+        cls.teacher = make_teacher(cls.school_year, "prof@x.io")
+        cls.staff = make_user("admin@x.io", is_staff=True)
+        cls.outsider = make_teacher(make_school_year(make_school("Autre collège")), "autre@x.io")
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, user):
+        self.client.force_login(user)
+        return self.client.get(reverse("student_search_fragment", args=[self.school_year.pk]), {"q": "Awa"})
+
+    def test_student_is_denied(self):
+        self.assertEqual(self.search(self.student.user).status_code, 403)
+
+    def test_teacher_of_another_school_is_denied(self):
+        self.assertEqual(self.search(self.outsider.user).status_code, 403)
+
+    def test_staff_and_school_teacher_see_results(self):
+        for user in (self.staff, self.teacher.user):
+            response = self.search(user)
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, "Diallo")
+
+    def test_cached_fragment_is_not_served_to_a_denied_user(self):
+        self.assertEqual(self.search(self.staff).status_code, 200)
+        self.assertEqual(self.search(self.student.user).status_code, 403)
+
+    def test_classroom_list_and_overview_are_restricted(self):
+        self.client.force_login(self.student.user)
+        for name in ("classroom_list_fragment", "school_year_overview"):
+            response = self.client.get(reverse(name, args=[self.school_year.pk]))
+            self.assertEqual(response.status_code, 403)
+
+    def test_unknown_school_year(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("classroom_list_fragment", args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_year = make_school_year()
+        cls.classroom = classrooms_of(cls.school_year)[0]
+        cls.staff = make_user("admin@x.io", is_staff=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.staff)
+        self.url = reverse("classroom_list_fragment", args=[self.school_year.pk])
+
+    def get(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, headers={"hx-request": "true", "hx-target": "classrooms"})
+        return response, [query["sql"] for query in queries if "core_classroom" in query["sql"]]
+
+    def test_cached_fragment_skips_the_query(self):
+        response, queries = self.get()
+        self.assertContains(response, "0 élève")
+        self.assertEqual(len(queries), 1)
+        response, queries = self.get()
+        self.assertContains(response, "0 élève")
+        self.assertEqual(queries, [])
+
+    def test_write_invalidates_the_fragment(self):
+        self.get()
+        enroll(make_student("eleve@x.io"), self.classroom)
+        response, queries = self.get()
+        self.assertContains(response, "1 élève")
+        self.assertEqual(len(queries), 1)
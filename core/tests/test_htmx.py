@@ -0,0 +1,20 @@
+import re
+
+from django.test import TestCase
+from django.urls import reverse
+
+
+class HtmxNavigationTests(TestCase):
+    def test_boost_is_scoped_to_the_content_area(self):
+        content = self.client.get(reverse("home")).content.decode()
+        self.assertNotIn("hx-boost", re.search(r"<body[^>]*>", content).group())
+        self.assertIn('hx-boost="true"', re.search(r'<main id="content"[^>]*>', content).group())
+
+    def test_boosted_request_renders_only_the_content_block(self):
+        response = self.client.get(reverse("home"), headers={"hx-request": "true", "hx-target": "content"})
+        self.assertNotContains(response, "<body")
+        self.assertIn("HX-Target", response["Vary"])
+        self.assertContains(self.client.get(reverse("home")), "<body")
+
+    def test_login_form_leaves_the_app_shell(self):
+        self.assertContains(self.client.get(reverse("login")), 'hx-boost="false"')
@@ -0,0 +1,49 @@
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.models import StudentGuardian
+from core.tests.utils import User, classrooms_of, enroll, make_school_year, make_student, make_user
+
+
+class ImportGuardiansTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.enrollment = enroll(make_student("eleve@x.io"), classrooms_of(make_school_year())[0])
+        cls.tutor = make_user("parent@x.io", is_tutor=True)
+        cls.teacher = make_user("prof@x.io", is_teacher=True)
+
+    def run_import(self, *emails, enrollment_number=None):
+        number = enrollment_number or self.enrollment.enrollment_number
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", encoding="utf-8") as f:
+            f.write("guardian_email,enrollment_number,relationship\n")
+            f.writelines(f"{email},{number},mother\n" for email in emails)
+            f.flush()
+            out = StringIO()
+            call_command("import_guardians", f.name, stdout=out)
+        return out.getvalue()
+
+    def test_creates_missing_tutors_and_links(self):
+        self.run_import("Nouveau@X.io", "parent@x.io")
+        created = User.objects.get(email="Nouveau@x.io")
+        self.assertTrue(created.is_tutor)
+        self.assertFalse(created.has_usable_password())
+        self.assertEqual(
+            set(StudentGuardian.objects.values_list("guardian__email", flat=True)), {"Nouveau@x.io", "parent@x.io"}
+        )
+
+    def test_existing_non_tutor_account_is_skipped_and_reported(self):
+        output = self.run_import("prof@x.io", "parent@x.io")
+        self.assertIn("prof@x.io", output)
+        self.assertFalse(StudentGuardian.objects.filter(guardian=self.teacher).exists())
+        self.teacher.refresh_from_db()
+        self.assertFalse(self.teacher.is_tutor)
+        self.assertTrue(StudentGuardian.objects.filter(guardian=self.tutor).exists())
+
+    def test_import_is_idempotent_and_reports_unknown_numbers(self):
+        self.run_import("parent@x.io")
+        self.run_import("parent@x.io")
+        self.assertEqual(StudentGuardian.objects.count(), 1)
+        self.assertIn("INCONNU", self.run_import("parent@x.io", enrollment_number="INCONNU"))
@@ -0,0 +1,73 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import models
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import isolate_apps
+
+from core.checks import check_display_labels
+from core.labels import labelled_models_in_order
+from core.models import Classroom, DisplayLabelModel, Enrollment, Level, SchoolYearLevel
+from core.tests.utils import classrooms_of, enroll, make_school_year, make_student
+
+
+class DisplayLabelTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_year = make_school_year()
+        cls.classroom = classrooms_of(cls.school_year)[0]
+        cls.enrollment = enroll(make_student("eleve@x.io", first_name="Awa"), cls.classroom)
+
+    def test_labels_are_stored_on_save(self):
+        self.assertIn("6e", self.classroom.display_label)
+        self.assertTrue(self.enrollment.display_label.startswith("Awa - "))
+
+    def test_listing_reads_no_related_rows(self):
+        enrollments = list(Enrollment.objects.all())
+        with self.assertNumQueries(0):
+            [str(enrollment) for enrollment in enrollments]
+
+    def test_renaming_an_ancestor_refreshes_descendants(self):
+        level = Level.objects.get(schoolyear_levels__school_year=self.school_year)
+        level.name = "Sixième"
+        level.save()
+        # La classe, puis l'inscription dont le libellé reprend celui de la classe.
+        for model, pk in ((Classroom, self.classroom.pk), (Enrollment, self.enrollment.pk)):
+            self.assertIn("Sixième", model.objects.get(pk=pk).display_label, model)
+
+    def test_unrelated_update_fields_do_not_propagate(self):
+        user = self.enrollment.student.user
+        user.first_name = "Binta"
+        user.save(update_fields=["last_login"])
+        self.assertTrue(Enrollment.objects.get(pk=self.enrollment.pk).display_label.startswith("Awa"))
+        user.save(update_fields=["first_name"])
+        self.assertTrue(Enrollment.objects.get(pk=self.enrollment.pk).display_label.startswith("Binta"))
+
+    def test_ancestors_come_before_dependents(self):
+        order = labelled_models_in_order()
+        self.assertLess(order.index(SchoolYearLevel), order.index(Classroom))
+        self.assertLess(order.index(Classroom), order.index(Enrollment))
+
+    def test_command_repairs_stale_labels(self):
+        Classroom.objects.filter(pk=self.classroom.pk).update(display_label="")
+        call_command("refresh_display_labels", stdout=StringIO())
+        self.assertIn("6e", Classroom.objects.get(pk=self.classroom.pk).display_label)
+
+
+class DisplayLabelCheckTests(SimpleTestCase):
+    def test_project_models_define_their_label(self):
+        self.assertEqual(check_display_labels(None), [])
+
+    def test_missing_label_fails_the_check(self):
+        with isolate_apps("core") as registry:
+            class Sansnom(DisplayLabelModel):
+                pass
+
+            class Nomme(DisplayLabelModel):
+                name = models.CharField(max_length=10)
+
+                def build_display_label(self):
+                    return self.name
+
+            errors = check_display_labels([registry.get_app_config("core")])
+        self.assertEqual([(error.id, error.obj) for error in errors], [("core.E002", Sansnom)])
@@ -0,0 +1,83 @@
+import datetime
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from core.models import Enrollment, SchoolYearLevel, SyncChange
+from core.placement import move_enrollments, place_students
+from core.tests.utils import classrooms_of, enroll, make_school_year, make_student, make_user
+
+
+class PlaceStudentsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_year = make_school_year()
+        cls.year_level = SchoolYearLevel.objects.get(school_year=cls.school_year)
+        cls.classrooms = classrooms_of(cls.school_year)
+        cls.students = [make_student(f"eleve{index}@x.io") for index in range(6)]
+
+    def build(self, count):
+        return [Enrollment(student=student, school_year=self.school_year) for student in self.students[:count]]
+
+    def test_fills_classrooms_evenly(self):
+        placed = place_students(self.year_level, self.build(4))
+        self.assertEqual(sorted(placed.values()), [2, 2])
+
+    def test_existing_enrollments_count_against_capacity(self):
+        enroll(make_student("deja@x.io"), self.classrooms[0])
+        enroll(make_student("deja2@x.io"), self.classrooms[0])
+        placed = place_students(self.year_level, self.build(4))
+        self.assertEqual(placed[self.classrooms[0]], 1)
+        self.assertEqual(placed[self.classrooms[1]], 3)
+
+    def test_categories_are_spread(self):
+        enrollments = self.build(4)
+        categories = {enrollment.student_id: index % 2 for index, enrollment in enumerate(enrollments)}
+        place_students(self.year_level, enrollments, criteria=lambda enrollment: categories[enrollment.student_id])
+        for classroom in self.classrooms:
+            self.assertEqual(
+                sorted(categories[e.student_id] for e in enrollments if e.classroom == classroom), [0, 1]
+            )
+
+    def test_insufficient_capacity_is_rejected(self):
+        enroll(make_student("deja@x.io"), self.classrooms[0])
+        with self.assertRaises(ValidationError):
+            place_students(self.year_level, self.build(6))
+
+    def test_saved_enrollments_are_updated_in_bulk(self):
+        enrollments = [enroll(student, self.classrooms[0]) for student in self.students[:3]]
+        place_students(self.year_level, enrollments)
+        classroom_ids = Enrollment.objects.filter(pk__in=[e.pk for e in enrollments]).values_list("classroom_id", flat=True)
+        self.assertEqual(len(set(classroom_ids)), 2)
+        moved = [e for e in enrollments if e.classroom_id == self.classrooms[1].pk]
+        # L'ancienne classe voit une suppression, la nouvelle un ajout.
+        self.assertTrue(SyncChange.objects.filter(
+            model="enrollment", object_id=moved[0].pk, classroom_id=self.classrooms[0].pk, deleted=True
+        ).exists())
+
+
+class MoveEnrollmentsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_year = make_school_year()
+        cls.source, cls.target = classrooms_of(cls.school_year)
+        cls.user = make_user("admin@x.io", is_staff=True)
+        cls.enrollments = [enroll(make_student(f"eleve{index}@x.io"), cls.source) for index in range(3)]
+
+    def test_moves_in_one_update(self):
+        queryset = Enrollment.objects.filter(pk__in=[e.pk for e in self.enrollments[:2]])
+        self.assertEqual(move_enrollments(queryset, self.target, self.user), 2)
+        self.assertEqual(self.target.enrollments.count(), 2)
+        self.assertEqual(set(self.target.enrollments.values_list("updated_by", flat=True)), {self.user.pk})
+
+    def test_capacity_is_checked(self):
+        enroll(make_student("deja@x.io"), self.target)
+        enroll(make_student("deja2@x.io"), self.target)
+        with self.assertRaises(ValidationError):
+            move_enrollments(Enrollment.objects.filter(classroom=self.source), self.target, self.user)
+        self.assertEqual(self.source.enrollments.count(), 3)
+
+    def test_other_school_year_is_rejected(self):
+        other = make_school_year(self.school_year.school, start=datetime.date(2025, 9, 1))
+        with self.assertRaises(ValidationError):
+            move_enrollments(Enrollment.objects.filter(classroom=self.source), classrooms_of(other)[0], self.user)
@@ -0,0 +1,137 @@
+import asyncio
+
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.views import View
+
+from core.cache import cached_value
+from core.mixins import ReplicaReadMixin
+from core.models import School
+from core.replicas import (
+    PIN_COOKIE,
+    ReplicaPinningMiddleware,
+    ReplicaRouter,
+    _state,
+    keep_routing,
+    reads_from_replica,
+    replica_reads,
+)
+
+
+# ``TestCase`` exécute chaque test dans une transaction, où tout est lu sur la
+# base principale : le routage se vérifie hors base de données.
+@override_settings(REPLICA_DATABASES=["replica1"])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_stay_on_the_primary_without_opt_in(self):
+        self.assertEqual(self.router.db_for_read(School), "default")
+
+    def test_opted_in_reads_use_a_replica_until_a_write(self):
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(School), "replica1")
+            self.assertEqual(self.router.db_for_read(Session), "default")
+            self.router.db_for_write(Session)
+            self.assertEqual(self.router.db_for_read(School), "replica1")
+            self.assertEqual(self.router.db_for_write(School), "default")
+            self.assertEqual(self.router.db_for_read(School), "default")
+
+    def test_replicas_are_not_migrated(self):
+        self.assertIs(self.router.allow_migrate("replica1", "core"), False)
+        self.assertIsNone(self.router.allow_migrate("default", "core"))
+
+
+@override_settings(REPLICA_DATABASES=["replica1"])
+class ReplicaRouterTransactionTests(TestCase):
+    def test_reads_inside_a_transaction_use_the_primary(self):
+        with replica_reads(), transaction.atomic():
+            self.assertEqual(ReplicaRouter().db_for_read(School), "default")
+
+
+class ReadView(ReplicaReadMixin, View):
+    def get(self, request):
+        return HttpResponse(str(_state.get().replica))
+
+    def post(self, request):
+        ReplicaRouter().db_for_write(School)
+        return HttpResponse(str(_state.get().replica))
+
+
+class ReplicaPinningMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = ReplicaPinningMiddleware(ReadView.as_view())
+
+    def test_get_opts_in_and_post_pins_the_client(self):
+        response = self.middleware(self.factory.get("/"))
+        self.assertEqual((response.content, PIN_COOKIE in response.cookies), (b"True", False))
+        response = self.middleware(self.factory.post("/"))
+        self.assertEqual((response.content, PIN_COOKIE in response.cookies), (b"False", True))
+
+    def test_cookie_keeps_reads_on_the_primary(self):
+        request = self.factory.get("/")
+        request.COOKIES[PIN_COOKIE] = "1"
+        seen = []
+        ReplicaPinningMiddleware(lambda request: seen.append(_state.get().pinned) or HttpResponse())(request)
+        self.assertEqual(seen, [True])
+        self.assertIsNone(_state.get())
+
+    def test_async_requests_get_their_own_state(self):
+        async def view(request):
+            ReplicaRouter().db_for_write(School)
+            return HttpResponse()
+
+        response = asyncio.run(ReplicaPinningMiddleware(view)(self.factory.post("/")))
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+
+class StreamingView(ReplicaReadMixin, View):
+    def get(self, request):
+        def chunks():
+            yield ReplicaRouter().db_for_read(School).encode()
+
+        return StreamingHttpResponse(keep_routing(chunks()))
+
+
+@override_settings(REPLICA_DATABASES=["replica1"])
+class StreamingRoutingTests(SimpleTestCase):
+    def test_streamed_content_keeps_the_request_routing(self):
+        response = ReplicaPinningMiddleware(StreamingView.as_view())(RequestFactory().get("/"))
+        # Le middleware a rendu la main : le contenu est produit maintenant.
+        self.assertIsNone(_state.get())
+        self.assertEqual(b"".join(response.streaming_content), b"replica1")
+        self.assertIsNone(_state.get())
+
+
+@override_settings(REPLICA_DATABASES=["replica1"])
+class ReplicaCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return ReplicaRouter().db_for_read(School)
+
+    def test_values_read_on_a_replica_are_not_cached(self):
+        with replica_reads():
+            self.assertFalse(reads_from_replica())
+            for _ in range(2):
+                self.assertEqual(cached_value("essai", (School,), self.compute), "replica1")
+            self.assertTrue(reads_from_replica())
+        self.assertEqual(self.calls, 2)
+
+    def test_values_read_on_the_primary_are_cached(self):
+        for _ in range(2):
+            self.assertEqual(cached_value("essai", (School,), self.compute), "default")
+        self.assertEqual(self.calls, 1)
+
+    def test_a_write_sends_reads_back_to_the_primary(self):
+        with replica_reads():
+            ReplicaRouter().db_for_read(School)
+            ReplicaRouter().db_for_write(School)
+            self.assertFalse(reads_from_replica())
@@ -0,0 +1,96 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import ClassroomStat, Enrollment
+from core.stats import rollup
+from core.tests.utils import classrooms_of, enroll, make_school, make_school_year, make_student, make_user
+
+
+class ClassroomStatTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_year = make_school_year()
+        cls.classroom_a, cls.classroom_b = classrooms_of(cls.school_year)
+
+    def counts(self):
+        return dict(ClassroomStat.objects.values_list("classroom_id", "student_count"))
+
+    def test_enrollment_writes_refresh_both_classrooms(self):
+        enrollment = enroll(make_student("eleve@x.io"), self.classroom_a)
+        self.assertEqual(self.counts(), {self.classroom_a.pk: 1, self.classroom_b.pk: 0})
+        enrollment.classroom = self.classroom_b
+        enrollment.save()
+        self.assertEqual(self.counts(), {self.classroom_a.pk: 0, self.classroom_b.pk: 1})
+        enrollment.delete()
+        self.assertEqual(self.counts(), {self.classroom_a.pk: 0, self.classroom_b.pk: 0})
+
+    def test_bulk_enroll_refreshes_stats(self):
+        Enrollment.objects.bulk_enroll([
+            Enrollment(student=make_student(f"eleve{index}@x.io"), classroom=self.classroom_a, school_year=self.school_year)
+            for index in range(2)
+        ])
+        self.assertEqual(self.counts()[self.classroom_a.pk], 2)
+
+    def test_command_repairs_rows_changed_outside_the_orm(self):
+        enroll(make_student("eleve@x.io"), self.classroom_a)
+        ClassroomStat.objects.update(student_count=0)
+        call_command("refresh_stats", stdout=StringIO())
+        self.assertEqual(self.counts()[self.classroom_a.pk], 1)
+
+
+class RollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_year = make_school_year(make_school("Collège Nord"))
+        cls.other_year = make_school_year(make_school("Collège Sud"))
+        for index, classroom in enumerate(classrooms_of(cls.school_year) + classrooms_of(cls.other_year)[:1]):
+            enroll(make_student(f"eleve{index}@x.io"), classroom)
+
+    def test_group_by_school(self):
+        rows, refreshed_at = rollup("school")
+        self.assertEqual(
+            [(row["school_name"], row["classroom_count"], row["student_count"], row["capacity"]) for row in rows],
+            [("Collège Nord", 2, 2, 6), ("Collège Sud", 2, 1, 6)],
+        )
+        self.assertIsNotNone(refreshed_at)
+
+    def test_filters_and_finer_groupings(self):
+        rows, _ = rollup("classroom", school_id=self.school_year.school_id)
+        self.assertEqual([row["student_count"] for row in rows], [1, 1])
+        rows, refreshed_at = rollup("level", year=1990)
+        self.assertEqual((rows, refreshed_at), ([], None))
+
+
+class StatisticsViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_year = make_school_year()
+        enroll(make_student("eleve@x.io"), classrooms_of(cls.school_year)[0])
+        cls.staff = make_user("admin@x.io", is_staff=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.staff)
+
+    def test_json_and_csv(self):
+        response = self.client.get(reverse("statistics"), {"group_by": "grade"})
+        self.assertEqual(response.json()["results"][0]["student_count"], 1)
+        self.assertTrue(response.has_header("Last-Modified"))
+        response = self.client.get(reverse("statistics"), {"format": "csv"})
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertTrue(response.content.decode().startswith("school_id,school_name,"))
+
+    def test_cached_result_follows_writes(self):
+        self.client.get(reverse("statistics"))
+        enroll(make_student("autre@x.io"), classrooms_of(self.school_year)[1])
+        self.assertEqual(self.client.get(reverse("statistics")).json()["results"][0]["student_count"], 2)
+
+    def test_bad_parameters_and_permissions(self):
+        self.assertEqual(self.client.get(reverse("statistics"), {"group_by": "city"}).status_code, 400)
+        self.assertEqual(self.client.get(reverse("statistics"), {"year": "x"}).status_code, 400)
+        self.client.force_login(make_user("prof@x.io", is_teacher=True))
+        self.assertEqual(self.client.get(reverse("statistics")).status_code, 403)
@@ -0,0 +1,55 @@
+import datetime
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from core.models import ClassroomSubject, Subject, SubjectYear
+from core.tests.utils import classrooms_of, make_school, make_school_year
+
+
+class SubjectCatalogTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.first_year = make_school_year()
+        cls.second_year = make_school_year(cls.first_year.school, start=datetime.date(2025, 9, 1))
+        school = cls.first_year.school
+        cls.maths = Subject.objects.create(school=school, name="Maths", coefficient=4)
+        cls.latin = Subject.objects.create(school=school, name="Latin", coefficient=1)
+
+    def test_years_share_the_catalog(self):
+        for school_year in (self.first_year, self.second_year):
+            self.assertEqual(
+                set(Subject.objects.for_year(school_year).values_list("name", flat=True)), {"Maths", "Latin"}
+            )
+
+    def test_override_changes_one_year_only(self):
+        SubjectYear.objects.create(school_year=self.second_year, subject=self.latin, is_active=False)
+        SubjectYear.objects.create(school_year=self.second_year, subject=self.maths, coefficient=5)
+        second = {subject.name: subject.year_coefficient for subject in Subject.objects.for_year(self.second_year)}
+        self.assertEqual(second, {"Maths": Decimal(5)})
+        first = {subject.name: subject.year_coefficient for subject in Subject.objects.for_year(self.first_year)}
+        self.assertEqual(first, {"Maths": Decimal(4), "Latin": Decimal(1)})
+
+    def test_effective_coefficient_falls_back_from_classroom_to_year_to_catalog(self):
+        classroom = classrooms_of(self.second_year)[0]
+        classroom_subject = ClassroomSubject.objects.create(classroom=classroom, subject=self.maths)
+
+        def effective():
+            return ClassroomSubject.objects.with_coefficient().get(pk=classroom_subject.pk).effective_coefficient
+
+        self.assertEqual(effective(), 4)
+        SubjectYear.objects.create(school_year=self.second_year, subject=self.maths, coefficient=5)
+        self.assertEqual(effective(), 5)
+        ClassroomSubject.objects.filter(pk=classroom_subject.pk).update(coefficient=6)
+        self.assertEqual(effective(), 6)
+
+    def test_inactive_or_foreign_subjects_are_rejected(self):
+        classroom = classrooms_of(self.second_year)[0]
+        SubjectYear.objects.create(school_year=self.second_year, subject=self.latin, is_active=False)
+        foreign = Subject.objects.create(school=make_school("Autre collège"), name="Maths")
+        for subject in (self.latin, foreign):
+            with self.assertRaises(ValidationError):
+                ClassroomSubject(classroom=classroom, subject=subject).full_clean()
+        with self.assertRaises(ValidationError):
+            SubjectYear(school_year=self.first_year, subject=foreign).full_clean()
@@ -0,0 +1,26 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from core.checks import check_templates_compile
+from core.template_warmup import warm_templates
+
+
+class TemplateWarmupTests(SimpleTestCase):
+    def test_project_templates_compile(self):
+        self.assertEqual(warm_templates(), [])
+
+    def test_broken_template_is_reported(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        Path(directory, "casse.html").write_text("{% if %}")
+        templates = [{**settings.TEMPLATES[0], "DIRS": [directory, *settings.TEMPLATES[0]["DIRS"]]}]
+        with override_settings(TEMPLATES=templates):
+            self.assertEqual([name for name, _ in warm_templates()], ["casse.html"])
+            with self.assertRaises(ImproperlyConfigured):
+                warm_templates(strict=True)
+            self.assertEqual([error.id for error in check_templates_compile(None)], ["core.E001"])
@@ -0,0 +1,113 @@
+import datetime
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+
+from core import timetable
+from core.models import Room, Timeslot, TimetableEntry
+from core.tests.utils import classrooms_of, make_classroom_subject, make_school_year, make_teacher, make_user
+
+
+class TimetableTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_year = make_school_year()
+        cls.classroom_a, cls.classroom_b = classrooms_of(cls.school_year)
+        cls.teacher = make_teacher(cls.school_year, "prof@x.io")
+        cls.other_teacher = make_teacher(cls.school_year, "autre@x.io")
+        cls.maths_a = make_classroom_subject(cls.classroom_a, "Maths", teacher=cls.teacher)
+        cls.maths_b = make_classroom_subject(cls.classroom_b, "Maths", teacher=cls.teacher)
+        cls.french_a = make_classroom_subject(cls.classroom_a, "Français", teacher=cls.other_teacher)
+        cls.french_b = make_classroom_subject(cls.classroom_b, "Français", teacher=cls.other_teacher)
+        cls.room_1, cls.room_2 = (Room.objects.create(school=cls.school_year.school, name=name) for name in ("S1", "S2"))
+        cls.monday, cls.tuesday = (
+            Timeslot.objects.create(
+                school_year=cls.school_year, day=day, start_time=datetime.time(8), end_time=datetime.time(9)
+            )
+            for day in (Timeslot.Day.MONDAY, Timeslot.Day.TUESDAY)
+        )
+
+    def setUp(self):
+        # Les identifiants sont réutilisés d'un test à l'autre : index et versions repartent de zéro.
+        cache.clear()
+        timetable._indexes.clear()
+
+    def add(self, classroom_subject, timeslot, room=None):
+        entry = TimetableEntry(classroom_subject=classroom_subject, timeslot=timeslot, room=room)
+        entry.full_clean()
+        with self.captureOnCommitCallbacks(execute=True):
+            entry.save()
+        return entry
+
+
+class ConflictTests(TimetableTestCase):
+    def test_teacher_classroom_and_room_conflicts(self):
+        self.add(self.maths_a, self.monday, self.room_1)
+        for classroom_subject, room, message in (
+            (self.maths_b, None, "L'enseignant a déjà cours sur ce créneau."),
+            (self.french_a, None, "La classe a déjà cours sur ce créneau."),
+            (self.french_b, self.room_1, "La salle est déjà occupée sur ce créneau."),
+        ):
+            with self.assertRaises(ValidationError) as error:
+                self.add(classroom_subject, self.monday, room)
+            self.assertIn(message, error.exception.messages)
+
+    def test_free_resources_are_accepted(self):
+        self.add(self.maths_a, self.monday, self.room_1)
+        self.add(self.french_b, self.monday, self.room_2)
+        self.add(self.maths_b, self.tuesday, self.room_1)
+
+    def test_an_entry_does_not_conflict_with_itself(self):
+        entry = self.add(self.maths_a, self.monday, self.room_1)
+        entry.room = self.room_2
+        entry.full_clean()
+
+    def test_timeslot_of_another_year_is_rejected(self):
+        other_year = make_school_year(self.school_year.school, start=datetime.date(2025, 9, 1))
+        timeslot = Timeslot.objects.create(
+            school_year=other_year, day=1, start_time=datetime.time(8), end_time=datetime.time(9)
+        )
+        with self.assertRaises(ValidationError):
+            self.add(self.maths_a, timeslot)
+
+
+class OccupancyIndexTests(TimetableTestCase):
+    def test_writes_update_the_loaded_index_without_queries(self):
+        index = timetable.occupancy(self.school_year.pk)
+        entry = self.add(self.maths_a, self.monday, self.room_1)
+        with self.assertNumQueries(0):
+            index = timetable.occupancy(self.school_year.pk, max_age=3600)
+            self.assertNotIn(self.teacher.pk, index.free("teacher", self.monday.pk))
+            self.assertEqual(index.free_slots(teacher_id=self.teacher.pk), [self.tuesday.pk])
+            self.assertEqual(index.where(self.monday.pk, classroom_id=self.classroom_a.pk)[0], entry.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            entry.delete()
+        index = timetable.occupancy(self.school_year.pk, max_age=3600)
+        self.assertEqual(index.free_slots(teacher_id=self.teacher.pk), [self.monday.pk, self.tuesday.pk])
+
+    def test_bit_stays_set_while_another_entry_uses_the_resource(self):
+        self.add(self.maths_a, self.monday, self.room_1)
+        entry = self.add(self.french_b, self.monday, self.room_2)
+        with self.captureOnCommitCallbacks(execute=True):
+            entry.delete()
+        index = timetable.occupancy(self.school_year.pk, max_age=0)
+        self.assertNotIn(self.classroom_a.pk, index.free("classroom", self.monday.pk))
+        self.assertIn(self.classroom_b.pk, index.free("classroom", self.monday.pk))
+
+
+class AvailabilityViewTests(TimetableTestCase):
+    def test_free_resources_for_a_timeslot(self):
+        self.add(self.maths_a, self.monday, self.room_1)
+        self.client.force_login(make_user("admin@x.io", is_staff=True))
+        data = self.client.get(
+            reverse("timetable_availability", args=[self.school_year.pk]), {"timeslot": self.monday.pk}
+        ).json()
+        self.assertEqual([teacher["id"] for teacher in data["teachers"]], [self.other_teacher.pk])
+        self.assertEqual([room["id"] for room in data["rooms"]], [self.room_2.pk])
+
+    def test_requires_staff(self):
+        self.client.force_login(self.teacher.user)
+        response = self.client.get(reverse("timetable_availability", args=[self.school_year.pk]))
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,88 @@
+import datetime
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from core import timetable
+from core.models import Classroom, Timeslot, TimetableEntry
+from core.tests.utils import classrooms_of, make_classroom_subject, make_school_year, make_teacher, make_user
+from core.workload import workload_report
+
+
+class WorkloadTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_year = make_school_year()
+        classroom_a, classroom_b = classrooms_of(cls.school_year)
+        classroom_c = Classroom.objects.create(school_year_level=classroom_a.school_year_level, name="C", capacity=3)
+        # Le premier enseignant dépasse son service de 8 h, le second en est loin.
+        cls.busy = make_teacher(cls.school_year, "charge@x.io")
+        cls.busy.service_hours = 12
+        cls.busy.save()
+        cls.free = make_teacher(cls.school_year, "libre@x.io")
+        cls.maths_a = make_classroom_subject(classroom_a, "Maths", teacher=cls.busy, weekly_hours=10)
+        cls.maths_b = make_classroom_subject(classroom_b, "Maths", teacher=cls.busy, weekly_hours=10)
+        cls.maths_c = make_classroom_subject(classroom_c, "Maths", teacher=cls.free, weekly_hours=4)
+        cls.french_a = make_classroom_subject(classroom_a, "Français")
+
+    def setUp(self):
+        cache.clear()
+        timetable._indexes.clear()
+
+
+class WorkloadReportTests(WorkloadTestCase):
+    def test_hours_are_rolled_up_per_teacher(self):
+        report = workload_report(self.school_year.pk)
+        teachers = {teacher["id"]: teacher for teacher in report["teachers"]}
+        self.assertEqual(
+            (teachers[self.busy.pk]["hours"], teachers[self.busy.pk]["status"]), (Decimal(20), "over")
+        )
+        self.assertEqual(
+            (teachers[self.free.pk]["service_hours"], teachers[self.free.pk]["status"]), (Decimal(18), "under")
+        )
+        self.assertEqual(teachers[self.busy.pk]["subjects"], {self.maths_a.subject_id: Decimal(20)})
+        self.assertEqual([row["classroom_subject"] for row in report["unassigned"]], [self.french_a.pk])
+        self.assertEqual(report["missing_hours"], 1)
+
+    def test_one_move_balances_the_two_teachers(self):
+        proposals = workload_report(self.school_year.pk)["proposals"]
+        self.assertEqual(
+            [(move["classroom_subject"], move["from"], move["to"]) for move in proposals],
+            [(self.maths_a.pk, self.busy.pk, self.free.pk)],
+        )
+
+    def test_moves_respect_the_timetable(self):
+        monday = Timeslot.objects.create(
+            school_year=self.school_year, day=Timeslot.Day.MONDAY, start_time=datetime.time(8), end_time=datetime.time(9)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            for classroom_subject in (self.maths_a, self.maths_c):
+                TimetableEntry.objects.create(classroom_subject=classroom_subject, timeslot=monday)
+        proposals = workload_report(self.school_year.pk)["proposals"]
+        self.assertEqual([move["classroom_subject"] for move in proposals], [self.maths_b.pk])
+
+
+class WorkloadViewTests(WorkloadTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(make_user("admin@x.io", is_staff=True))
+        self.url = reverse("workload", args=[self.school_year.pk])
+
+    def test_report_follows_service_changes(self):
+        self.assertEqual(len(self.client.get(self.url).json()["proposals"]), 1)
+        # Le second enseignant est désormais à son service : lui confier des heures ne réduit plus l'écart.
+        self.free.service_hours = 4
+        self.free.save()
+        self.assertEqual(self.client.get(self.url).json()["proposals"], [])
+
+    def test_csv_has_one_row_per_teacher(self):
+        lines = self.client.get(self.url, {"format": "csv"}).content.decode().splitlines()
+        self.assertEqual(lines[0], "teacher,label,hours,service_hours,status")
+        self.assertEqual(len(lines), 3)
+
+    def test_staff_only_and_unknown_year(self):
+        self.assertEqual(self.client.get(reverse("workload", args=[0])).status_code, 404)
+        self.client.force_login(self.busy.user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
@@ -0,0 +1,74 @@
+"""Jeu de données minimal partagé par les tests de ``core``, ``api`` et ``tasks``."""
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+
+from core.models import (
+    Classroom,
+    ClassroomSubject,
+    Enrollment,
+    Grade,
+    Level,
+    School,
+    SchoolYear,
+    SchoolYearLevel,
+    Student,
+    Subject,
+    Teacher,
+)
+
+User = get_user_model()
+
+
+def make_school(name="Collège Test"):
+    return School.objects.create(name=name, ville="Conakry", quartier="Kaloum")
+
+
+def make_school_year(school=None, start=datetime.date(2024, 9, 1)):
+    """Année avec un cycle, un niveau et deux classes de capacité 3."""
+    school = school or make_school()
+    school_year = SchoolYear.objects.create(school=school, start_date=start)
+    # Cycle et niveau sont ceux de l'établissement, communs à ses années.
+    grade, _ = Grade.objects.get_or_create(school=school, name="Collège", defaults={"order": 1})
+    level, _ = Level.objects.get_or_create(grade=grade, name="6e", defaults={"order": 1})
+    year_level = SchoolYearLevel.objects.create(school_year=school_year, grade=grade, level=level)
+    for name in ("A", "B"):
+        Classroom.objects.create(school_year_level=year_level, name=name, capacity=3)
+    return school_year
+
+
+def make_user(email, **fields):
+    return User.objects.create_user(email=email, password="secret", **fields)
+
+
+def make_student(email, first_name="", last_name=""):
+    user = make_user(email, first_name=first_name, last_name=last_name, is_student=True)
+    return Student.objects.create(user=user)
+
+
+def make_teacher(school_year, email):
+    return Teacher.objects.create(user=make_user(email, is_teacher=True), school_year=school_year)
+
+
+def enroll(student, classroom):
+    return Enrollment.objects.create(
+        student=student,
+        classroom=classroom,
+        school_year=classroom.school_year_level.school_year,
+    )
+
+
+def make_classroom_subject(classroom, subject_name="Maths", teacher=None, weekly_hours=None):
+    school = classroom.school_year_level.school_year.school
+    subject, _ = Subject.objects.get_or_create(school=school, name=subject_name)
+    return ClassroomSubject.objects.create(
+        classroom=classroom,
+        subject=subject,
+        teacher=teacher,
+        weekly_hours=None if weekly_hours is None else Decimal(weekly_hours),
+    )
+
+
+def classrooms_of(school_year):
+    return list(Classroom.objects.filter(school_year_level__school_year=school_year).order_by("name"))
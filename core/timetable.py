@@ -0,0 +1,196 @@
+"""
+Index d'occupation des emplois du temps.
+
+Pour une année scolaire, chaque créneau reçoit un rang (jour puis heure) ;
+l'occupation d'un enseignant, d'une classe ou d'une salle est un entier dont le
+bit n est levé si elle est prise au créneau de rang n. « Qui est libre à ce
+créneau ? », « où est cette classe ? » et « ce cours crée-t-il un conflit ? »
+se résolvent par des opérations de bits en mémoire, sans requête.
+
+L'index d'une année est construit à la première demande (cinq requêtes), puis
+tenu à jour à chaque enregistrement ou suppression d'un cours
+(``core.signals``). Les autres écritures, celles d'autres processus et les
+écritures en masse sont détectées par les versions de modèles de
+``core.cache`` : l'index est alors reconstruit.
+"""
+import threading
+import time
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils.translation import gettext as _
+
+from core.cache import get_model_versions
+from core.models import Classroom, ClassroomSubject, Room, Teacher, Timeslot, TimetableEntry
+
+# Modèles dont dépend un index ; ``TimetableEntry`` en premier (voir ``entry_changed``).
+DEPENDENCIES = (TimetableEntry, Timeslot, ClassroomSubject, Teacher, Room, Classroom)
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+class OccupancyIndex:
+    def __init__(self, school_year_id, versions):
+        self.school_year_id = school_year_id
+        self.versions = versions
+        self.checked_at = 0.0
+        # {créneau: rang} et l'inverse
+        self.ranks = {}
+        self.slots = []
+        # {identifiant: masque des créneaux occupés}
+        self.teachers = {}
+        self.classrooms = {}
+        self.rooms = {}
+        # {identifiant: libellé}
+        self.labels = {"timeslot": {}, "teacher": {}, "classroom": {}, "room": {}}
+        # {cours: (créneau, classe, enseignant, salle, matière en classe)}
+        self.entries = {}
+        # {créneau: {cours}}
+        self.by_slot = defaultdict(set)
+
+    @classmethod
+    def build(cls, school_year_id, versions):
+        index = cls(school_year_id, versions)
+        for rank, timeslot in enumerate(
+            Timeslot.objects.filter(school_year_id=school_year_id)
+            .order_by("day", "start_time")
+            .only("day", "start_time", "end_time")
+        ):
+            index.ranks[timeslot.pk] = rank
+            index.slots.append(timeslot.pk)
+            index.labels["timeslot"][timeslot.pk] = str(timeslot)
+        for masks, kind, queryset in (
+            (index.teachers, "teacher", Teacher.objects.filter(school_year_id=school_year_id)),
+            (index.classrooms, "classroom", Classroom.objects.filter(school_year_level__school_year_id=school_year_id)),
+        ):
+            for pk, label in queryset.values_list("pk", "display_label"):
+                masks[pk] = 0
+                index.labels[kind][pk] = label
+        for pk, name in Room.objects.filter(school__school_years=school_year_id).values_list("pk", "name"):
+            index.rooms[pk] = 0
+            index.labels["room"][pk] = name
+        for row in TimetableEntry.objects.filter(timeslot__school_year_id=school_year_id).values_list(
+            "pk", "timeslot_id", "classroom_subject__classroom_id", "classroom_subject__teacher_id", "room_id",
+            "classroom_subject_id",
+        ):
+            index.add(*row)
+        return index
+
+    def add(self, entry_id, timeslot_id, classroom_id, teacher_id, room_id, classroom_subject_id):
+        bit = 1 << self.ranks[timeslot_id]
+        for masks, key in ((self.classrooms, classroom_id), (self.teachers, teacher_id), (self.rooms, room_id)):
+            if key is not None:
+                masks[key] = masks.get(key, 0) | bit
+        self.entries[entry_id] = (timeslot_id, classroom_id, teacher_id, room_id, classroom_subject_id)
+        self.by_slot[timeslot_id].add(entry_id)
+
+    def remove(self, entry_id):
+        if entry_id not in self.entries:
+            return
+        timeslot_id, *keys = self.entries.pop(entry_id)[:4]
+        self.by_slot[timeslot_id].discard(entry_id)
+        bit = 1 << self.ranks[timeslot_id]
+        others = [self.entries[pk] for pk in self.by_slot[timeslot_id]]
+        for position, (masks, key) in enumerate(zip((self.classrooms, self.teachers, self.rooms), keys), start=1):
+            # Le bit reste levé si un autre cours du créneau occupe encore la ressource.
+            if key is not None and not any(other[position] == key for other in others):
+                masks[key] &= ~bit
+
+    def describe(self, kind, ids):
+        return [{"id": pk, "label": self.labels[kind].get(pk, "")} for pk in ids]
+
+    def free(self, kind, timeslot_id):
+        """Identifiants des enseignants, classes ou salles (``kind``) libres au créneau."""
+        bit = 1 << self.ranks[timeslot_id]
+        masks = {"teacher": self.teachers, "classroom": self.classrooms, "room": self.rooms}[kind]
+        return [pk for pk, mask in masks.items() if not mask & bit]
+
+    def free_slots(self, teacher_id=None, classroom_id=None, room_id=None):
+        """Créneaux où toutes les ressources données sont libres, dans l'ordre de la semaine."""
+        busy = self.teachers.get(teacher_id, 0) | self.classrooms.get(classroom_id, 0) | self.rooms.get(room_id, 0)
+        return [pk for rank, pk in enumerate(self.slots) if not busy >> rank & 1]
+
+    def where(self, timeslot_id, classroom_id=None, teacher_id=None):
+        """Cours de la classe ou de l'enseignant au créneau : ``(cours, salle, matière en classe)`` ou ``None``."""
+        for entry_id in self.by_slot.get(timeslot_id, ()):
+            entry_classroom, entry_teacher, room_id, classroom_subject_id = self.entries[entry_id][1:]
+            if (classroom_id is not None and entry_classroom == classroom_id) or (
+                teacher_id is not None and entry_teacher == teacher_id
+            ):
+                return entry_id, room_id, classroom_subject_id
+        return None
+
+    def conflicts(self, timeslot_id, classroom_id=None, teacher_id=None, room_id=None, exclude=None):
+        """Messages des conflits que créerait un cours au créneau (liste vide sinon)."""
+        if timeslot_id not in self.ranks:
+            return []
+        bit = 1 << self.ranks[timeslot_id]
+        busy = self.classrooms.get(classroom_id, 0) | self.teachers.get(teacher_id, 0) | self.rooms.get(room_id, 0)
+        if not busy & bit:
+            return []
+        messages = []
+        for entry_id in self.by_slot[timeslot_id]:
+            if entry_id == exclude:
+                continue
+            entry_classroom, entry_teacher, entry_room = self.entries[entry_id][1:4]
+            if classroom_id is not None and entry_classroom == classroom_id:
+                messages.append(_("La classe a déjà cours sur ce créneau."))
+            if teacher_id is not None and entry_teacher == teacher_id:
+                messages.append(_("L'enseignant a déjà cours sur ce créneau."))
+            if room_id is not None and entry_room == room_id:
+                messages.append(_("La salle est déjà occupée sur ce créneau."))
+        return messages
+
+
+def occupancy(school_year_id, max_age=1.0):
+    """
+    Index d'occupation de l'année. Les versions des modèles sont vérifiées au
+    plus toutes les ``max_age`` secondes ; ``max_age=0`` pour une validation
+    avant écriture.
+    """
+    index = _indexes.get(school_year_id)
+    now = time.monotonic()
+    if index is not None and now - index.checked_at < max_age:
+        return index
+    versions = get_model_versions(DEPENDENCIES)
+    if index is None or index.versions != versions:
+        index = OccupancyIndex.build(school_year_id, versions)
+        with _lock:
+            _indexes[school_year_id] = index
+    index.checked_at = now
+    return index
+
+
+def entry_changed(entry, deleted=False):
+    """
+    Reporte l'écriture d'un cours dans l'index chargé de son année, après la
+    validation de la transaction. Si une autre écriture a eu lieu entre-temps
+    (les versions ont avancé de plus d'un cran), l'index est abandonné.
+    """
+    # Lus tout de suite : après une suppression, l'ORM remet ``entry.pk`` à None.
+    entry_id, timeslot_id = entry.pk, entry.timeslot_id
+    values = None
+    if not deleted:
+        classroom_subject = entry.classroom_subject
+        values = (
+            entry_id, timeslot_id, classroom_subject.classroom_id, classroom_subject.teacher_id,
+            entry.room_id, classroom_subject.pk,
+        )
+
+    def apply():
+        with _lock:
+            index = next((index for index in _indexes.values() if timeslot_id in index.ranks), None)
+            if index is None:
+                return
+            versions = get_model_versions(DEPENDENCIES)
+            expected = [index.versions[0] + 1, *index.versions[1:]]
+            if versions != expected:
+                del _indexes[index.school_year_id]
+                return
+            index.remove(entry_id)
+            if values:
+                index.add(*values)
+            index.versions = versions
+
+    transaction.on_commit(apply)
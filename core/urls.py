@@ -1,9 +1,41 @@
 from os import path
 from django.urls import path
 
-from core.views import HomeView
+from core.views import (
+    HomeView,
+    DashboardView,
+    TeacherDashboardView,
+    StudentDashboardView,
+    TutorDashboardView,
+    SchoolYearOverviewView,
+    ClassroomListFragment,
+    StudentSearchFragment,
+    StatisticsView,
+    CacheStatisticsView,
+    TimetableAvailabilityView,
+    WorkloadView,
+    StudentDocumentView,
+    SchoolYearDocumentsView,
+)
 
 urlpatterns=[
         path("", HomeView.as_view(), name="home"),
+        path("dashboard/", DashboardView.as_view(), name="dashboard"),
+        path("dashboard/teacher/", TeacherDashboardView.as_view(), name="teacher_dashboard"),
+        path("dashboard/student/", StudentDashboardView.as_view(), name="student_dashboard"),
+        path("dashboard/tutor/", TutorDashboardView.as_view(), name="tutor_dashboard"),
+        path("school-years/<int:pk>/", SchoolYearOverviewView.as_view(), name="school_year_overview"),
+        path("school-years/<int:pk>/classrooms/", ClassroomListFragment.as_view(), name="classroom_list_fragment"),
+        path("school-years/<int:pk>/students/", StudentSearchFragment.as_view(), name="student_search_fragment"),
+        path(
+            "school-years/<int:pk>/timetable/availability/",
+            TimetableAvailabilityView.as_view(),
+            name="timetable_availability",
+        ),
+        path("school-years/<int:pk>/workload/", WorkloadView.as_view(), name="workload"),
+        path("school-years/<int:pk>/documents/<slug:kind>.zip", SchoolYearDocumentsView.as_view(), name="school_year_documents"),
+        path("students/<int:pk>/documents/<slug:kind>/", StudentDocumentView.as_view(), name="student_document"),
+        path("stats/", StatisticsView.as_view(), name="statistics"),
+        path("stats/cache/", CacheStatisticsView.as_view(), name="cache_statistics"),
 
         ]
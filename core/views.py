@@ -1,5 +1,417 @@
-from django.shortcuts import render
+import csv
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.contrib.auth.views import redirect_to_login
+from django.core.exceptions import PermissionDenied
+from django.db.models import Count, Prefetch, Q
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.utils.http import http_date
+from django.views import View
 from django.views.generic import TemplateView
+from django.views.generic.base import TemplateResponseMixin
+
+from core.mixins import AsyncHtmxPartialMixin, HtmxPartialMixin, ReplicaReadMixin
+from core.cache import cache_counters
+from core.documents import DOCUMENT_TEMPLATES, iter_documents, render_document, stream_zip, student_records
+from core.replicas import keep_routing
+from core.stats import GROUPINGS, cached_rollup
+from core.timetable import occupancy
+from core.workload import cached_workload_report
+from core.models import (
+    Classroom,
+    ClassroomSubject,
+    GradeOption,
+    Level,
+    SchoolYear,
+    SchoolYearLevel,
+    Enrollment,
+    Student,
+    Teacher,
+)
 
-class HomeView(TemplateView):
+
+class HomeView(HtmxPartialMixin, TemplateView):
     template_name = 'home.html'
+
+
+class DashboardView(LoginRequiredMixin, View):
+    """Redirige l'utilisateur connecté vers le tableau de bord de son rôle."""
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_teacher:
+            return redirect("teacher_dashboard")
+        if request.user.is_student:
+            return redirect("student_dashboard")
+        if request.user.is_tutor:
+            return redirect("tutor_dashboard")
+        return redirect("home")
+
+
+class RoleDashboardMixin(ReplicaReadMixin, LoginRequiredMixin, UserPassesTestMixin, HtmxPartialMixin):
+    role = None
+
+    def test_func(self):
+        return getattr(self.request.user, self.role)
+
+
+class TeacherDashboardView(RoleDashboardMixin, TemplateView):
+    """
+    Classes et matières de l'enseignant pour sa dernière année scolaire, avec
+    les effectifs : trois requêtes quel que soit le nombre de classes.
+    """
+    role = "is_teacher"
+    template_name = "core/dashboard_teacher.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        teacher = (
+            Teacher.objects
+            .filter(user=self.request.user)
+            .select_related("school_year__school")
+            .order_by("-school_year__start_date")
+            .first()
+        )
+        classrooms = []
+        if teacher:
+            classrooms = list(
+                Classroom.objects
+                .filter(classroom_subjects__teacher=teacher)
+                .distinct()
+                .select_related("school_year_level__level", "grade_option")
+                .annotate(student_count=Count("enrollments", distinct=True))
+                .prefetch_related(Prefetch(
+                    "classroom_subjects",
+                    queryset=ClassroomSubject.objects.with_coefficient().filter(teacher=teacher).select_related("subject"),
+                    to_attr="taught_subjects",
+                ))
+                .order_by("school_year_level__level__order", "name")
+            )
+        context.update(
+            teacher=teacher,
+            classrooms=classrooms,
+            student_total=sum(classroom.student_count for classroom in classrooms),
+        )
+        return context
+
+
+class StudentDashboardView(RoleDashboardMixin, TemplateView):
+    """
+    Classe, effectif, matières et coefficients de l'élève : trois requêtes.
+    """
+    role = "is_student"
+    template_name = "core/dashboard_student.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        enrollment = get_object_or_404(
+            Enrollment.objects
+            .current()
+            .select_related(
+                "school_year__school",
+                "classroom__school_year_level__level",
+                "classroom__grade_option",
+            )
+            .annotate(classmate_count=Count("classroom__enrollments")),
+            student__user=self.request.user,
+        )
+        subjects = list(
+            ClassroomSubject.objects
+            .with_coefficient()
+            .filter(classroom_id=enrollment.classroom_id)
+            .select_related("subject", "teacher__user")
+            .order_by("subject__name")
+        )
+        context.update(
+            enrollment=enrollment,
+            subjects=subjects,
+            coefficient_total=sum(subject.effective_coefficient for subject in subjects),
+        )
+        return context
+
+
+class AsyncFragmentView(ReplicaReadMixin, AsyncHtmxPartialMixin, TemplateResponseMixin, View):
+    """
+    Vue asynchrone de base pour les fragments HTMX en lecture seule.
+
+    Les sous-classes implémentent ``get_context_data`` en coroutine et doivent
+    matérialiser leurs querysets (``async for``) : le rendu du template se fait
+    ensuite et ne doit plus toucher la base.
+
+    L'année (``pk``) n'est visible que du personnel et des enseignants de son
+    établissement ; le cache des fragments est cloisonné selon ce droit.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path(), settings.LOGIN_URL)
+        self.access_scope = await self.get_access_scope(user, kwargs["pk"])
+        return await self.render_fragment(user, lambda: self.get_context_data(**kwargs))
+
+    async def get_access_scope(self, user, pk):
+        """``"staff"`` ou ``"school:<id>"`` selon le droit d'accès à l'année ; lève ``PermissionDenied`` sinon."""
+        school_id = await SchoolYear.objects.filter(pk=pk).values_list("school_id", flat=True).afirst()
+        if school_id is None:
+            raise Http404
+        if user.is_staff:
+            return "staff"
+        if await Teacher.objects.filter(user=user, school_year__school_id=school_id).aexists():
+            return f"school:{school_id}"
+        raise PermissionDenied
+
+    async def get_context_data(self, **kwargs):
+        return {}
+
+    async def get_school_year(self, pk):
+        try:
+            return await SchoolYear.objects.select_related("school").aget(pk=pk)
+        except SchoolYear.DoesNotExist:
+            raise Http404
+
+
+class SchoolYearOverviewView(AsyncFragmentView):
+    """
+    Page d'une année scolaire : les fragments sont chargés en parallèle par HTMX
+    (``hx-trigger="load"``), chacun par sa propre requête ASGI.
+    """
+    template_name = "core/school_year_overview.html"
+
+    async def get_context_data(self, **kwargs):
+        return {"school_year": await self.get_school_year(kwargs["pk"])}
+
+
+class ClassroomListFragment(AsyncFragmentView):
+    template_name = "core/fragments/classroom_list.html"
+    fragment_cache_models = (Classroom, Enrollment, SchoolYearLevel, Level, GradeOption)
+    fragment_cache_vary_on_user = False
+
+    async def get_context_data(self, **kwargs):
+        classrooms = (
+            Classroom.objects
+            .filter(school_year_level__school_year_id=kwargs["pk"])
+            .select_related("school_year_level__level", "grade_option")
+            .annotate(student_count=Count("enrollments"))
+            .order_by("school_year_level__level__order", "name")
+        )
+        return {"classrooms": [classroom async for classroom in classrooms]}
+
+
+class StudentSearchFragment(AsyncFragmentView):
+    template_name = "core/fragments/student_search.html"
+    fragment_cache_models = (Enrollment, get_user_model(), Classroom)
+    fragment_cache_vary_on_user = False
+    max_results = 20
+
+    async def get_context_data(self, **kwargs):
+        query = self.request.GET.get("q", "").strip()
+        enrollments = []
+        if query:
+            matches = (
+                Enrollment.objects
+                .filter(school_year_id=kwargs["pk"])
+                .filter(
+                    Q(student__user__first_name__icontains=query)
+                    | Q(student__user__last_name__icontains=query)
+                    | Q(enrollment_number__istartswith=query)
+                )
+                .select_related("student__user", "classroom__school_year_level__level", "classroom__grade_option")
+                .order_by("student__user__last_name", "student__user__first_name")
+            )[:self.max_results]
+            enrollments = [enrollment async for enrollment in matches]
+        return {"query": query, "enrollments": enrollments}
+
+
+class TutorDashboardView(RoleDashboardMixin, TemplateView):
+    """
+    Enfants du tuteur avec l'historique de leurs inscriptions, toutes écoles et
+    années confondues : trois requêtes quel que soit le nombre d'enfants.
+    """
+    role = "is_tutor"
+    template_name = "core/dashboard_tutor.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["children"] = list(Student.objects.for_guardian(self.request.user))
+        return context
+
+
+class StatisticsView(ReplicaReadMixin, LoginRequiredMixin, UserPassesTestMixin, View):
+    """
+    Effectifs inter-établissements lus dans les agrégats ``ClassroomStat``.
+
+    Paramètres : ``group_by`` (school, grade, level, grade_option, classroom),
+    ``year`` (année de début), ``school`` et ``format`` (json ou csv). La date
+    du plus ancien agrégat lu est renvoyée dans ``refreshed_at`` et
+    ``Last-Modified``.
+    """
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        group_by = request.GET.get("group_by", "school")
+        if group_by not in GROUPINGS:
+            return HttpResponseBadRequest(f"group_by doit valoir : {', '.join(GROUPINGS)}.")
+        try:
+            year = int(request.GET["year"]) if request.GET.get("year") else None
+            school_id = int(request.GET["school"]) if request.GET.get("school") else None
+        except ValueError:
+            return HttpResponseBadRequest("year et school doivent être des entiers.")
+
+        rows, refreshed_at = cached_rollup(group_by, year=year, school_id=school_id)
+        if request.GET.get("format") == "csv":
+            response = HttpResponse(content_type="text/csv; charset=utf-8")
+            response["Content-Disposition"] = f'attachment; filename="stats-{group_by}.csv"'
+            if rows:
+                writer = csv.DictWriter(response, fieldnames=list(rows[0]))
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            response = JsonResponse({
+                "group_by": group_by,
+                "refreshed_at": refreshed_at,
+                "results": rows,
+            })
+        if refreshed_at:
+            response["Last-Modified"] = http_date(refreshed_at.timestamp())
+        return response
+
+
+class TimetableAvailabilityView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """
+    Disponibilités lues dans l'index d'occupation de l'année.
+
+    ``?timeslot=`` : enseignants, classes et salles libres sur ce créneau.
+    ``?teacher=``, ``?classroom=``, ``?room=`` (combinables) : créneaux où
+    tous sont libres.
+    """
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, pk, *args, **kwargs):
+        get_object_or_404(SchoolYear, pk=pk)
+        try:
+            params = {
+                name: int(request.GET[name]) if request.GET.get(name) else None
+                for name in ("timeslot", "teacher", "classroom", "room")
+            }
+        except ValueError:
+            return HttpResponseBadRequest("timeslot, teacher, classroom et room doivent être des entiers.")
+        index = occupancy(pk)
+        if params["timeslot"] is not None:
+            if params["timeslot"] not in index.ranks:
+                raise Http404("Créneau inconnu pour cette année.")
+            return JsonResponse({
+                "timeslot": index.describe("timeslot", [params["timeslot"]])[0],
+                **{
+                    f"{kind}s": index.describe(kind, index.free(kind, params["timeslot"]))
+                    for kind in ("teacher", "classroom", "room")
+                },
+            })
+        if params["teacher"] is None and params["classroom"] is None and params["room"] is None:
+            return HttpResponseBadRequest("Indiquer timeslot, ou teacher, classroom et/ou room.")
+        slots = index.free_slots(
+            teacher_id=params["teacher"], classroom_id=params["classroom"], room_id=params["room"]
+        )
+        return JsonResponse({"timeslots": index.describe("timeslot", slots)})
+
+
+class WorkloadView(ReplicaReadMixin, LoginRequiredMixin, UserPassesTestMixin, View):
+    """
+    Services des enseignants de l'année (``core.workload``) : heures par
+    enseignant, matière et classe, et changements d'enseignant proposés.
+    ``?format=csv`` : une ligne par enseignant.
+    """
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, pk, *args, **kwargs):
+        get_object_or_404(SchoolYear, pk=pk)
+        report = cached_workload_report(pk)
+        if request.GET.get("format") == "csv":
+            response = HttpResponse(content_type="text/csv; charset=utf-8")
+            response["Content-Disposition"] = f'attachment; filename="workload-{pk}.csv"'
+            writer = csv.writer(response)
+            writer.writerow(["teacher", "label", "hours", "service_hours", "status"])
+            for teacher in report["teachers"]:
+                writer.writerow([
+                    teacher["id"], teacher["label"], teacher["hours"], teacher["service_hours"], teacher["status"],
+                ])
+            return response
+        return JsonResponse(report)
+
+
+class StudentDocumentView(ReplicaReadMixin, LoginRequiredMixin, UserPassesTestMixin, View):
+    """
+    Certificat de scolarité (dernière année, ou ``?school_year=``) ou relevé
+    de notes de toutes les années d'un élève, à imprimer depuis le navigateur.
+    """
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, pk, kind, *args, **kwargs):
+        if kind not in DOCUMENT_TEMPLATES:
+            raise Http404("Document inconnu.")
+        try:
+            school_year_id = int(request.GET["school_year"]) if request.GET.get("school_year") else None
+        except ValueError:
+            return HttpResponseBadRequest("school_year doit être un entier.")
+        record = student_records([pk], school_year_id=school_year_id).get(pk)
+        if record is None:
+            raise Http404("Aucune inscription pour cet élève.")
+        school_year = get_object_or_404(
+            SchoolYear.objects.select_related("school"), pk=record["years"][-1]["school_year_id"]
+        )
+        return HttpResponse(render_document(kind, record, school_year.school))
+
+
+class SchoolYearDocumentsView(ReplicaReadMixin, LoginRequiredMixin, UserPassesTestMixin, View):
+    """
+    Documents de tous les élèves inscrits dans l'année (ou ``?classroom=``),
+    en une archive ZIP envoyée au fil de sa construction. Les certificats
+    portent sur l'année, les relevés sur toutes les années de chaque élève.
+    """
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, pk, kind, *args, **kwargs):
+        if kind not in DOCUMENT_TEMPLATES:
+            raise Http404("Document inconnu.")
+        school_year = get_object_or_404(SchoolYear.objects.select_related("school"), pk=pk)
+        enrollments = Enrollment.objects.filter(school_year=school_year)
+        if request.GET.get("classroom"):
+            try:
+                enrollments = enrollments.filter(classroom_id=int(request.GET["classroom"]))
+            except ValueError:
+                return HttpResponseBadRequest("classroom doit être un entier.")
+        student_ids = enrollments.order_by("student_id").values_list("student_id", flat=True)
+        documents = iter_documents(
+            kind,
+            student_ids,
+            school_year.school,
+            school_year_id=school_year.pk if kind == "certificate" else None,
+        )
+        # Les documents sont lus pendant l'envoi, après le middleware de routage.
+        response = StreamingHttpResponse(keep_routing(stream_zip(documents)), content_type="application/zip")
+        response["Content-Disposition"] = f'attachment; filename="{kind}s-{school_year.name}.zip"'
+        return response
+
+
+class CacheStatisticsView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """Succès et échecs du cache par usage, cumulés sur tous les workers."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({
+            "backend": settings.CACHES["default"]["BACKEND"],
+            "counters": cache_counters(),
+        })
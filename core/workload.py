@@ -0,0 +1,185 @@
+"""
+Services des enseignants d'une année scolaire.
+
+Les heures hebdomadaires (``ClassroomSubject.weekly_hours``) sont lues en une
+requête, au grain le plus fin (une ligne par matière en classe), et cumulées
+par enseignant, matière et classe. Un enseignant est en surcharge ou en
+sous-service au-delà de ``WORKLOAD_TOLERANCE_HOURS`` autour de son service
+(``Teacher.service_hours``, sinon ``TEACHER_SERVICE_HOURS``).
+
+``propose_reassignments`` cherche, de façon gloutonne, les changements
+d'enseignant qui réduisent le plus ces écarts : un enseignant ne reçoit qu'une
+matière qu'il enseigne déjà cette année, et sur des créneaux où il est libre
+(``core.timetable``). Le rapport est mis en cache jusqu'à la prochaine
+modification des affectations.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import F
+
+from core.cache import cached_value
+from core.models import Classroom, ClassroomSubject, Subject, Teacher, TimetableEntry, Timeslot
+from core.timetable import occupancy
+
+# Modèles dont dépend un rapport : affectations, services, libellés, emploi du temps.
+WORKLOAD_MODELS = (ClassroomSubject, Teacher, Subject, Classroom, TimetableEntry, Timeslot)
+
+ZERO = Decimal(0)
+
+
+def assignments(school_year_id):
+    """Matières en classe de l'année avec leurs heures (0 si non renseignées)."""
+    return list(
+        ClassroomSubject.objects.filter(classroom__school_year_level__school_year_id=school_year_id)
+        .values(
+            "id",
+            "teacher_id",
+            "subject_id",
+            "classroom_id",
+            "weekly_hours",
+            label=F("display_label"),
+            subject_name=F("subject__name"),
+            classroom_label=F("classroom__display_label"),
+        )
+        .order_by("pk")
+    )
+
+
+def penalty(load, service):
+    """Heures hors de la tolérance autour du service."""
+    tolerance = settings.WORKLOAD_TOLERANCE_HOURS
+    return max(ZERO, load - service - tolerance) + max(ZERO, service - tolerance - load)
+
+
+def status(load, service):
+    tolerance = settings.WORKLOAD_TOLERANCE_HOURS
+    if load > service + tolerance:
+        return "over"
+    if load < service - tolerance:
+        return "under"
+    return "ok"
+
+
+def propose_reassignments(rows, services, busy, slots, max_moves=50):
+    """
+    Changements d'enseignant proposés, dans l'ordre où les appliquer.
+
+    ``rows`` : affectations (``assignments``) ; ``services`` : ``{enseignant:
+    service}`` ; ``busy`` : ``{enseignant: masque des créneaux occupés}`` ;
+    ``slots`` : ``{matière en classe: masque de ses créneaux}``. À chaque
+    étape, le changement qui réduit le plus la somme des écarts est retenu ;
+    la recherche s'arrête quand aucun ne la réduit.
+    """
+    loads = defaultdict(Decimal)
+    teachers_of_subject = defaultdict(set)
+    owner = {}
+    for row in rows:
+        if row["teacher_id"] in services:
+            loads[row["teacher_id"]] += row["weekly_hours"] or ZERO
+            teachers_of_subject[row["subject_id"]].add(row["teacher_id"])
+            owner[row["id"]] = row["teacher_id"]
+    busy = dict(busy)
+    movable = [row for row in rows if row["teacher_id"] in services and row["weekly_hours"]]
+    moves = []
+    while len(moves) < max_moves:
+        best = None
+        for row in movable:
+            source = owner[row["id"]]
+            hours, mask = row["weekly_hours"], slots.get(row["id"], 0)
+            for target in teachers_of_subject[row["subject_id"]]:
+                if target == source or busy.get(target, 0) & mask:
+                    continue
+                gain = (
+                    penalty(loads[source], services[source]) + penalty(loads[target], services[target])
+                    - penalty(loads[source] - hours, services[source])
+                    - penalty(loads[target] + hours, services[target])
+                )
+                # À gain égal, le receveur le moins chargé.
+                if gain > 0 and (best is None or (gain, -loads[target]) > (best[0], -loads[best[2]])):
+                    best = (gain, row, target)
+        if best is None:
+            break
+        _, row, target = best
+        source, hours, mask = owner[row["id"]], row["weekly_hours"], slots.get(row["id"], 0)
+        loads[source] -= hours
+        loads[target] += hours
+        busy[source] = busy.get(source, 0) & ~mask
+        busy[target] = busy.get(target, 0) | mask
+        owner[row["id"]] = target
+        moves.append({
+            "classroom_subject": row["id"],
+            "label": row["label"],
+            "hours": hours,
+            "from": source,
+            "to": target,
+        })
+    return moves
+
+
+def workload_report(school_year_id):
+    """
+    Heures par enseignant, matière et classe, écarts au service et
+    changements d'enseignant proposés pour l'année.
+    """
+    rows = assignments(school_year_id)
+    default_service = settings.TEACHER_SERVICE_HOURS
+    teachers = {
+        pk: {"id": pk, "label": label, "service_hours": default_service if service is None else service, "hours": ZERO,
+             "subjects": defaultdict(Decimal), "classrooms": defaultdict(Decimal)}
+        for pk, label, service in Teacher.objects.filter(school_year_id=school_year_id)
+        .values_list("pk", "display_label", "service_hours")
+    }
+    subjects, classrooms = {}, {}
+    unassigned, missing_hours = [], 0
+    for row in rows:
+        hours = row["weekly_hours"] or ZERO
+        if row["weekly_hours"] is None:
+            missing_hours += 1
+        subject = subjects.setdefault(
+            row["subject_id"], {"id": row["subject_id"], "label": row["subject_name"], "hours": ZERO, "unassigned_hours": ZERO}
+        )
+        classroom = classrooms.setdefault(
+            row["classroom_id"], {"id": row["classroom_id"], "label": row["classroom_label"], "hours": ZERO}
+        )
+        subject["hours"] += hours
+        classroom["hours"] += hours
+        teacher = teachers.get(row["teacher_id"])
+        if teacher is None:
+            subject["unassigned_hours"] += hours
+            unassigned.append({"classroom_subject": row["id"], "label": row["label"], "hours": hours})
+            continue
+        teacher["hours"] += hours
+        teacher["subjects"][row["subject_id"]] += hours
+        teacher["classrooms"][row["classroom_id"]] += hours
+
+    index = occupancy(school_year_id)
+    slots = defaultdict(int)
+    for timeslot_id, *_, classroom_subject_id in index.entries.values():
+        slots[classroom_subject_id] |= 1 << index.ranks[timeslot_id]
+    proposals = propose_reassignments(
+        rows,
+        {pk: teacher["service_hours"] for pk, teacher in teachers.items()},
+        index.teachers,
+        slots,
+    )
+
+    for teacher in teachers.values():
+        teacher["status"] = status(teacher["hours"], teacher["service_hours"])
+        teacher["subjects"] = dict(teacher["subjects"])
+        teacher["classrooms"] = dict(teacher["classrooms"])
+    return {
+        "school_year": school_year_id,
+        "teachers": sorted(teachers.values(), key=lambda teacher: -teacher["hours"]),
+        "subjects": sorted(subjects.values(), key=lambda subject: subject["label"]),
+        "classrooms": sorted(classrooms.values(), key=lambda classroom: classroom["label"]),
+        "unassigned": unassigned,
+        "missing_hours": missing_hours,
+        "proposals": proposals,
+    }
+
+
+def cached_workload_report(school_year_id, timeout=3600):
+    """``workload_report`` mis en cache jusqu'à la prochaine modification d'une affectation."""
+    return cached_value("workload", WORKLOAD_MODELS, lambda: workload_report(school_year_id), school_year_id, timeout=timeout)
@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration for myapp.
+
+The same file serves both deployment paths, selected with ``SERVER_MODE``:
+
+    SERVER_MODE=asgi  (default) uvicorn workers running myapp.asgi
+    SERVER_MODE=wsgi  sync threaded workers running myapp.wsgi
+
+    gunicorn -c gunicorn.conf.py
+
+ASGI workers need the ``asgi`` extra: ``pip install .[asgi]``.
+"""
+
+import multiprocessing
+import os
+
+SERVER_MODE = os.environ.get("SERVER_MODE", "asgi")
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+keepalive = 5
+timeout = 30
+graceful_timeout = 30
+# Recycle workers now and then so a leak can't grow forever.
+max_requests = 10000
+max_requests_jitter = 1000
+
+raw_env = [f"DJANGO_ENV={os.environ.get('DJANGO_ENV', 'prod')}"]
+
+if SERVER_MODE == "asgi":
+    wsgi_app = "myapp.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+elif SERVER_MODE == "wsgi":
+    wsgi_app = "myapp.wsgi:application"
+    worker_class = "gthread"
+    threads = int(os.environ.get("GUNICORN_THREADS", 4))
+else:
+    raise RuntimeError(f"Unknown SERVER_MODE {SERVER_MODE!r}, expected asgi or wsgi.")
@@ -14,3 +14,12 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myapp.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.TEMPLATE_WARMUP:
+    # Compile every template and cotton component before serving, and refuse
+    # to start on a broken one.
+    from core.template_warmup import warm_templates  # noqa: E402
+
+    warm_templates(strict=True)
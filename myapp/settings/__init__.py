@@ -0,0 +1,25 @@
+"""
+Settings profiles for myapp project.
+
+The profile is picked from the ``DJANGO_ENV`` environment variable:
+
+    dev   (default) local development, with browser reload tooling
+    prod  production, no dev-only apps or middleware
+    test  test runs, fast hashers and no dev tooling
+
+A profile module can also be used directly, e.g.
+``DJANGO_SETTINGS_MODULE=myapp.settings.prod``.
+"""
+
+import os
+
+DJANGO_ENV = os.environ.get('DJANGO_ENV', 'dev')
+
+if DJANGO_ENV == 'prod':
+    from .prod import *  # noqa: F401,F403
+elif DJANGO_ENV == 'test':
+    from .test import *  # noqa: F401,F403
+elif DJANGO_ENV == 'dev':
+    from .dev import *  # noqa: F401,F403
+else:
+    raise ImportError(f"Unknown DJANGO_ENV {DJANGO_ENV!r}, expected dev, prod or test.")
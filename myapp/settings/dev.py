@@ -0,0 +1,15 @@
+"""
+Development settings: debug on, plus browser reload tooling.
+"""
+
+from .base import *  # noqa: F401,F403
+
+DEBUG = True
+
+INSTALLED_APPS = INSTALLED_APPS + [
+    'django_browser_reload',
+]
+
+MIDDLEWARE = MIDDLEWARE + [
+    'django_browser_reload.middleware.BrowserReloadMiddleware',
+]
@@ -0,0 +1,37 @@
+"""
+Production settings: no dev-only apps or middleware, secrets from the environment.
+"""
+
+import os
+
+from .base import *  # noqa: F401,F403
+
+DEBUG = False
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
+
+SESSION_COOKIE_SECURE = True
+CSRF_COOKIE_SECURE = True
+
+# Explicit cached loader chain, cotton first. django_cotton would otherwise set up
+# an equivalent chain implicitly; spelling it out keeps production independent
+# of that behaviour.
+TEMPLATES = [
+    {
+        **{key: value for key, value in TEMPLATES[0].items() if key != 'APP_DIRS'},
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django_cotton.cotton_loader.Loader',
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+TEMPLATE_WARMUP = True
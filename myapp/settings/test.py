@@ -0,0 +1,17 @@
+"""
+Test settings: no dev tooling, cheap password hashing.
+"""
+
+from .base import *  # noqa: F401,F403
+
+DEBUG = False
+
+ALLOWED_HOSTS = ['testserver', 'localhost']
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+CACHES = {
+    'default': cache_from_url('locmem://'),
+}
@@ -23,9 +23,15 @@ from django.urls import path, include
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path("accounts/", include("account.urls")),
+    path("tasks/", include("tasks.urls")),
+    path("api/", include("api.urls")),
     path("", include("core.urls")),
-    path('__reload__/', include("django_browser_reload.urls")),
 ]
 
+# Dev-only tooling is mounted only when its app is installed (see myapp/settings/dev.py).
+if "django_browser_reload" in settings.INSTALLED_APPS:
+    urlpatterns += [path('__reload__/', include("django_browser_reload.urls"))]
+
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
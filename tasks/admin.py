@@ -0,0 +1,24 @@
+from django.contrib import admin
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from tasks.models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ("name", "status", "progress_current", "progress_total", "attempts", "created_by", "created_at", "finished_at")
+    list_filter = ("status", "name")
+    search_fields = ("name", "message")
+    readonly_fields = [field.name for field in Task._meta.fields]
+    actions = ["requeue"]
+
+    @admin.action(description=_("Remettre en file"))
+    def requeue(self, request, queryset):
+        count = queryset.exclude(status=Task.Status.RUNNING).update(
+            status=Task.Status.PENDING,
+            attempts=0,
+            run_after=timezone.now(),
+            updated_at=timezone.now(),
+        )
+        self.message_user(request, _("%(count)d tâche(s) remise(s) en file.") % {"count": count})
@@ -0,0 +1,87 @@
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tasks.models import Task
+from tasks.registry import run_task
+
+
+class Command(BaseCommand):
+    help = (
+        "Exécute les tâches de fond en file d'attente dans un pool de threads "
+        "ou de processus. Plusieurs workers peuvent tourner en parallèle, sur "
+        "une ou plusieurs machines."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=4, help="Tâches exécutées simultanément.")
+        parser.add_argument(
+            "--pool",
+            choices=("thread", "process"),
+            default="thread",
+            help="« process » pour les tâches gourmandes en CPU (rendu de bulletins…).",
+        )
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Attente (s) quand la file est vide.")
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=600,
+            help="Remet en file les tâches en cours sans signe de vie depuis ce délai (s).",
+        )
+        parser.add_argument("--once", action="store_true", help="Vide la file puis s'arrête.")
+
+    def handle(self, *args, **options):
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        concurrency = options["concurrency"]
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+
+        if options["pool"] == "process":
+            # Les processus fils ne doivent pas hériter des connexions ouvertes.
+            connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=concurrency, initializer=django.setup)
+        else:
+            executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="task")
+
+        self.stdout.write(f"Worker {worker} : {concurrency} {options['pool']}(s).")
+        running = set()
+        # Les tâches en cours sont signalées vivantes plusieurs fois par délai de reprise.
+        heartbeat_interval = options["stale_after"] / 4
+        last_heartbeat = time.monotonic()
+        with executor:
+            while not stop.is_set():
+                requeued, failed = Task.objects.requeue_stale(options["stale_after"])
+                if requeued:
+                    self.stdout.write(self.style.WARNING(f"{requeued} tâche(s) bloquée(s) remise(s) en file."))
+                if failed:
+                    self.stdout.write(self.style.ERROR(f"{failed} tâche(s) bloquée(s) sans tentative restante : échec."))
+                if running and time.monotonic() - last_heartbeat >= heartbeat_interval:
+                    Task.objects.heartbeat(worker)
+                    last_heartbeat = time.monotonic()
+
+                while len(running) < concurrency and not stop.is_set():
+                    job = Task.objects.claim(worker)
+                    if job is None:
+                        break
+                    self.stdout.write(f"→ {job.name} ({job.pk})")
+                    running.add(executor.submit(run_task, job.pk))
+
+                if not running:
+                    if options["once"]:
+                        break
+                    stop.wait(options["poll_interval"])
+                    continue
+                done, running = wait(running, timeout=options["poll_interval"], return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            if running:
+                self.stdout.write("Arrêt : attente des tâches en cours…")
+        self.stdout.write("Worker arrêté.")
@@ -0,0 +1,139 @@
+import uuid
+from datetime import timedelta
+
+from django.db import connection, models, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from core.models import TimeStampedModelWithUser
+
+
+class TaskQuerySet(models.QuerySet):
+    def claim(self, worker):
+        """
+        Réserve la prochaine tâche exécutable pour ``worker`` et la passe en
+        cours, ou retourne ``None``.
+
+        Sous PostgreSQL le ``SELECT … FOR UPDATE SKIP LOCKED`` fait passer les
+        workers concurrents sur des lignes différentes. Le passage à ``running``
+        est un UPDATE conditionnel : c'est lui qui garantit qu'une tâche n'est
+        réservée qu'une fois, y compris sous SQLite où le verrou n'existe pas.
+        """
+        now = timezone.now()
+        with transaction.atomic(using=self.db):
+            candidates = self.filter(status=Task.Status.PENDING, run_after__lte=now).order_by("run_after", "created_at")
+            if connection.features.has_select_for_update_skip_locked:
+                candidates = candidates.select_for_update(skip_locked=True)
+            for pk in candidates.values_list("pk", flat=True)[:10]:
+                claimed = self.filter(pk=pk, status=Task.Status.PENDING).update(
+                    status=Task.Status.RUNNING,
+                    locked_by=worker,
+                    started_at=now,
+                    updated_at=now,
+                    attempts=models.F("attempts") + 1,
+                )
+                if claimed:
+                    return self.get(pk=pk)
+        return None
+
+    def heartbeat(self, worker):
+        """Signe de vie des tâches en cours de ``worker``, même sans ``set_progress``."""
+        return self.filter(status=Task.Status.RUNNING, locked_by=worker).update(updated_at=timezone.now())
+
+    def requeue_stale(self, timeout):
+        """
+        Remet en attente les tâches ``running`` sans nouvelle depuis ``timeout``
+        secondes (worker arrêté brutalement), ou les passe en échec si elles
+        ont épuisé leurs tentatives. Retourne ``(remises en file, échouées)``.
+        """
+        now = timezone.now()
+        stale = self.filter(status=Task.Status.RUNNING, updated_at__lt=now - timedelta(seconds=timeout))
+        with transaction.atomic(using=self.db):
+            failed = stale.filter(attempts__gte=models.F("max_attempts")).update(
+                status=Task.Status.FAILED,
+                locked_by="",
+                finished_at=now,
+                updated_at=now,
+                error="Worker arrêté pendant la dernière tentative.",
+            )
+            requeued = stale.update(status=Task.Status.PENDING, locked_by="", updated_at=now)
+        return requeued, failed
+
+
+class Task(TimeStampedModelWithUser):
+    """
+    Tâche de fond en file d'attente, exécutée par ``manage.py worker``.
+
+    ``name`` désigne une fonction enregistrée avec ``tasks.registry.task`` ;
+    ``kwargs`` lui est passé tel quel et doit donc être sérialisable en JSON.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("En attente")
+        RUNNING = "running", _("En cours")
+        SUCCEEDED = "succeeded", _("Terminée")
+        FAILED = "failed", _("Échouée")
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=100, verbose_name=_("Tâche"))
+    kwargs = models.JSONField(default=dict, blank=True, verbose_name=_("Paramètres"))
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name=_("Statut"),
+    )
+    run_after = models.DateTimeField(default=timezone.now, verbose_name=_("Exécuter après"))
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name=_("Tentatives"))
+    max_attempts = models.PositiveSmallIntegerField(default=3, verbose_name=_("Tentatives maximum"))
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name=_("Worker"))
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Démarrée le"))
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Terminée le"))
+    progress_current = models.PositiveIntegerField(default=0, verbose_name=_("Avancement"))
+    progress_total = models.PositiveIntegerField(null=True, blank=True, verbose_name=_("Total"))
+    message = models.CharField(max_length=255, blank=True, verbose_name=_("Message"))
+    result = models.JSONField(null=True, blank=True, verbose_name=_("Résultat"))
+    error = models.TextField(blank=True, verbose_name=_("Erreur"))
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("Tâche de fond")
+        verbose_name_plural = _("Tâches de fond")
+        ordering = ["-created_at"]
+        indexes = [
+            # File d'attente : seules les tâches en attente sont indexées.
+            models.Index(
+                fields=["run_after", "created_at"],
+                condition=models.Q(status="pending"),
+                name="task_pending_queue",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.Status.SUCCEEDED, self.Status.FAILED)
+
+    @property
+    def percent(self):
+        if self.status == self.Status.SUCCEEDED:
+            return 100
+        if not self.progress_total:
+            return None
+        return min(100, self.progress_current * 100 // self.progress_total)
+
+    def set_progress(self, current, total=None, message=None):
+        """
+        Enregistre l'avancement, lu par le fragment HTMX de suivi. Fait aussi
+        office de signe de vie pour ``requeue_stale``.
+        """
+        self.progress_current = current
+        fields = {"progress_current": current, "updated_at": timezone.now()}
+        if total is not None:
+            self.progress_total = fields["progress_total"] = total
+        if message is not None:
+            self.message = fields["message"] = message[:255]
+        type(self).objects.filter(pk=self.pk).update(**fields)
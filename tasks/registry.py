@@ -0,0 +1,88 @@
+"""
+Déclaration, mise en file et exécution des tâches de fond.
+
+    from tasks.registry import task
+
+    @task()
+    def refresh_stats(job, school_id=None):
+        job.set_progress(0, total=...)
+        ...
+
+    refresh_stats.enqueue(school_id=3, user=request.user)
+
+La fonction reçoit la ``Task`` en premier argument, puis ses ``kwargs``. Sa
+valeur de retour (sérialisable en JSON) est stockée dans ``Task.result``.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db import close_old_connections
+from django.utils import timezone
+
+from tasks.models import Task
+
+logger = logging.getLogger(__name__)
+
+REGISTRY = {}
+
+# Délai avant la tentative suivante, multiplié par le nombre d'échecs.
+RETRY_DELAY = timedelta(seconds=30)
+
+
+def task(name=None, max_attempts=3):
+    def decorator(func):
+        task_name = name or f"{func.__module__}.{func.__name__}"
+        if task_name in REGISTRY:
+            raise ValueError(f"Tâche déjà enregistrée : {task_name}")
+        REGISTRY[task_name] = func
+
+        def enqueue(user=None, run_after=None, **kwargs):
+            return Task.objects.create(
+                name=task_name,
+                kwargs=kwargs,
+                max_attempts=max_attempts,
+                run_after=run_after or timezone.now(),
+                created_by=user,
+            )
+
+        func.task_name = task_name
+        func.enqueue = enqueue
+        return func
+    return decorator
+
+
+def run_task(task_id):
+    """
+    Exécute une tâche déjà réservée par ``Task.objects.claim`` et enregistre son
+    issue. Appelée dans un thread ou un processus du worker.
+    """
+    close_old_connections()
+    try:
+        job = Task.objects.get(pk=task_id)
+        func = REGISTRY.get(job.name)
+        try:
+            if func is None:
+                raise LookupError(f"Tâche inconnue : {job.name}")
+            result = func(job, **job.kwargs)
+        except Exception:
+            logger.exception("Échec de la tâche %s (%s)", job.name, job.pk)
+            now = timezone.now()
+            if job.attempts < job.max_attempts and func is not None:
+                fields = {"status": Task.Status.PENDING, "run_after": now + RETRY_DELAY * job.attempts}
+            else:
+                fields = {"status": Task.Status.FAILED, "finished_at": now}
+            Task.objects.filter(pk=job.pk).update(
+                error=traceback.format_exc(), locked_by="", updated_at=now, **fields
+            )
+        else:
+            now = timezone.now()
+            Task.objects.filter(pk=job.pk).update(
+                status=Task.Status.SUCCEEDED,
+                result=result,
+                error="",
+                finished_at=now,
+                updated_at=now,
+            )
+    finally:
+        close_old_connections()
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.tests.utils import make_user
+from tasks.models import Task
+from tasks.registry import run_task, task
+
+
+@task(name="tasks.tests.add", max_attempts=2)
+def add(job, a, b):
+    job.set_progress(1, total=1)
+    return a + b
+
+
+@task(name="tasks.tests.fail", max_attempts=2)
+def fail(job):
+    raise RuntimeError("boom")
+
+
+def make_stale(job, seconds=3600):
+    Task.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(seconds=seconds))
+
+
+class RunTaskTests(TestCase):
+    def test_claimed_task_runs_once(self):
+        job = add.enqueue(a=1, b=2)
+        self.assertEqual(Task.objects.claim("w1").pk, job.pk)
+        self.assertIsNone(Task.objects.claim("w2"))
+        run_task(job.pk)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result, job.percent), (Task.Status.SUCCEEDED, 3, 100))
+
+    def test_failure_is_retried_then_failed(self):
+        job = fail.enqueue()
+        Task.objects.claim("w1")
+        run_task(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Task.Status.PENDING)
+        self.assertGreater(job.run_after, timezone.now())
+        Task.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        Task.objects.claim("w1")
+        run_task(job.pk)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Task.Status.FAILED, 2))
+        self.assertIn("boom", job.error)
+
+
+class RequeueStaleTests(TestCase):
+    def test_stale_task_is_requeued(self):
+        job = add.enqueue(a=1, b=1)
+        Task.objects.claim("w1")
+        make_stale(job)
+        self.assertEqual(Task.objects.requeue_stale(600), (1, 0))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), (Task.Status.PENDING, ""))
+
+    def test_stale_task_without_attempts_left_fails(self):
+        job = add.enqueue(a=1, b=1)
+        Task.objects.filter(pk=job.pk).update(attempts=1)
+        Task.objects.claim("w1")
+        make_stale(job)
+        self.assertEqual(Task.objects.requeue_stale(600), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Task.Status.FAILED)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_heartbeat_keeps_a_running_task(self):
+        job = add.enqueue(a=1, b=1)
+        Task.objects.claim("w1")
+        make_stale(job)
+        self.assertEqual(Task.objects.heartbeat("w2"), 0)
+        self.assertEqual(Task.objects.heartbeat("w1"), 1)
+        self.assertEqual(Task.objects.requeue_stale(600), (0, 0))
+
+
+class TaskProgressViewTests(TestCase):
+    def test_progress_is_visible_to_its_creator_only(self):
+        owner = make_user("owner@x.io")
+        job = add.enqueue(a=1, b=1, user=owner)
+        url = reverse("task_progress", args=[job.pk])
+        self.client.force_login(owner)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.client.force_login(make_user("other@x.io"))
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_finished_task_stops_htmx_polling(self):
+        owner = make_user("owner@x.io")
+        job = add.enqueue(a=1, b=1, user=owner)
+        Task.objects.claim("w1")
+        run_task(job.pk)
+        self.client.force_login(owner)
+        response = self.client.get(reverse("task_progress", args=[job.pk]), headers={"hx-request": "true"})
+        self.assertEqual(response.status_code, 286)
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from tasks.views import TaskProgressView
+
+urlpatterns = [
+    path("<uuid:pk>/", TaskProgressView.as_view(), name="task_progress"),
+]
@@ -0,0 +1,34 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404
+from django.views.generic import DetailView
+
+from tasks.models import Task
+
+# Code HTTP qui arrête le polling HTMX (``hx-trigger="every …"``).
+HTMX_STOP_POLLING = 286
+
+
+class TaskProgressView(LoginRequiredMixin, DetailView):
+    """
+    Fragment d'avancement d'une tâche, à inclure dans une page puis rafraîchi
+    par HTMX tant que la tâche n'est pas terminée.
+    """
+    template_name = "tasks/progress.html"
+    context_object_name = "task"
+
+    def get_queryset(self):
+        tasks = Task.objects.all()
+        if not self.request.user.is_staff:
+            tasks = tasks.filter(created_by=self.request.user)
+        return tasks
+
+    def get_object(self, queryset=None):
+        try:
+            return super().get_object(queryset)
+        except Task.DoesNotExist:
+            raise Http404
+
+    def render_to_response(self, context, **response_kwargs):
+        if self.request.htmx and self.object.is_finished:
+            response_kwargs.setdefault("status", HTMX_STOP_POLLING)
+        return super().render_to_response(context, **response_kwargs)